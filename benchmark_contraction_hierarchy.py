@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark contraction_hierarchy against rail_helpers.shortest_path.
+
+Usage:
+    python3 benchmark_contraction_hierarchy.py [num_stations ...]
+
+For each size (default 1000 10000 100000) a synthetic network is generated in
+a temp directory; build time, hierarchy size, load time of the cached file
+and per-query latency are reported, and every sampled answer is checked
+against shortest_path().
+"""
+
+import os
+import random
+import tempfile
+import time
+
+import contraction_hierarchy
+import rail_helpers
+import synthetic_network
+
+
+def _per_query_us(fn, args_list):
+    t0 = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - t0) / len(args_list) * 1e6
+
+
+def bench_size(size, num_pairs=200, num_checks=30, seed=9):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, f"synthetic_{size}.csv")
+        synthetic_network.write_network_csv(csv_path, size)
+        index = rail_helpers.load_network_index(csv_path)
+
+        t0 = time.perf_counter()
+        ch = contraction_hierarchy.load_contraction_hierarchy(csv_path, tmp)
+        build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        ch = contraction_hierarchy.load_contraction_hierarchy(csv_path, tmp)
+        load = time.perf_counter() - t0
+
+    rng = random.Random(seed)
+    pairs = [(rng.choice(index.stations), rng.choice(index.stations)) for _ in range(num_pairs)]
+    ch.shortest_time(*pairs[0])  # first query builds the per-node adjacency tuples
+    t_time = _per_query_us(ch.shortest_time, pairs)
+    t_path = _per_query_us(ch.shortest_path, pairs)
+    checks = pairs[:num_checks]
+    t_dijkstra = _per_query_us(rail_helpers.shortest_path, [(index, a, b) for a, b in checks])
+
+    mismatches = 0
+    for a, b in checks:
+        expected = rail_helpers.shortest_path(index, a, b)
+        got = ch.shortest_time(a, b)
+        if (expected is None) != (got is None) or (
+                got is not None and abs(got - expected["total_time"]) > 1e-9):
+            mismatches += 1
+
+    print(f"{size:>8,} stations: {len(ch.rank):,} nodes, {ch.num_shortcuts:,} shortcuts, "
+          f"build {build:.1f}s, cached load {load:.2f}s")
+    print(f"{'':28s}{'us/q':>10s}{'speed-up':>10s}")
+    print(f"{'shortest_path (Dijkstra)':28s}{t_dijkstra:10.0f}{1:10.1f}")
+    print(f"{'CH shortest_time':28s}{t_time:10.0f}{t_dijkstra / t_time:10.1f}")
+    print(f"{'CH shortest_path (unpacked)':28s}{t_path:10.0f}{t_dijkstra / t_path:10.1f}")
+    print(f"{'mismatches':28s}{mismatches:10d} of {len(checks)}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    rail_helpers.QUERY_CACHE.maxsize = 0  # Time Dijkstra, not cache hits
+    print("=" * 70)
+    print("Contraction hierarchy vs shortest_path")
+    print("=" * 70)
+    for size in sizes:
+        bench_size(size)
+        print()
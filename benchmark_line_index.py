@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark services_on_same_line in the Custom GPT upload copy of rail_helpers:
+LineIndex slices and prefix sums vs the original path-copying BFS.
+
+Usage:
+    python3 benchmark_line_index.py [rounds]
+
+Every ordered station pair of the upload rail_routes.csv is queried; results
+are checked to agree before the timings are printed.
+"""
+
+import os
+import time
+
+from test_line_index import UPLOAD_DIR, _by_line, bfs_services_on_same_line, upload
+
+
+def _time_all_pairs(fn, graph, stations, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for a in stations:
+            for b in stations:
+                fn(graph, a, b)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == "__main__":
+    import sys
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    csv_path = os.path.join(UPLOAD_DIR, "rail_routes.csv")
+
+    t0 = time.perf_counter()
+    graph, _, _ = upload.load_rail_network(csv_path)
+    load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    index = upload.LineIndex(graph)
+    build = time.perf_counter() - t0
+
+    stations = sorted(graph)
+    pairs = len(stations) ** 2
+    mismatches = 0
+    for a in stations:
+        for b in stations:
+            mismatches += (_by_line(upload.services_on_same_line(graph, a, b))
+                           != _by_line(bfs_services_on_same_line(graph, a, b)))
+
+    t_bfs = _time_all_pairs(bfs_services_on_same_line, graph, stations, rounds)
+    t_index = _time_all_pairs(upload.services_on_same_line, graph, stations, rounds)
+
+    print("=" * 70)
+    print("services_on_same_line: LineIndex vs BFS")
+    print("=" * 70)
+    print(f"{len(stations)} stations, {len(index.stops)} indexed lines, {pairs:,} pairs")
+    print(f"load_rail_network {load * 1e3:.1f} ms (LineIndex build alone {build * 1e3:.1f} ms)")
+    print(f"{'':20s}{'total s':>10s}{'us/pair':>10s}{'speed-up':>10s}")
+    print(f"{'BFS':20s}{t_bfs:10.2f}{t_bfs / pairs * 1e6:10.1f}{1:10.1f}")
+    print(f"{'LineIndex':20s}{t_index:10.2f}{t_index / pairs * 1e6:10.1f}{t_bfs / t_index:10.1f}")
+    print(f"{'mismatches':20s}{mismatches:10d}")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark start-up of the route modules: separate loads vs one NetworkModel.
+
+Usage:
+    python3 benchmark_network_model.py
+
+Each mode runs in a fresh interpreter. "separate" builds what the modules
+used to build on their own (one JSON parse each for RoutePathfinder,
+RouteCorridorCalculator and navigation_helper, plus the CSV graph);
+"shared" gets all four from get_network_model(). Reported: wall time and
+memory still allocated afterwards (tracemalloc).
+"""
+
+import subprocess
+import sys
+
+MODES = {
+    "separate": """
+import json, rail_helpers, route_pathfinder, route_corridor_calculator, network_model
+graph, _, _ = rail_helpers.load_rail_network()
+pathfinder = route_pathfinder.RoutePathfinder(route_pathfinder.load_routes())
+calc = route_corridor_calculator.RouteCorridorCalculator(model=network_model.NetworkModel())
+calc.network_graph
+with open(network_model.KNOWLEDGE_BASE, encoding='utf-8') as f:
+    navigation = json.load(f)
+""",
+    "shared": """
+import rail_helpers, route_pathfinder, route_corridor_calculator, network_model
+model = network_model.get_network_model()
+graph = model.service_graph
+pathfinder = route_pathfinder.RoutePathfinder()
+calc = route_corridor_calculator.RouteCorridorCalculator()
+import navigation_helper
+""",
+}
+
+RUNNER = """
+import time, tracemalloc
+import rail_helpers, route_pathfinder, route_corridor_calculator, network_model, json
+tracemalloc.start()
+t0 = time.perf_counter()
+exec(compile({code!r}, "<mode>", "exec"))
+seconds = time.perf_counter() - t0
+print(seconds, tracemalloc.get_traced_memory()[0])
+"""
+
+
+def run(mode: str, repeats: int = 5):
+    best_seconds = float("inf")
+    memory = 0
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", RUNNER.format(code=MODES[mode])],
+                             capture_output=True, text=True, check=True).stdout.split()
+        best_seconds = min(best_seconds, float(out[0]))
+        memory = int(out[1])
+    return best_seconds, memory
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Module start-up: separate loads vs shared NetworkModel")
+    print("=" * 60)
+    print(f"{'':12s}{'ms':>10s}{'MB held':>10s}")
+    results = {mode: run(mode) for mode in MODES}
+    for mode, (seconds, memory) in results.items():
+        print(f"{mode:12s}{seconds * 1e3:10.1f}{memory / 1e6:10.2f}")
+    (s1, m1), (s2, m2) = results["separate"], results["shared"]
+    print(f"{'shared/sep.':12s}{s2 / s1:10.2f}{m2 / m1:10.2f}")
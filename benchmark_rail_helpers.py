@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for rail_helpers on synthetic networks.
+
+Usage:
+    python3 benchmark_rail_helpers.py [num_stations]
+
+Generates a synthetic network (see synthetic_network.py) in a temp directory
+and reports memory and per-query latency for the dict graph vs NetworkIndex.
+"""
+
+import csv
+import heapq
+import math
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import rail_helpers
+import synthetic_network
+
+
+def _measure_load(loader, path):
+    """Return (result, retained bytes, seconds) for loader(path)."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = loader(path)
+    elapsed = time.perf_counter() - t0
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, elapsed
+
+
+def _per_query_us(fn, args_list):
+    t0 = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - t0) / len(args_list) * 1e6
+
+
+def bench_network_index(path, num_queries=2000, num_paths=20, seed=0):
+    """Compare memory and query latency of the dict graph and NetworkIndex."""
+    (graph, operators, _), graph_bytes, graph_secs = _measure_load(
+        rail_helpers.load_rail_network, path)
+    index, index_bytes, index_secs = _measure_load(rail_helpers.load_network_index, path)
+
+    print(f"Stations: {len(index.stations):,}  Edges: {len(index.targets):,}  "
+          f"Lines: {len(index.lines):,}")
+    print(f"{'':28s}{'dict graph':>14s}{'NetworkIndex':>14s}{'ratio':>8s}")
+    print(f"{'memory (MB)':28s}{graph_bytes / 1e6:14.1f}{index_bytes / 1e6:14.1f}"
+          f"{graph_bytes / index_bytes:8.1f}x")
+    print(f"{'load (s)':28s}{graph_secs:14.2f}{index_secs:14.2f}")
+
+    rng = random.Random(seed)
+    stations = index.stations
+    singles = [(rng.choice(stations),) for _ in range(num_queries)]
+    pairs = []
+    for (a,) in singles:
+        # Half adjacent pairs (real answers), half random pairs
+        b = rng.choice(graph[a])["to"] if rng.random() < 0.5 else rng.choice(stations)
+        pairs.append((a, b))
+    far_pairs = [(rng.choice(stations), rng.choice(stations)) for _ in range(num_paths)]
+    line_queries = [(rng.choice(index.lines),) for _ in range(num_queries)]
+    operator_queries = [(op,) for op in operators] * 4
+
+    queries = [
+        ("operators_at_station", rail_helpers.operators_at_station, singles),
+        ("lines_at_station", rail_helpers.lines_at_station, singles),
+        ("station_info", rail_helpers.station_info, singles),
+        ("direct_services_between", rail_helpers.direct_services_between, pairs),
+        ("services_on_same_line", rail_helpers.services_on_same_line, pairs),
+        ("edges_for_line", rail_helpers.edges_for_line, line_queries[:200]),
+        ("edges_for_operator", rail_helpers.edges_for_operator, operator_queries),
+        ("shortest_path", rail_helpers.shortest_path, far_pairs),
+    ]
+    for name, fn, args_list in queries:
+        t_graph = _per_query_us(fn, [(graph,) + a for a in args_list])
+        t_index = _per_query_us(fn, [(index,) + a for a in args_list])
+        print(f"{name + ' (us)':28s}{t_graph:14.1f}{t_index:14.1f}{t_graph / t_index:8.1f}x")
+
+
+LEGACY_COPIED = [0]  # list cells copied by legacy_shortest_path
+
+
+def legacy_shortest_path(graph, start, end):
+    """The pre-rewrite shortest_path: copies path/legs per push, visited keyed by station."""
+    if start not in graph or end not in graph:
+        return None
+    counter = 0
+    pq = [(0, counter, start, [start], [], 0)]
+    visited = {}
+    while pq:
+        current_time, _, current_station, path, legs, num_changes = heapq.heappop(pq)
+        if current_station == end:
+            return {'stations': path, 'total_time': current_time,
+                    'num_interchanges': num_changes, 'legs': legs}
+        if current_station in visited and visited[current_station] <= current_time:
+            continue
+        visited[current_station] = current_time
+        for edge in graph[current_station]:
+            next_station = edge["to"]
+            interchange_time = 0
+            if legs:
+                if legs[-1]["line"] != edge["line"]:
+                    interchange_time = rail_helpers.INTERCHANGE_PENALTY
+                    new_num_changes = num_changes + 1
+                else:
+                    new_num_changes = num_changes
+            else:
+                new_num_changes = 0
+            new_time = current_time + edge["time"] + interchange_time
+            new_legs = legs + [{'from': current_station, 'to': next_station,
+                                'operator': edge["operator"], 'line': edge["line"],
+                                'time': edge["time"], 'service_type': edge["service_type"]}]
+            if next_station not in visited or visited[next_station] > new_time:
+                LEGACY_COPIED[0] += 2 * len(path) + 1
+                counter += 1
+                heapq.heappush(pq, (new_time, counter, next_station, path + [next_station],
+                                    new_legs, new_num_changes))
+    return None
+
+
+def _profile_search(fn, graph, pairs):
+    """Return (heap pushes/query, peak traced KB/query, us/query, total minutes)."""
+    pushes = [0]
+    real_push = heapq.heappush
+
+    def counting_push(heap, item):
+        pushes[0] += 1
+        real_push(heap, item)
+
+    heapq.heappush = counting_push
+    try:
+        peak_total = 0
+        minutes = 0.0
+        t0 = time.perf_counter()
+        for a, b in pairs:
+            tracemalloc.start()
+            journey = fn(graph, a, b)
+            peak_total += tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            minutes += journey['total_time'] if journey else 0
+        elapsed = time.perf_counter() - t0
+    finally:
+        heapq.heappush = real_push
+
+    n = len(pairs)
+    return pushes[0] / n, peak_total / n / 1024, elapsed / n * 1e6, minutes
+
+
+def bench_shortest_path(path, num_pairs=30, seed=1):
+    """
+    Compare the legacy path-copying search with the line-aware parent-pointer search.
+
+    "cells copied" counts list elements the legacy search copies into new
+    path/legs lists on each push (the line-aware search copies none). A lower
+    "sum min" means the search found faster journeys.
+    """
+    graph, _, _ = rail_helpers.load_rail_network(path)
+    index = rail_helpers.load_network_index(path)
+    rng = random.Random(seed)
+    stations = list(graph)
+    pairs = [(rng.choice(stations), rng.choice(stations)) for _ in range(num_pairs)]
+
+    print(f"{'':28s}{'pushes/q':>10s}{'cells copied/q':>16s}{'peak KB/q':>11s}"
+          f"{'us/q':>9s}{'sum min':>10s}")
+    runs = [
+        ("legacy (dict graph)", legacy_shortest_path, graph),
+        ("line-aware (dict graph)", rail_helpers.shortest_path, graph),
+        ("line-aware (NetworkIndex)", rail_helpers.shortest_path, index),
+    ]
+    for name, fn, g in runs:
+        LEGACY_COPIED[0] = 0
+        pushes, peak_kb, _, minutes = _profile_search(fn, g, pairs)
+        copied = LEGACY_COPIED[0] / len(pairs)
+        t0 = time.perf_counter()
+        for a, b in pairs:
+            fn(g, a, b)
+        us = (time.perf_counter() - t0) / len(pairs) * 1e6
+        print(f"{name:28s}{pushes:10.0f}{copied:16.0f}{peak_kb:11.0f}{us:9.0f}{minutes:10.1f}")
+
+
+def bench_k_best(path, num_pairs=30, seed=2):
+    """Latency of k_best_journeys relative to a single shortest_path query."""
+    index = rail_helpers.load_network_index(path)
+    rng = random.Random(seed)
+    pairs = [(rng.choice(index.stations), rng.choice(index.stations))
+             for _ in range(num_pairs)]
+
+    base = _per_query_us(rail_helpers.shortest_path, [(index, a, b) for a, b in pairs])
+    print(f"{'':28s}{'us/q':>10s}{'x shortest':>12s}")
+    print(f"{'shortest_path':28s}{base:10.0f}{1:12.1f}")
+    for k in (1, 3, 5, 10):
+        us = _per_query_us(rail_helpers.k_best_journeys, [(index, a, b, k) for a, b in pairs])
+        print(f"{'k_best_journeys k=%d' % k:28s}{us:10.0f}{us / base:12.1f}")
+
+
+def _expansions(graph, start, end, heuristic):
+    """Return (states expanded, journey minutes) for one line-aware search."""
+    node_of, _, out_edges, _, _ = rail_helpers._search_space(graph)
+    expanded = [0]
+
+    def counting_out_edges(node):
+        expanded[0] += 1
+        return out_edges(node)
+
+    labels, end_state = rail_helpers._line_aware_search(
+        counting_out_edges, node_of(start), node_of(end), heuristic)
+    return expanded[0], labels[end_state][0] if end_state else None
+
+
+def bench_astar(graph, coords, pairs, label):
+    """Compare states expanded and latency of Dijkstra and coordinate-guided A*."""
+    guide = rail_helpers.CoordinateHeuristic(graph, coords)
+    totals = {"dijkstra": 0, "astar": 0}
+    for a, b in pairs:
+        plain, minutes = _expansions(graph, a, b, None)
+        guided, guided_minutes = _expansions(graph, a, b, guide.towards(b))
+        assert minutes == guided_minutes, (a, b)
+        totals["dijkstra"] += plain
+        totals["astar"] += guided
+
+    t_plain = _per_query_us(rail_helpers.shortest_path, [(graph, a, b) for a, b in pairs])
+    t_guided = _per_query_us(rail_helpers.shortest_path, [(graph, a, b, guide) for a, b in pairs])
+    n = len(pairs)
+    print(f"{label} (speed bound {guide.speed:.2f} units/min)")
+    print(f"{'':28s}{'expanded/q':>12s}{'us/q':>10s}")
+    print(f"{'Dijkstra':28s}{totals['dijkstra'] / n:12.0f}{t_plain:10.0f}")
+    print(f"{'A* (coordinates)':28s}{totals['astar'] / n:12.0f}{t_guided:10.0f}")
+
+
+def bench_astar_real(here, num_pairs=30, seed=4):
+    """A* on rail_routes.csv with station_coords.csv, long trips only."""
+    graph, _, _ = rail_helpers.load_rail_network(os.path.join(here, "rail_routes.csv"))
+    coords = {}
+    with open(os.path.join(here, "station_coords.csv"), newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            coords[row["station"]] = (float(row["x"]), float(row["y"]))
+
+    bench_astar(graph, coords, [("Llyn-by-the-Sea", "Airport Terminal 3")],
+                "Llyn-by-the-Sea -> Airport Terminal 3")
+    # The longest trips by straight-line distance
+    rng = random.Random(seed)
+    stations = list(graph)
+    candidates = [(rng.choice(stations), rng.choice(stations)) for _ in range(20 * num_pairs)]
+    candidates.sort(key=lambda p: -math.hypot(coords[p[0]][0] - coords[p[1]][0],
+                                              coords[p[0]][1] - coords[p[1]][1]))
+    print()
+    bench_astar(graph, coords, candidates[:num_pairs], f"{num_pairs} long rail_routes.csv trips")
+
+
+def bench_journey_matrix(path, num_origins=10, num_destinations=50, seed=6):
+    """Per-pair shortest_path vs journey_matrix (one search per origin, then a pool)."""
+    index = rail_helpers.load_network_index(path)
+    rng = random.Random(seed)
+    origins = rng.sample(index.stations, num_origins)
+    destinations = rng.sample(index.stations, num_destinations)
+
+    t0 = time.perf_counter()
+    for a in origins:
+        for b in destinations:
+            rail_helpers.shortest_path(index, a, b)
+    per_pair = time.perf_counter() - t0
+
+    print(f"{num_origins} x {num_destinations} matrix")
+    print(f"{'per-pair shortest_path':28s}{per_pair:10.2f}s")
+    for jobs in sorted({1, os.cpu_count() or 1}):
+        t0 = time.perf_counter()
+        rail_helpers.journey_matrix(index, origins, destinations, jobs=jobs, interchanges=True)
+        print(f"{'journey_matrix jobs=%d' % jobs:28s}{time.perf_counter() - t0:10.2f}s")
+
+
+
+def bench_reachable(path, minutes=30, num_origins=5, seed=7):
+    """shortest_path() to every station vs one bounded reachable_within() search."""
+    index = rail_helpers.load_network_index(path)
+    rng = random.Random(seed)
+    origins = rng.sample(index.stations, num_origins)
+
+    t0 = time.perf_counter()
+    for origin in origins:
+        journeys = (rail_helpers.shortest_path(index, origin, station) for station in index.stations)
+        [j for j in journeys if j is not None and j['total_time'] <= minutes]
+    loop = (time.perf_counter() - t0) / num_origins
+    t0 = time.perf_counter()
+    reached = [rail_helpers.reachable_within(index, origin, minutes) for origin in origins]
+    bounded = (time.perf_counter() - t0) / num_origins
+    average = sum(len(r) for r in reached) / num_origins
+
+    print(f"{minutes} min from {num_origins} origins ({average:.0f} stations reached on average)")
+    print(f"{'':28s}{'ms/origin':>12s}")
+    print(f"{'shortest_path per station':28s}{loop * 1e3:12.1f}")
+    print(f"{'reachable_within':28s}{bounded * 1e3:12.1f}")
+
+    matrix = rail_helpers.journey_matrix(index, origins, index.stations, interchanges=True)
+    t0 = time.perf_counter()
+    rail_helpers.isochrones(matrix, minutes)
+    print(f"{'isochrones (matrix built)':28s}{(time.perf_counter() - t0) / num_origins * 1e3:12.1f}")
+
+
+
+def bench_query_cache(path, num_queries=3000, seed=8):
+    """Repeated station_info / lines_at_station / edges_for_operator calls, cache off vs on."""
+    graph, operators, _ = rail_helpers.load_rail_network(path)
+    rng = random.Random(seed)
+    stations = list(graph)
+    calls = []
+    for _ in range(num_queries):
+        kind = rng.randrange(3)
+        if kind == 0:
+            calls.append((rail_helpers.station_info, (graph, rng.choice(stations))))
+        elif kind == 1:
+            calls.append((rail_helpers.lines_at_station, (graph, rng.choice(stations))))
+        else:
+            calls.append((rail_helpers.edges_for_operator, (graph, rng.choice(operators))))
+
+    cache = rail_helpers.QUERY_CACHE
+    saved = cache.maxsize
+    print(f"{num_queries} mixed queries on {len(stations)} stations")
+    print(f"{'':28s}{'us/q':>10s}{'hits':>8s}{'misses':>8s}")
+    for label, maxsize in (("cache off", 0), ("cache on", rail_helpers.QUERY_CACHE_SIZE)):
+        cache.clear()
+        cache.maxsize = maxsize
+        us = _per_query_us(lambda fn, args: fn(*args), calls)
+        stats = cache.stats()
+        print(f"{label:28s}{us:10.1f}{stats['hits']:8d}{stats['misses']:8d}")
+    cache.clear()
+    cache.maxsize = saved
+
+
+def bench_station_bitsets(path, num_pairs=5000, seed=9):
+    """Common lines / shared neighbours / operator pairs: set building vs bitmask AND."""
+    graph, operators, _ = rail_helpers.load_rail_network(path)
+    t0 = time.perf_counter()
+    bitsets = rail_helpers.StationBitsets.from_graph(graph)
+    build = (time.perf_counter() - t0) * 1e3
+    rng = random.Random(seed)
+    stations = list(graph)
+    pairs = [(rng.choice(stations), rng.choice(stations)) for _ in range(num_pairs)]
+    op_pairs = [(rng.choice(operators), rng.choice(operators)) for _ in range(200)]
+
+    def sets_common_lines(a, b):
+        return sorted({e["line"] for e in graph[a]} & {e["line"] for e in graph[b]})
+
+    def sets_shared_neighbours(a, b):
+        return sorted({e["to"] for e in graph[a]} & {e["to"] for e in graph[b]})
+
+    def sets_served_by(x, y):
+        return sorted(s for s, edges in graph.items()
+                      if {x, y} <= {e["operator"] for e in edges})
+
+    print(f"{len(stations)} stations, bitsets built in {build:.1f} ms")
+    print(f"{'':28s}{'sets us/q':>10s}{'bits us/q':>10s}{'speed-up':>10s}")
+    for label, slow, fast, args in (
+            ("common lines", sets_common_lines, bitsets.common_lines, pairs),
+            ("shared neighbours", sets_shared_neighbours, bitsets.shared_neighbours, pairs),
+            ("served by operators X & Y", sets_served_by,
+             lambda x, y: bitsets.stations_served_by([x, y]), op_pairs)):
+        assert all(slow(*a) == fast(*a) for a in args[:200])
+        t_slow = _per_query_us(slow, args)
+        t_fast = _per_query_us(fast, args)
+        print(f"{label:28s}{t_slow:10.1f}{t_fast:10.1f}{t_slow / t_fast:10.1f}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    # Time the searches themselves, not repeated cache hits
+    rail_helpers.QUERY_CACHE.maxsize = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, f"synthetic_{size}.csv")
+        coords = synthetic_network.write_network_csv(csv_path, size)
+
+        print("=" * 70)
+        print(f"NetworkIndex vs dict graph ({size:,} stations)")
+        print("=" * 70)
+        bench_network_index(csv_path)
+
+        print()
+        print("=" * 70)
+        print("shortest_path: legacy vs line-aware parent pointers")
+        print("=" * 70)
+        bench_shortest_path(csv_path)
+
+        print()
+        print("=" * 70)
+        print("k_best_journeys vs shortest_path")
+        print("=" * 70)
+        bench_k_best(csv_path)
+
+        print()
+        print("=" * 70)
+        print("A* guided by station coordinates vs Dijkstra")
+        print("=" * 70)
+        bench_astar_real(os.path.dirname(os.path.abspath(__file__)))
+        print()
+        graph, _, _ = rail_helpers.load_rail_network(csv_path)
+        rng = random.Random(5)
+        stations = list(graph)
+        pairs = [(rng.choice(stations), rng.choice(stations)) for _ in range(20)]
+        bench_astar(graph, coords, pairs, f"20 random trips, {size:,} synthetic stations")
+
+        print()
+        print("=" * 70)
+        print("journey_matrix vs per-pair shortest_path")
+        print("=" * 70)
+        bench_journey_matrix(csv_path)
+
+        print()
+        print("=" * 70)
+        print("reachable_within vs shortest_path to every station")
+        print("=" * 70)
+        bench_reachable(os.path.join(os.path.dirname(os.path.abspath(__file__)), "rail_routes.csv"))
+
+        print()
+        print("=" * 70)
+        print("Query cache on repeated helper calls")
+        print("=" * 70)
+        bench_query_cache(os.path.join(os.path.dirname(os.path.abspath(__file__)), "rail_routes.csv"))
+
+        print()
+        print("=" * 70)
+        print("StationBitsets vs per-call Python sets")
+        print("=" * 70)
+        bench_station_bitsets(os.path.join(os.path.dirname(os.path.abspath(__file__)), "rail_routes.csv"))
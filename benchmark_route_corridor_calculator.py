@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark RouteCorridorCalculator corridor computation: the station ->
+(route, position) index vs the original scan of every route.
+
+Usage:
+    python3 benchmark_route_corridor_calculator.py [rounds] [synthetic_routes]
+
+Computes the corridor of every route (calculate_route_corridor) and the
+all-corridors comparison for every ordered station pair on a route
+(get_all_corridors_between); results are checked to agree first. Then
+times shortest_station_path over every station pair: the original
+path-copying BFS, the parent-pointer BFS and HopMatrix next-hop walks,
+and routes_passing for every station: scanning all corridors vs SkipIndex.
+Finally builds the all-pairs ServiceOverlap for a synthetic network
+(default 1000 routes) and times it against pairwise set intersections.
+"""
+
+import time
+
+from network_model import NetworkModel
+from route_corridor_calculator import RouteCorridorCalculator, ServiceOverlap, SkipIndex
+from test_route_corridor_calculator import (ScanCorridorCalculator, calc, path_copy_bfs, set_overlap,
+                                            synthetic_corridors)
+
+
+def _best_of(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _all_routes(calculator):
+    for route_code in calculator.routes:
+        calculator.calculate_route_corridor(route_code)
+
+
+def _all_pairs(calculator, pairs):
+    for a, b in pairs:
+        calculator.get_all_corridors_between(a, b)
+
+
+if __name__ == "__main__":
+    import sys
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    synthetic_routes = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    scan = ScanCorridorCalculator()
+    pairs = sorted({(a, b) for entries in calc.routes.values()
+                    for i, a in enumerate(entries.get('stations', []))
+                    for b in entries['stations'][i + 1:] if a != b})
+
+    mismatches = sum(calc.calculate_route_corridor(r) != scan.calculate_route_corridor(r)
+                     for r in calc.routes)
+    mismatches += sum(calc.get_all_corridors_between(a, b) != scan.get_all_corridors_between(a, b)
+                      for a, b in pairs)
+
+    model = NetworkModel(knowledge_base=calc.routes_file)
+    model.route_positions  # Parse the JSON first; time only the index
+    t0 = time.perf_counter()
+    model.station_routes
+    build = time.perf_counter() - t0
+
+    rows = [
+        (f"all {len(calc.routes)} route corridors",
+         _best_of(lambda: _all_routes(scan), rounds), _best_of(lambda: _all_routes(calc), rounds)),
+        (f"{len(pairs):,} station-pair comparisons",
+         _best_of(lambda: _all_pairs(scan, pairs), rounds), _best_of(lambda: _all_pairs(calc, pairs), rounds)),
+    ]
+
+    print("=" * 70)
+    print("Corridor computation: station index vs route scan")
+    print("=" * 70)
+    print(f"station index build: {build * 1000:.1f} ms")
+    print(f"{'':34s}{'scan ms':>10s}{'index ms':>10s}{'speed-up':>10s}")
+    for label, t_scan, t_index in rows:
+        print(f"{label:34s}{t_scan * 1000:10.1f}{t_index * 1000:10.1f}{t_scan / t_index:10.1f}")
+    print(f"{'mismatches':34s}{mismatches:10d}")
+
+    graph = calc.network_graph
+    stations = sorted(graph)
+    bfs = RouteCorridorCalculator()
+    walk = RouteCorridorCalculator()
+    t0 = time.perf_counter()
+    walk.hop_matrix()
+    build_matrix = time.perf_counter() - t0
+
+    def all_station_paths(fn):
+        return lambda: [fn(a, b) for a in stations for b in stations]
+
+    t_copy = _best_of(all_station_paths(lambda a, b: path_copy_bfs(graph, a, b)), rounds)
+    t_parent = _best_of(all_station_paths(bfs.shortest_station_path), rounds)
+    t_walk = _best_of(all_station_paths(walk.shortest_station_path), rounds)
+
+    print()
+    print(f"{len(stations) ** 2:,} shortest_station_path queries")
+    print(f"HopMatrix build (one BFS per station): {build_matrix * 1000:.1f} ms")
+    print(f"{'':34s}{'ms':>10s}{'speed-up':>10s}")
+    for label, t in [("path-copying BFS", t_copy), ("parent-pointer BFS", t_parent),
+                     ("HopMatrix next hops", t_walk)]:
+        print(f"{label:34s}{t * 1000:10.1f}{t_copy / t:10.1f}")
+
+    skip_calc = RouteCorridorCalculator()
+    t0 = time.perf_counter()
+    skips = skip_calc.skip_index()
+    build_skips = time.perf_counter() - t0
+
+    def scan_passing():
+        corridors = [scan.calculate_route_corridor(code) for code in scan.routes
+                     if 'REMOVED' not in scan.routes[code].get('route_type', '')]
+        return [[c['route_code'] for c in corridors if station in c['skipped']]
+                for station in skips.stations]
+
+    t_scan = _best_of(scan_passing, rounds)
+    t_skips = _best_of(lambda: [skips.routes_passing(station) for station in skips.stations], rounds)
+    mismatches = sum(a != b for a, b in zip(scan_passing(), [skips.routes_passing(station)
+                                                             for station in skips.stations]))
+
+    print()
+    print(f"routes_passing for all {len(skips.stations)} stations "
+          f"(SkipIndex build {build_skips * 1000:.1f} ms)")
+    print(f"{'':34s}{'ms':>10s}{'speed-up':>10s}")
+    print(f"{'corridor scan':34s}{t_scan * 1000:10.1f}{1:10.1f}")
+    print(f"{'SkipIndex':34s}{t_skips * 1000:10.3f}{t_scan / t_skips:10.0f}")
+    print(f"{'mismatches':34s}{mismatches:10d}")
+
+    corridors = synthetic_corridors(synthetic_routes)
+    t0 = time.perf_counter()
+    synthetic_skips = SkipIndex.from_corridors(corridors)
+    t_index = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    overlap = ServiceOverlap.from_skip_index(synthetic_skips)
+    t_overlap = time.perf_counter() - t0
+
+    # Set intersections on a sample of pairs, scaled to all pairs
+    codes = overlap.routes
+    sample = [(codes[i], codes[(i * 7 + 3) % len(codes)]) for i in range(len(codes))]
+    t0 = time.perf_counter()
+    expected = [set_overlap(corridors[a], corridors[b]) for a, b in sample]
+    t_sets = (time.perf_counter() - t0) / len(sample) * len(codes) * (len(codes) + 1) / 2
+    mismatches = sum(overlap.pair(a, b) != e for (a, b), e in zip(sample, expected))
+
+    print()
+    print(f"ServiceOverlap: {len(codes):,} synthetic routes, {len(codes) * (len(codes) + 1) // 2:,} pairs, "
+          f"{len(overlap.segments):,} segments")
+    print(f"{'':34s}{'s':>10s}{'speed-up':>10s}")
+    print(f"{'set intersections (est.)':34s}{t_sets:10.2f}{1:10.1f}")
+    print(f"{'SkipIndex + bitmask overlap':34s}{t_index + t_overlap:10.2f}"
+          f"{t_sets / (t_index + t_overlap):10.1f}")
+    print(f"{'mismatches (sampled pairs)':34s}{mismatches:10d} of {len(sample)}")
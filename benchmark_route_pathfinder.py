@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark RoutePathfinder.find_routes: label-setting search vs the old BFS.
+
+Usage:
+    python3 benchmark_route_pathfinder.py [legacy_max_transfers]
+
+Hub-to-hub queries are timed for max_transfers 0-5 with peak traced memory,
+along with the time iter_routes() takes to yield its first route.
+The old BFS grows so fast that it is only run up to legacy_max_transfers
+(default 2); its fastest route per query is checked against the new one.
+"""
+
+import time
+import tracemalloc
+from collections import deque
+
+from route_pathfinder import RoutePathfinder, load_routes
+
+PAIRS = [("Stepford Central", "Benton"),
+         ("Llyn-by-the-Sea", "Airport Terminal 3"),
+         ("St Helens Bridge", "Leighton City")]
+
+
+def legacy_find_routes(pathfinder, start, end, max_transfers=2):
+    """The original BFS from find_routes(), kept for comparison."""
+    queue = deque([(start, [start], [], None, 0, 0.0)])
+    all_paths = []
+    visited_states = set()
+    best_time_by_transfers = {}
+
+    while queue:
+        current, path, routes_used, current_route, transfers, current_time = queue.popleft()
+        if any(t in best_time_by_transfers and current_time > best_time_by_transfers[t] * 1.5
+               for t in range(transfers + 1)):
+            continue
+        state = (current, tuple(r['route'] for r in routes_used), transfers)
+        if state in visited_states:
+            continue
+        visited_states.add(state)
+
+        if current == end:
+            total_time = sum(r['time'] for r in routes_used)
+            all_paths.append({'time': total_time, 'transfers': transfers,
+                              'path': path, 'routes': routes_used})
+            if transfers not in best_time_by_transfers or total_time < best_time_by_transfers[transfers]:
+                best_time_by_transfers[transfers] = total_time
+            continue
+        if transfers > max_transfers or len(path) > 15:
+            continue
+
+        visited_in_path = set(path)
+        for edge in pathfinder.graph.get(current, []):
+            next_station = edge['to']
+            if next_station in visited_in_path:
+                continue
+            new_transfers = transfers
+            if current_route is not None and edge['route'] != current_route:
+                new_transfers += 1
+            if new_transfers <= max_transfers:
+                queue.append((next_station, path + [next_station], routes_used + [edge],
+                              edge['route'], new_transfers, current_time + edge['time']))
+        if len(all_paths) > 1000:
+            break
+
+    all_paths.sort(key=lambda x: (x['transfers'], x['time']))
+    return all_paths[:100]
+
+
+def _measure(fn, *args):
+    """Return (result, seconds, peak MB); timed and traced in separate runs."""
+    t0 = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+if __name__ == "__main__":
+    import sys
+
+    legacy_max = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    pathfinder = RoutePathfinder(load_routes())
+
+    print("=" * 86)
+    print("find_routes / iter_routes: label-setting vs BFS (hub-to-hub)")
+    print("=" * 86)
+    print(f"{'query':40s}{'k':>2s}{'first ms':>9s}{'new ms':>9s}{'MB':>6s}{'labels':>8s}"
+          f"{'old ms':>10s}{'MB':>7s}")
+    for max_transfers in range(6):
+        for start, end in PAIRS:
+            t0 = time.perf_counter()
+            next(pathfinder.iter_routes(start, end, max_transfers), None)
+            first = time.perf_counter() - t0
+            routes, seconds, peak = _measure(pathfinder.find_routes, start, end, max_transfers)
+            labels = pathfinder.last_search['labels']
+            line = (f"{start[:18] + ' -> ' + end[:18]:40s}{max_transfers:2d}{first * 1e3:9.1f}"
+                    f"{seconds * 1e3:9.1f}{peak:6.1f}{labels:8d}")
+            if max_transfers <= legacy_max:
+                old, old_seconds, old_peak = _measure(legacy_find_routes, pathfinder, start, end, max_transfers)
+                line += f"{old_seconds * 1e3:10.0f}{old_peak:7.1f}"
+                if old and (not routes or min(r['time'] for r in routes) > min(r['time'] for r in old) + 1e-9):
+                    line += "  SLOWER THAN OLD"
+            else:
+                line += f"{'-':>10s}{'-':>7s}"
+            print(line)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming station knowledge parser against the original
+DOTALL regex on scr_stations_full_content.md.
+
+Usage:
+    python3 benchmark_station_knowledge.py [rounds] [copies]
+
+The file is also parsed with its stations repeated `copies` times (default
+10) to show how both scale; the records are checked to agree first.
+Finally compares a cold session (parse both parts, then run the
+per-station info/platform extractors for every station) with loading the
+hash-keyed snapshot.
+"""
+
+import io
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+
+import station_knowledge_helper as skh
+from test_station_knowledge import FULL, PART1, PART2, STATION_PATTERN, regex_load_station_knowledge
+
+
+def _best_of(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _peak_kb(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def _stream_file(path):
+    with open(path, encoding="utf-8") as f:
+        return {record['name']: record for record in skh.iter_station_records(f)}
+
+
+if __name__ == "__main__":
+    import sys
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    with open(FULL, encoding="utf-8") as f:
+        content = f.read()
+    body = content[content.index("## Station"):]
+    repeated = content + body * (copies - 1)
+
+    mismatches = int(_stream_file(FULL) != regex_load_station_knowledge(FULL))
+    regex_count = len(re.findall(STATION_PATTERN, repeated, re.DOTALL))
+    stream_count = sum(1 for _ in skh.iter_station_records(io.StringIO(repeated)))
+    mismatches += int(regex_count != stream_count)
+
+    rows = [
+        (f"full file ({len(content) / 1024:.0f} KB)",
+         _best_of(lambda: regex_load_station_knowledge(FULL), rounds),
+         _best_of(lambda: _stream_file(FULL), rounds)),
+        (f"x{copies} in memory ({len(repeated) / 1024:.0f} KB)",
+         _best_of(lambda: re.findall(STATION_PATTERN, repeated, re.DOTALL), rounds),
+         _best_of(lambda: list(skh.iter_station_records(io.StringIO(repeated))), rounds)),
+    ]
+
+    print("=" * 70)
+    print("Station knowledge parsing: streaming parser vs DOTALL regex")
+    print("=" * 70)
+    print(f"{'':30s}{'regex ms':>10s}{'stream ms':>10s}{'speed-up':>10s}")
+    for label, t_regex, t_stream in rows:
+        print(f"{label:30s}{t_regex * 1000:10.1f}{t_stream * 1000:10.1f}{t_regex / t_stream:10.1f}")
+    print(f"{'peak memory, full file (KB)':30s}{_peak_kb(lambda: regex_load_station_knowledge(FULL)):10.0f}"
+          f"{_peak_kb(lambda: _stream_file(FULL)):10.0f}")
+    print(f"{'mismatches':30s}{mismatches:10d}")
+
+    def session(**kwargs):
+        stations = skh.load_station_knowledge(PART1, PART2, **kwargs)
+        for station in stations.values():
+            skh.extract_station_info(station)
+            skh.get_platform_summary(station)
+            skh.build_route_platform_map(station)
+            skh.build_directional_platform_map(station)
+        return stations
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def cold():
+            skh._DERIVED.clear()
+            return session(use_snapshot=False)
+
+        def warm():
+            skh._DERIVED.clear()
+            return session(cache_dir=tmp)
+
+        t0 = time.perf_counter()
+        skh.build_station_snapshot(PART1, PART2, cache_dir=tmp)
+        t_build = time.perf_counter() - t0
+        size = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+        t_cold = _best_of(cold, rounds)
+        t_load = _best_of(lambda: skh.load_station_knowledge(PART1, PART2, cache_dir=tmp), rounds)
+        t_warm = _best_of(warm, rounds)
+        snapshot_mismatches = int(cold() != warm())
+    skh._DERIVED.clear()
+
+    print()
+    print(f"Snapshot: built in {t_build * 1000:.0f} ms, {size / 1024:.0f} KB")
+    print(f"{'':30s}{'ms':>10s}{'speed-up':>10s}")
+    print(f"{'cold parse + extractors':30s}{t_cold * 1000:10.1f}{1:10.1f}")
+    print(f"{'snapshot load':30s}{t_load * 1000:10.1f}{t_cold / t_load:10.1f}")
+    print(f"{'snapshot load + extractors':30s}{t_warm * 1000:10.1f}{t_cold / t_warm:10.1f}")
+    print(f"{'mismatches':30s}{snapshot_mismatches:10d}")
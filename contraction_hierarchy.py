@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Contraction hierarchy over the station/line state graph
+========================================================
+Optional preprocessing for very large (synthetic) networks, where a
+per-query Dijkstra in rail_helpers becomes the bottleneck.
+
+The line-aware cost model of rail_helpers.shortest_path() is turned into a
+plain weighted digraph with one node per station ("hub") and one per
+(station, line) pair ("platform"):
+
+    platform (u, L) -> platform (v, L)   travel time of the segment
+    hub u -> platform (u, L)             0 (boarding)
+    platform (u, L) -> hub u             INTERCHANGE_PENALTY (alighting)
+
+A journey hub(start) -> hub(end) alights once per line it rides, so its
+cost is the shortest_path() time plus one penalty. Nodes are contracted in
+order of importance, adding shortcuts where needed, and queries run a
+bidirectional Dijkstra that only climbs the hierarchy.
+
+Usage:
+    import contraction_hierarchy
+    ch = contraction_hierarchy.load_contraction_hierarchy("rail_routes.csv")
+    ch.shortest_path("Benton", "Llyn-by-the-Sea")   # same format as rail_helpers
+
+    python3 contraction_hierarchy.py [rail_routes.csv]   # build and cache
+"""
+
+import heapq
+import os
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import rail_helpers
+from rail_helpers import INTERCHANGE_PENALTY, NetworkIndex
+
+HIERARCHY_VERSION = 1
+
+# Edge "mid" codes: >= 0 is a shortcut via that node, BOARD_ALIGHT is a
+# hub/platform edge, and anything below encodes a ride edge as -(eid + 2)
+BOARD_ALIGHT = -1
+
+WITNESS_SETTLE_LIMIT = 60  # nodes a witness search may settle before giving up
+
+
+def _ride_mid(eid: int) -> int:
+    return -(eid + 2)
+
+
+def _state_graph(index: NetworkIndex) -> Tuple[List[Dict], array, array]:
+    """
+    Build the hub/platform digraph for a NetworkIndex.
+
+    Returns:
+        Tuple of (out_adj, node_station, node_line) where out_adj[node] maps
+        neighbour -> (weight, mid), and node_station/node_line give each
+        node's station ID and line ID (-1 for hubs, which are nodes 0..S-1)
+    """
+    num_stations = len(index.stations)
+    node_station = array("i", range(num_stations))
+    node_line = array("i", [-1]) * num_stations
+    out_adj: List[Dict[int, Tuple[float, int]]] = [{} for _ in range(num_stations)]
+    platforms: Dict[Tuple[int, int], int] = {}
+
+    def platform(station: int, line: int) -> int:
+        node = platforms.get((station, line))
+        if node is None:
+            node = platforms[(station, line)] = len(out_adj)
+            node_station.append(station)
+            node_line.append(line)
+            out_adj.append({station: (INTERCHANGE_PENALTY, BOARD_ALIGHT)})
+            out_adj[station][node] = (0.0, BOARD_ALIGHT)
+        return node
+
+    for station in range(num_stations):
+        for target, line, time, eid in index.out_edges(station):
+            a = platform(station, line)
+            b = platform(target, line)
+            current = out_adj[a].get(b)
+            if current is None or time < current[0]:
+                out_adj[a][b] = (time, _ride_mid(eid))
+
+    return out_adj, node_station, node_line
+
+
+class _Contractor:
+    """Node-ordering and shortcut bookkeeping while the hierarchy is built."""
+
+    def __init__(self, out_adj: List[Dict]):
+        self.out_adj = out_adj
+        self.in_adj: List[Dict[int, float]] = [{} for _ in out_adj]
+        for u, edges in enumerate(out_adj):
+            for w, (weight, _) in edges.items():
+                self.in_adj[w][u] = weight
+        self.contracted = bytearray(len(out_adj))
+        self.deleted_neighbours = array("i", [0]) * len(out_adj)
+        self.level = array("i", [0]) * len(out_adj)
+
+    def _witness(self, source: int, skip: int, limit: float) -> Dict[int, float]:
+        """Distances from source avoiding skip, up to limit or the settle budget."""
+        out_adj = self.out_adj
+        contracted = self.contracted
+        dist = {source: 0.0}
+        pq = [(0.0, source)]
+        settled = 0
+        while pq and settled < WITNESS_SETTLE_LIMIT:
+            d, node = heapq.heappop(pq)
+            if d > dist[node]:
+                continue
+            if d > limit:
+                break
+            settled += 1
+            for nxt, (weight, _) in out_adj[node].items():
+                if nxt == skip or contracted[nxt]:
+                    continue
+                nd = d + weight
+                if nd < dist.get(nxt, float("inf")):
+                    dist[nxt] = nd
+                    heapq.heappush(pq, (nd, nxt))
+        return dist
+
+    def shortcuts(self, v: int) -> List[Tuple[int, int, float]]:
+        """Shortcuts (u, w, weight) needed to contract v without changing distances."""
+        outs = self.out_adj[v]
+        needed = []
+        if not outs:
+            return needed
+        max_out = max(weight for weight, _ in outs.values())
+        for u, in_weight in self.in_adj[v].items():
+            dist = self._witness(u, v, in_weight + max_out)
+            for w, (out_weight, _) in outs.items():
+                if w == u:
+                    continue
+                through = in_weight + out_weight
+                if dist.get(w, float("inf")) > through:
+                    needed.append((u, w, through))
+        return needed
+
+    def priority(self, v: int) -> int:
+        """
+        Edge difference plus contracted neighbours plus depth: cheap, local
+        nodes go first, and contraction spreads evenly over the network
+        instead of stacking long chains of nodes on top of each other.
+        """
+        degree = len(self.out_adj[v]) + len(self.in_adj[v])
+        return (2 * (len(self.shortcuts(v)) - degree) + self.deleted_neighbours[v]
+                + self.level[v])
+
+    def contract(self, v: int) -> Tuple[List, List]:
+        """Contract v; return its (upward out edges, upward in edges) with mids."""
+        out_adj, in_adj = self.out_adj, self.in_adj
+        for u, w, weight in self.shortcuts(v):
+            current = out_adj[u].get(w)
+            if current is None or weight < current[0]:
+                out_adj[u][w] = (weight, v)
+                in_adj[w][u] = weight
+
+        up_out = [(w, weight, mid) for w, (weight, mid) in out_adj[v].items()]
+        up_in = [(u, weight, out_adj[u][v][1]) for u, weight in in_adj[v].items()]
+        level = self.level[v] + 1
+        for w in out_adj[v]:
+            del in_adj[w][v]
+            self.deleted_neighbours[w] += 1
+            self.level[w] = max(self.level[w], level)
+        for u in in_adj[v]:
+            del out_adj[u][v]
+            self.deleted_neighbours[u] += 1
+            self.level[u] = max(self.level[u], level)
+        out_adj[v] = {}
+        in_adj[v] = {}
+        self.contracted[v] = 1
+        return up_out, up_in
+
+
+def _csr(lists: List[List[Tuple[int, float, int]]]) -> Tuple[array, array, array, array]:
+    offsets = array("i", [0])
+    targets = array("i")
+    weights = array("d")
+    mids = array("i")
+    for edges in lists:
+        for target, weight, mid in edges:
+            targets.append(target)
+            weights.append(weight)
+            mids.append(mid)
+        offsets.append(len(targets))
+    return offsets, targets, weights, mids
+
+
+class ContractionHierarchy:
+    """
+    Preprocessed hierarchy answering rail_helpers.shortest_path() queries.
+
+    Build with from_index() (in memory) or load_contraction_hierarchy() (cached
+    on disk). Upward edges are stored CSR-style in flat arrays: ``up_*`` are
+    edges from a node to higher-ranked nodes, ``down_*`` are edges into a node
+    from higher-ranked nodes (walked backwards by the reverse search).
+    """
+
+    def __init__(self, index: NetworkIndex, node_station: array, node_line: array,
+                 rank: array, up: Tuple, down: Tuple, num_shortcuts: int):
+        self.index = index
+        self.node_station = node_station
+        self.node_line = node_line
+        self.rank = rank
+        self.up_offsets, self.up_targets, self.up_weights, self.up_mids = up
+        self.down_offsets, self.down_targets, self.down_weights, self.down_mids = down
+        self.num_shortcuts = num_shortcuts
+        self._adjacency = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_adjacency"] = None  # Rebuilt on first query; the arrays are the source
+        return state
+
+    def _query_adjacency(self) -> Tuple[List[Tuple], List[Tuple]]:
+        """Per-node tuples of (neighbour, weight) for the up and down edges."""
+        if self._adjacency is None:
+            def per_node(offsets, targets, weights):
+                return [tuple(zip(targets[offsets[i]:offsets[i + 1]],
+                                  weights[offsets[i]:offsets[i + 1]]))
+                        for i in range(len(offsets) - 1)]
+
+            # Iterating small tuples is much faster than slicing the arrays per visit
+            self._adjacency = (per_node(self.up_offsets, self.up_targets, self.up_weights),
+                               per_node(self.down_offsets, self.down_targets, self.down_weights))
+        return self._adjacency
+
+    @classmethod
+    def from_index(cls, index: NetworkIndex) -> "ContractionHierarchy":
+        """
+        Contract the state graph of a NetworkIndex.
+
+        Args:
+            index: NetworkIndex from rail_helpers.load_network_index()
+
+        Returns:
+            ContractionHierarchy for the network
+        """
+        out_adj, node_station, node_line = _state_graph(index)
+        contractor = _Contractor(out_adj)
+        num_nodes = len(out_adj)
+
+        pq = [(contractor.priority(v), v) for v in range(num_nodes)]
+        heapq.heapify(pq)
+        rank = array("i", [0]) * num_nodes
+        up_lists: List[List] = [[] for _ in range(num_nodes)]
+        down_lists: List[List] = [[] for _ in range(num_nodes)]
+        num_shortcuts = 0
+        next_rank = 0
+
+        while pq:
+            _, v = heapq.heappop(pq)
+            if contractor.contracted[v]:
+                continue
+            # Lazy update: re-queue if the priority went up since it was pushed
+            new_priority = contractor.priority(v)
+            if pq and new_priority > pq[0][0]:
+                heapq.heappush(pq, (new_priority, v))
+                continue
+            up_lists[v], down_lists[v] = contractor.contract(v)
+            num_shortcuts += sum(1 for _, _, mid in up_lists[v] if mid >= 0)
+            rank[v] = next_rank
+            next_rank += 1
+
+        return cls(index, node_station, node_line, rank, _csr(up_lists), _csr(down_lists),
+                   num_shortcuts)
+
+    def _edge_mid(self, a: int, b: int) -> int:
+        """Mid code of the hierarchy edge a -> b."""
+        if self.rank[a] < self.rank[b]:
+            offsets, targets, mids, node, other = self.up_offsets, self.up_targets, self.up_mids, a, b
+        else:
+            offsets, targets, mids, node, other = self.down_offsets, self.down_targets, self.down_mids, b, a
+        start = offsets[node]
+        try:
+            return mids[start + targets[start:offsets[node + 1]].index(other)]
+        except ValueError:
+            raise KeyError((a, b)) from None
+
+    def _unpack(self, nodes: List[int]) -> List[int]:
+        """Expand shortcuts along a node path; return the ride edge IDs in order."""
+        eids = []
+        stack = [(nodes[i], nodes[i + 1]) for i in range(len(nodes) - 2, -1, -1)]
+        while stack:
+            a, b = stack.pop()
+            mid = self._edge_mid(a, b)
+            if mid >= 0:
+                stack.append((mid, b))
+                stack.append((a, mid))
+            elif mid != BOARD_ALIGHT:
+                eids.append(-mid - 2)
+        return eids
+
+    def _search(self, source: int, target: int) -> Tuple[float, List[int]]:
+        """Bidirectional upward Dijkstra; returns (distance, hierarchy node path)."""
+        if source == target:
+            return 0.0, [source]
+        inf = float("inf")
+        up, down = self._query_adjacency()
+        # Side 0 climbs from the source along up edges, side 1 climbs from the
+        # target along down edges walked backwards. Each side "stalls" a node
+        # it reached suboptimally: if a higher node already reached by this
+        # side offers a shorter way in, the node can't be on a shortest path.
+        relax_edges = (up, down)
+        stall_edges = (down, up)
+        dists = ({source: 0.0}, {target: 0.0})
+        parents = ({source: None}, {target: None})
+        queues = ([(0.0, source)], [(0.0, target)])
+        best, meet = inf, None
+        heappop, heappush = heapq.heappop, heapq.heappush
+
+        while True:
+            fwd_min = queues[0][0][0] if queues[0] else inf
+            bwd_min = queues[1][0][0] if queues[1] else inf
+            if fwd_min >= best and bwd_min >= best:
+                break
+            side = 0 if fwd_min <= bwd_min else 1
+            dist, parent, pq = dists[side], parents[side], queues[side]
+            d, node = heappop(pq)
+            if d > dist[node]:
+                continue
+            other = dists[1 - side].get(node)
+            if other is not None and d + other < best:
+                best, meet = d + other, node
+
+            dist_get = dist.get
+            for x, w in stall_edges[side][node]:
+                dx = dist_get(x)
+                if dx is not None and dx + w < d:
+                    break
+            else:
+                for nxt, w in relax_edges[side][node]:
+                    nd = d + w
+                    if nd < dist_get(nxt, inf):
+                        dist[nxt] = nd
+                        parent[nxt] = node
+                        heappush(pq, (nd, nxt))
+
+        if meet is None:
+            return inf, []
+        path = []
+        node = meet
+        while node is not None:
+            path.append(node)
+            node = parents[0][node]
+        path.reverse()
+        node = parents[1][meet]
+        while node is not None:
+            path.append(node)
+            node = parents[1][node]
+        return best, path
+
+    def shortest_time(self, start: str, end: str) -> Optional[float]:
+        """Return the shortest_path() total time, or None if unknown/unreachable."""
+        a = self.index.station_id(start)
+        b = self.index.station_id(end)
+        if a is None or b is None:
+            return None
+        if a == b:
+            return 0
+        dist, _ = self._search(a, b)
+        return None if dist == float("inf") else dist - INTERCHANGE_PENALTY
+
+    def shortest_path(self, start: str, end: str) -> Optional[Dict]:
+        """
+        Answer rail_helpers.shortest_path() from the hierarchy.
+
+        Returns:
+            Journey dict in the same format, or None if no path exists. Among
+            equally fast journeys the one returned may differ.
+        """
+        index = self.index
+        a = index.station_id(start)
+        b = index.station_id(end)
+        if a is None or b is None:
+            return None
+        if a == b:
+            return {'stations': [start], 'total_time': 0, 'num_interchanges': 0, 'legs': []}
+
+        dist, path = self._search(a, b)
+        if not path:
+            return None
+
+        legs = []
+        stations = [start]
+        node = a
+        for eid in self._unpack(path):
+            legs.append(index.leg(node, eid))
+            node = index.targets[eid]
+            stations.append(index.stations[node])
+        changes = sum(1 for x, y in zip(legs, legs[1:]) if x['line'] != y['line'])
+        return {
+            'stations': stations,
+            'total_time': dist - INTERCHANGE_PENALTY,
+            'num_interchanges': changes,
+            'legs': legs
+        }
+
+
+def hierarchy_path(path: str, cache_dir: Optional[str], source_hash: str) -> str:
+    """Return the on-disk location of the hierarchy for a CSV with the given hash."""
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)),
+                                 rail_helpers.CACHE_DIR_NAME)
+    return os.path.join(cache_dir, f"contraction_hierarchy_{source_hash[:16]}.pkl")
+
+
+def load_contraction_hierarchy(path="rail_routes.csv",
+                               cache_dir: Optional[str] = None) -> ContractionHierarchy:
+    """
+    Load the cached hierarchy for a CSV, building and saving it if needed.
+
+    The file is keyed by the SHA-256 of the CSV (see rail_helpers.file_hash),
+    so an edited network is rebuilt rather than answered from a stale file.
+
+    Args:
+        path: Path to the rail_routes.csv file
+        cache_dir: Where to keep the hierarchy (default: .rail_cache next to the CSV)
+
+    Returns:
+        ContractionHierarchy for the network
+    """
+    source_hash = rail_helpers.file_hash(path)
+    cache_path = hierarchy_path(path, cache_dir, source_hash)
+    data = rail_helpers.read_cache_file(cache_path, HIERARCHY_VERSION, source_hash)
+    if data is not None:
+        return data["hierarchy"]
+
+    hierarchy = ContractionHierarchy.from_index(NetworkIndex.from_csv(path))
+    rail_helpers.write_cache_file(cache_path, {"version": HIERARCHY_VERSION, "source_hash": source_hash,
+                                               "hierarchy": hierarchy})
+    return hierarchy
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "rail_routes.csv"
+    t0 = time.perf_counter()
+    ch = load_contraction_hierarchy(csv_path)
+    print(f"✅ Hierarchy for {len(ch.index.stations):,} stations ready in "
+          f"{time.perf_counter() - t0:.1f}s ({len(ch.rank):,} nodes, "
+          f"{ch.num_shortcuts:,} shortcuts)")
@@ -11,10 +11,21 @@ Usage in GPT Python environment:
 """
 
 import csv
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from typing import Dict, List, Set, Tuple, Optional
 
 
+class RailGraph(dict):
+    """
+    The station -> edge list dict returned by load_rail_network().
+
+    Behaves exactly like a plain dict; it also carries its own LineIndex,
+    so the index lives and dies with the graph.
+    """
+
+    same_line_index: Optional["LineIndex"] = None
+
+
 def load_rail_network(path="rail_routes.csv") -> Tuple[Dict, List[str], List[str]]:
     """
     Load the rail network from CSV into a graph structure.
@@ -71,7 +82,139 @@ def load_rail_network(path="rail_routes.csv") -> Tuple[Dict, List[str], List[str
             operators.add(operator)
             lines.add(line)
 
-    return dict(graph), sorted(operators), sorted(lines)
+    graph = RailGraph(graph)
+    line_index(graph)  # Build the same-line index once, up front
+    return graph, sorted(operators), sorted(lines)
+
+
+class LineIndex:
+    """
+    Ordered stop sequence of every line, for O(1) same-line lookups.
+
+    A line whose edges form a single chain of stations gets:
+    - stops[line]: stations in order along the line
+    - positions[line]: station -> position in stops[line]
+    - forward_edges[line][k] / backward_edges[line][k]: the edge dict used
+      between stops k and k + 1, walking the line in stop order / in
+      reverse (times can differ by direction)
+
+    Lines with branches or loops are left out and handled by BFS.
+    line_edges[station] maps each line at a station to the edge dict that
+    describes the service there (the last one listed, as before).
+    """
+
+    def __init__(self, graph: Dict):
+        self.line_edges: Dict[str, Dict[str, Dict]] = {
+            station: {edge["line"]: edge for edge in edges} for station, edges in graph.items()
+        }
+        self.stops: Dict[str, List[str]] = {}
+        self.positions: Dict[str, Dict[str, int]] = {}
+        self.forward_edges: Dict[str, List[Dict]] = {}
+        self.backward_edges: Dict[str, List[Dict]] = {}
+
+        # First edge per (station, line, neighbour): the one a BFS would take
+        first_edge = {}
+        neighbours = defaultdict(lambda: defaultdict(list))
+        for station, edges in graph.items():
+            for edge in edges:
+                key = (station, edge["line"], edge["to"])
+                if key not in first_edge:
+                    first_edge[key] = edge
+                    neighbours[edge["line"]][station].append(edge["to"])
+
+        for line_id, adjacency in neighbours.items():
+            stops = self._chain(adjacency)
+            if stops is None:
+                continue
+            forward_edges = []
+            backward_edges = []
+            for a, b in zip(stops, stops[1:]):
+                forward_edges.append(first_edge[(a, line_id, b)])
+                backward_edges.append(first_edge[(b, line_id, a)])
+            self.stops[line_id] = stops
+            self.positions[line_id] = {station: i for i, station in enumerate(stops)}
+            self.forward_edges[line_id] = forward_edges
+            self.backward_edges[line_id] = backward_edges
+
+    @staticmethod
+    def _chain(adjacency: Dict[str, List[str]]) -> Optional[List[str]]:
+        """Order a line's stations end to end, or None if they don't form one chain."""
+        for station, nbrs in adjacency.items():
+            if station in nbrs or len(nbrs) > 2 or any(station not in adjacency.get(n, ()) for n in nbrs):
+                return None
+        ends = [station for station, nbrs in adjacency.items() if len(nbrs) == 1]
+        if len(ends) != 2:
+            return None
+        stops = [ends[0]]
+        previous = None
+        while True:
+            nxt = [n for n in adjacency[stops[-1]] if n != previous]
+            if not nxt:
+                break
+            previous = stops[-1]
+            stops.append(nxt[0])
+        return stops if len(stops) == len(adjacency) else None
+
+    def ride(self, line_id: str, station_a: str, station_b: str) -> Optional[Tuple[List[str], float, List[Dict]]]:
+        """
+        Path, time and edges from station_a to station_b along an indexed line.
+
+        The time is summed over the edges in travel order, as the BFS does,
+        so float times come out identical (prefix-sum differences do not).
+
+        Returns:
+            Tuple of (path, total_time, edges) or None if the line isn't
+            indexed or doesn't serve both stations
+        """
+        positions = self.positions.get(line_id)
+        if positions is None:
+            return None
+        i = positions.get(station_a)
+        j = positions.get(station_b)
+        if i is None or j is None:
+            return None
+        stops = self.stops[line_id]
+        if i <= j:
+            path = stops[i:j + 1]
+            edges = self.forward_edges[line_id][i:j]
+        else:
+            path = stops[j:i + 1][::-1]
+            edges = self.backward_edges[line_id][j:i]
+            edges.reverse()
+        total_time = 0
+        for edge in edges:
+            total_time += edge["time"]
+        return path, total_time, edges
+
+
+# Indexes for graphs not built by load_rail_network(), most recent last:
+# graph id -> (graph, LineIndex); the graph is kept so its id can't be reused
+LINE_INDEX_CACHE_SIZE = 8
+_LINE_INDEXES: "OrderedDict[int, Tuple[Dict, LineIndex]]" = OrderedDict()
+
+
+def line_index(graph: Dict) -> LineIndex:
+    """
+    Return the LineIndex for a graph, building it on first use.
+
+    load_rail_network() builds it straight away and keeps it on the graph.
+    Other dicts share a small LRU of the last LINE_INDEX_CACHE_SIZE graphs,
+    so discarded graphs are not kept alive. Treat the graph as read-only
+    afterwards; reload the CSV to change the network.
+    """
+    if isinstance(graph, RailGraph):
+        if graph.same_line_index is None:
+            graph.same_line_index = LineIndex(graph)
+        return graph.same_line_index
+
+    entry = _LINE_INDEXES.get(id(graph))
+    if entry is None or entry[0] is not graph:
+        entry = _LINE_INDEXES[id(graph)] = (graph, LineIndex(graph))
+        if len(_LINE_INDEXES) > LINE_INDEX_CACHE_SIZE:
+            _LINE_INDEXES.popitem(last=False)
+    else:
+        _LINE_INDEXES.move_to_end(id(graph))
+    return entry[1]
 
 
 def operators_at_station(graph: Dict, station: str) -> List[str]:
@@ -311,12 +454,50 @@ def station_info(graph: Dict, station: str) -> Optional[Dict]:
     }
 
 
+def _trace_line_bfs(graph: Dict, station_a: str, station_b: str,
+                    line_id: str) -> Optional[Tuple[List[str], float, List[Dict]]]:
+    """
+    Breadth-first search from station_a to station_b using only edges of one line.
+
+    Used for lines with branches or loops, which LineIndex doesn't cover.
+
+    Returns:
+        Tuple of (path, total_time, edges) or None if the line doesn't connect them
+    """
+    from collections import deque
+
+    parent = {station_a: None}
+    queue = deque([station_a])
+    while queue:
+        current = queue.popleft()
+        if current == station_b:
+            edges = []
+            step = parent[current]
+            while step is not None:
+                edges.append(step[1])
+                step = parent[step[0]]
+            edges.reverse()
+            path = [station_a] + [edge["to"] for edge in edges]
+            total_time = 0
+            for edge in edges:
+                total_time += edge["time"]
+            return path, total_time, edges
+
+        for edge in graph[current]:
+            if edge["line"] == line_id and edge["to"] not in parent:
+                parent[edge["to"]] = (current, edge)
+                queue.append(edge["to"])
+    return None
+
+
 def services_on_same_line(graph: Dict, station_a: str, station_b: str) -> List[Dict]:
     """
     Find services where both stations are on the same line (multi-segment check).
     This checks if you can travel from A to B on the same line without changing trains.
 
-    IMPROVED: Now actually traces paths on each line to verify connectivity.
+    Uses the graph's LineIndex: the stations' positions along each common
+    line give the path and edges as slices, so no search is needed. Lines
+    with branches or loops fall back to a BFS.
 
     Args:
         graph: Network graph from load_rail_network()
@@ -326,63 +507,41 @@ def services_on_same_line(graph: Dict, station_a: str, station_b: str) -> List[D
     Returns:
         List of valid routes on the same line with path details
     """
-    from collections import deque
-
     if station_a not in graph or station_b not in graph:
         return []
 
-    # Get all lines serving station_a
-    lines_at_a = {edge["line"]: edge for edge in graph[station_a]}
-
-    # Get all lines serving station_b
-    lines_at_b = {edge["line"]: edge for edge in graph[station_b]}
-
-    # Find common lines
-    common_lines = set(lines_at_a.keys()) & set(lines_at_b.keys())
+    index = line_index(graph)
+    lines_at_a = index.line_edges[station_a]
+    lines_at_b = index.line_edges[station_b]
 
     services = []
-    for line_id in common_lines:
-        # For each common line, trace a path from A to B using only edges from that line
-        # Use BFS to find the path
-        queue = deque([(station_a, [station_a], 0, [])])
-        visited = {station_a}
-
-        while queue:
-            current, path, total_time, legs = queue.popleft()
-
-            if current == station_b:
-                # Found a valid path on this line
-                edge_info = lines_at_a[line_id]
-                services.append({
-                    'line': line_id,
-                    'operator': edge_info['operator'],
-                    'service_type': edge_info['service_type'],
-                    'route_origin': edge_info.get('route_origin', ''),
-                    'route_destination': edge_info.get('route_destination', ''),
-                    'path': path,
-                    'total_time': total_time,
-                    'legs': legs
-                })
-                break
+    for line_id in set(lines_at_a.keys()) & set(lines_at_b.keys()):
+        if line_id in index.positions:
+            found = index.ride(line_id, station_a, station_b)
+        else:
+            found = _trace_line_bfs(graph, station_a, station_b, line_id)
+        if found is None:
+            continue
 
-            # Explore neighbors on this line only
-            for edge in graph[current]:
-                if edge['line'] == line_id and edge['to'] not in visited:
-                    visited.add(edge['to'])
-                    new_legs = legs + [{
-                        'from': current,
-                        'to': edge['to'],
-                        'operator': edge['operator'],
-                        'line': edge['line'],
-                        'time': edge['time'],
-                        'service_type': edge['service_type']
-                    }]
-                    queue.append((
-                        edge['to'],
-                        path + [edge['to']],
-                        total_time + edge['time'],
-                        new_legs
-                    ))
+        path, total_time, edges = found
+        edge_info = lines_at_a[line_id]
+        services.append({
+            'line': line_id,
+            'operator': edge_info['operator'],
+            'service_type': edge_info['service_type'],
+            'route_origin': edge_info.get('route_origin', ''),
+            'route_destination': edge_info.get('route_destination', ''),
+            'path': path,
+            'total_time': total_time,
+            'legs': [{
+                'from': frm,
+                'to': edge['to'],
+                'operator': edge['operator'],
+                'line': edge['line'],
+                'time': edge['time'],
+                'service_type': edge['service_type']
+            } for frm, edge in zip(path, edges)]
+        })
 
     return services
 
@@ -1,6 +1,12 @@
 """
 Station Knowledge Helper - Parse scr_stations_part1.md and scr_stations_part2.md for detailed station info
 
+Version 3.5 - STREAMING PARSER AND SNAPSHOTS
+- Line-by-line station parser reports malformed blocks instead of dropping them
+- Parsed stations and per-station platform/info results can be saved to a
+  snapshot keyed by the markdown's SHA-256 (--build-snapshot) and are reused
+  while it is unchanged
+
 Version 3.4.1 - INTEGRATION FIXES FOR CUSTOM GPT
 - Fixed get_route_context() to pass csv_path parameter for terminal detection
 - Added fuzzy station name matching in get_station_details() for "(Station)" suffix
@@ -19,43 +25,327 @@ Version 3.3 - IMPROVED PLATFORM PARSING
 - More accurate route-to-platform mapping
 """
 
+import copy
+import hashlib
+import os
 import re
 
-def load_station_knowledge(filepath1="scr_stations_part1.md", filepath2="scr_stations_part2.md"):
+STATION_HEADER = re.compile(r'## Station \d+: (.+)')
+SEPARATOR_WIDTH = 80
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DIR_NAME = ".rail_cache"
+
+# (station name, full_content) -> precomputed per-station results from a snapshot
+_DERIVED = {}
+
+
+def _parse_station_block(name, lines):
     """
-    Load and parse the station content markdown files (split into 2 parts).
-    Returns a dictionary mapping station names to their full content.
+    Parse the lines of one station block (header line first).
+
+    Returns:
+        (record, problem) - the station dict, or None and a description of
+        the first missing or malformed field
     """
-    stations = {}
+    fields = {}
+    markers = {}
+    for i, line in enumerate(lines):
+        if line.startswith('**Page ID:**') and 'page_id' not in fields:
+            fields['page_id'] = line[len('**Page ID:**'):].strip()
+        elif line.startswith('**URL:**') and 'url' not in fields:
+            fields['url'] = line[len('**URL:**'):].strip()
+        elif line == '**Summary:**' and 'summary' not in markers:
+            markers['summary'] = i
+        elif line == '**Full Content:**' and 'full_content' not in markers:
+            markers['full_content'] = i
+
+    if not fields.get('page_id', '').isdigit():
+        return None, "missing or non-numeric **Page ID:**"
+    if not fields.get('url'):
+        return None, "missing **URL:**"
+    if 'summary' not in markers or 'full_content' not in markers \
+            or markers['summary'] > markers['full_content']:
+        return None, "missing **Summary:** / **Full Content:** sections"
+
+    summary = '\n'.join(lines[markers['summary'] + 1:markers['full_content']]).strip()
+    full_content = '\n'.join(lines[markers['full_content'] + 1:]).strip()
+    if not summary or not full_content:
+        return None, "empty summary or full content"
+
+    return {
+        'name': name,
+        'page_id': fields['page_id'],
+        'url': fields['url'],
+        'summary': summary,
+        'full_content': full_content
+    }, None
 
-    # Load both parts
-    for filepath in [filepath1, filepath2]:
+
+def iter_station_records(lines, errors=None):
+    """
+    Stream station records from the lines of a scr_stations markdown file.
+
+    Reads line by line: a '## Station N: Name' header opens a block and a
+    line of '=' characters closes it, so only one block is held at a time.
+    Malformed blocks are reported rather than dropped silently - a block
+    whose fields cannot be read is skipped, while a missing or misdrawn
+    separator is reported and the block is still returned.
+
+    Args:
+        lines: Any iterable of lines (e.g. an open file)
+        errors: Optional list; (line_number, station_name, problem) tuples
+                are appended to it for every malformed block
+
+    Yields:
+        Station dicts with name, page_id, url, summary and full_content
+    """
+    def finish(block, name, start):
+        record, problem = _parse_station_block(name, block)
+        if problem:
+            report(start, name, problem)
+        return record
+
+    def report(line_number, name, problem):
+        if errors is not None:
+            errors.append((line_number, name, problem))
+
+    block = None
+    name = None
+    start = 0
+    line_number = 0
+
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        header = STATION_HEADER.match(line) if line.startswith('## Station ') else None
+
+        if header:
+            if block is not None:
+                report(line_number, name, "no ==== separator before the next station")
+                record = finish(block, name, start)
+                if record:
+                    yield record
+            block = [line]
+            name = header.group(1).strip()
+            start = line_number
+        elif line.startswith('====') and not line.strip('='):
+            if block is None:
+                continue  # Separator after the file header
+            if len(line) != SEPARATOR_WIDTH:
+                report(line_number, name,
+                       f"separator is {len(line)} '=' wide, expected {SEPARATOR_WIDTH}")
+            record = finish(block, name, start)
+            if record:
+                yield record
+            block = None
+        elif block is not None:
+            block.append(line)
+
+    if block is not None:
+        report(line_number, name, "file ends without a ==== separator")
+        record = finish(block, name, start)
+        if record:
+            yield record
+
+
+def _parse_station_files(filepaths):
+    """
+    Parse the markdown files with iter_station_records().
+
+    Returns:
+        (stations, errors) - errors as (filepath, line_number, station_name, problem)
+    """
+    stations = {}
+    errors = []
+    for filepath in filepaths:
         try:
+            file_errors = []
             with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # Split by station headers (## Station N: Name)
-            pattern = r'## Station \d+: (.+?)\n\n\*\*Page ID:\*\* (\d+)\n\*\*URL:\*\* (.+?)\n\n\*\*Summary:\*\*\n(.+?)\n\n\*\*Full Content:\*\*\n\n(.+?)\n\n={80}'
-
-            matches = re.findall(pattern, content, re.DOTALL)
-
-            for match in matches:
-                station_name = match[0].strip()
-                page_id = match[1]
-                url = match[2]
-                summary = match[3].strip()
-                full_content = match[4].strip()
-
-                stations[station_name] = {
-                    'name': station_name,
-                    'page_id': page_id,
-                    'url': url,
-                    'summary': summary,
-                    'full_content': full_content
-                }
+                for record in iter_station_records(f, file_errors):
+                    stations[record['name']] = record
+            errors.extend((filepath,) + error for error in file_errors)
         except FileNotFoundError:
             print(f"Warning: {filepath} not found")
             continue
+    return stations, errors
+
+
+def _sources_hash(filepaths):
+    """SHA-256 over the contents of every source file, in order."""
+    digest = hashlib.sha256()
+    for filepath in filepaths:
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _read_snapshot_file(path, source_hash):
+    """
+    Load a pickled snapshot, as rail_helpers.read_cache_file() does.
+
+    Returns:
+        The snapshot dict, or None if the file is missing, unreadable,
+        truncated, stale or from another version
+    """
+    import pickle
+
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except OSError:
+        return None
+    except (pickle.UnpicklingError, EOFError, AttributeError, ValueError, ImportError, IndexError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION \
+            or snapshot.get('source_hash') != source_hash:
+        return None
+    return snapshot
+
+
+def _write_snapshot_file(path, snapshot):
+    """
+    Pickle a snapshot atomically, as rail_helpers.write_cache_file() does.
+
+    Writes to a per-process temporary file and renames it over path, so
+    concurrent builds never share a temporary file and readers see either
+    the old snapshot or the complete new one.
+    """
+    import pickle
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def snapshot_path(filepath1, cache_dir, source_hash):
+    """Return where the snapshot for sources with the given hash is stored."""
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(filepath1)), SNAPSHOT_DIR_NAME)
+    return os.path.join(cache_dir, f"station_knowledge_{source_hash[:16]}.pkl")
+
+
+def build_station_snapshot(filepath1="scr_stations_part1.md", filepath2="scr_stations_part2.md",
+                           cache_dir=None):
+    """
+    Parse the markdown once and save a snapshot keyed by its content hash.
+
+    Besides the station records, the snapshot holds each station's
+    extract_station_info, get_platform_summary, build_route_platform_map and
+    build_directional_platform_map results, so later sessions skip those
+    regexes too. Written to <cache_dir>/station_knowledge_<hash>.pkl
+    (cache_dir defaults to .rail_cache next to filepath1).
+
+    Returns:
+        The snapshot dict, or None if a source file is missing
+    """
+    try:
+        source_hash = _sources_hash([filepath1, filepath2])
+    except FileNotFoundError:
+        return None
+
+    stations, errors = _parse_station_files([filepath1, filepath2])
+    derived = {}
+    for name, station in stations.items():
+        derived[name] = {
+            'info': extract_station_info(station),
+            'platform_summary': get_platform_summary(station),
+            'route_platform_map': build_route_platform_map(station),
+            'directional_map': build_directional_platform_map(station),
+        }
+
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'source_hash': source_hash,
+        'stations': stations,
+        'errors': errors,
+        'derived': derived,
+    }
+
+    path = snapshot_path(filepath1, cache_dir, source_hash)
+    try:
+        _write_snapshot_file(path, snapshot)
+    except OSError as e:
+        print(f"Warning: could not write station snapshot {path}: {e}")
+
+    _register_derived(snapshot)
+    return snapshot
+
+
+def load_station_snapshot(filepath1="scr_stations_part1.md", filepath2="scr_stations_part2.md",
+                          cache_dir=None):
+    """
+    Load the snapshot for the current markdown contents, if one was built.
+
+    Returns:
+        The snapshot dict, or None when it is missing, unreadable (e.g. a
+        partial write), stale or from another version
+    """
+    try:
+        source_hash = _sources_hash([filepath1, filepath2])
+    except FileNotFoundError:
+        return None
+
+    snapshot = _read_snapshot_file(snapshot_path(filepath1, cache_dir, source_hash), source_hash)
+    if snapshot is None:
+        return None
+
+    _register_derived(snapshot)
+    return snapshot
+
+
+def _register_derived(snapshot):
+    for name, station in snapshot['stations'].items():
+        _DERIVED[(name, station['full_content'])] = snapshot['derived'][name]
+
+
+def _snapshot_result(station_data, field):
+    """Return a deep copy of a precomputed result for this station, or None."""
+    derived = _DERIVED.get((station_data.get('name'), station_data.get('full_content')))
+    if derived is None:
+        return None
+    return copy.deepcopy(derived[field])
+
+
+def load_station_knowledge(filepath1="scr_stations_part1.md", filepath2="scr_stations_part2.md",
+                           errors=None, cache_dir=None, use_snapshot=True, build_snapshot=False):
+    """
+    Load and parse the station content markdown files (split into 2 parts).
+    Returns a dictionary mapping station names to their full content.
+
+    With use_snapshot (the default) the parse comes from the snapshot for the
+    files' current contents when one has been built (see
+    build_station_snapshot), so repeat sessions load in milliseconds. A
+    missing, stale or unreadable snapshot falls back to parsing the markdown;
+    only with build_snapshot is a new snapshot written in that case.
+
+    Malformed station blocks are printed as warnings, or appended to errors
+    as (filepath, line_number, station_name, problem) when a list is given.
+    """
+    snapshot = None
+    if use_snapshot:
+        snapshot = load_station_snapshot(filepath1, filepath2, cache_dir)
+        if snapshot is None and build_snapshot:
+            snapshot = build_station_snapshot(filepath1, filepath2, cache_dir)
+
+    if snapshot is not None:
+        stations, parse_errors = snapshot['stations'], snapshot['errors']
+    else:
+        stations, parse_errors = _parse_station_files([filepath1, filepath2])
+
+    for error in parse_errors:
+        if errors is not None:
+            errors.append(error)
+        else:
+            filepath, line_number, name, problem = error
+            print(f"Warning: {filepath} line {line_number} ({name}): {problem}")
 
     return stations
 
@@ -128,6 +418,10 @@ def extract_station_info(station_data):
     Returns a dictionary with parsed fields like:
     - platforms, tracks, zone, location, accessibility, etc.
     """
+    precomputed = _snapshot_result(station_data, 'info')
+    if precomputed is not None:
+        return precomputed
+
     content = station_data['full_content']
     info = {
         'name': station_data['name'],
@@ -267,6 +561,10 @@ def get_platform_summary(station_data):
         'Stepford Express': 'Platforms 1, 3, 10'
     }
     """
+    precomputed = _snapshot_result(station_data, 'platform_summary')
+    if precomputed is not None:
+        return precomputed
+
     content = station_data['full_content']
     operator_platforms = {}
 
@@ -359,6 +657,10 @@ def build_route_platform_map(station_data):
 
     IMPROVED: Better wiki table parsing for Services section
     """
+    precomputed = _snapshot_result(station_data, 'route_platform_map')
+    if precomputed is not None:
+        return precomputed
+
     content = station_data['full_content']
     route_platform_map = {}
 
@@ -404,6 +706,10 @@ def build_directional_platform_map(station_data):
     IMPROVED v3.3: Handles wiki table format where multiple routes share one destination
     Example: "R010 R013 to Greenslade" → both R010 and R013 map to Greenslade
     """
+    precomputed = _snapshot_result(station_data, 'directional_map')
+    if precomputed is not None:
+        return precomputed
+
     content = station_data['full_content']
     directional_map = {}
 
@@ -860,6 +1166,16 @@ def get_comprehensive_context(station_name, stations_dict):
 
 # Example usage
 if __name__ == "__main__":
+    import sys
+
+    # Build step: python3 station_knowledge_helper.py --build-snapshot
+    if '--build-snapshot' in sys.argv:
+        snapshot = build_station_snapshot()
+        if snapshot:
+            print(f"Snapshot of {len(snapshot['stations'])} stations written to "
+                  f"{snapshot_path('scr_stations_part1.md', None, snapshot['source_hash'])}")
+        sys.exit(0)
+
     # Load all station data from both parts
     stations = load_station_knowledge()
     print(f"Loaded {len(stations)} stations")
@@ -8,18 +8,94 @@ IMPORTANT: This file is for REFERENCE. The GPT will write and execute
 similar code when passengers ask for journey planning.
 """
 
-import json
+import heapq
 from typing import List, Dict, Tuple, Optional
 
-# Load the network data
-with open('stepford_routes_with_segment_minutes_ai_knowledge_base.json', 'r') as f:
-    network = json.load(f)
+from network_model import get_network_model
 
-stations = network['stations']
-routes = network['routes']
-station_index = network['station_index']
-connections = network.get('connections', {})
-interchanges = network.get('interchanges', {})
+# The network data is loaded on first use (shared with the other modules via
+# NetworkModel); network, stations, routes, station_index, connections and
+# interchanges stay available as module attributes through __getattr__.
+_NETWORK_KEYS = {'stations', 'routes', 'station_index', 'connections', 'interchanges'}
+
+# origin -> destination -> direct legs, for the network it was built from
+_legs_cache: Dict[str, Dict[str, List[Dict]]] = {}
+_legs_cache_network: Optional[Dict] = None
+
+
+def _network() -> Dict:
+    """The knowledge base JSON, parsed on first use."""
+    return get_network_model().knowledge_base
+
+
+def __getattr__(name: str):
+    if name == 'network':
+        return _network()
+    if name in _NETWORK_KEYS:
+        return _network().get(name, {})
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _direct_leg(route_id: str, route: Dict, origin: str, destination: str,
+                origin_idx: int, dest_idx: int) -> Dict:
+    """Build the find_direct_routes() record for one route between two stops."""
+    return {
+        'route_id': route_id,
+        'operator': route['operator'],
+        'route_type': route.get('route_type', 'Regular'),
+        'origin': origin,
+        'destination': destination,
+        'stations': route['stations'][origin_idx:dest_idx + 1],
+        'stops': dest_idx - origin_idx,
+        'travel_time': route.get('travel_time', {}),
+        'price': route.get('price', 'Standard fare'),
+        'full_route_origin': route['origin'],
+        'full_route_destination': route['destination']
+    }
+
+
+def _copy_leg(leg: Dict) -> Dict:
+    """A caller-owned copy of a cached leg (its stations list included)."""
+    return dict(leg, stations=list(leg['stations']))
+
+
+def _legs_from(origin: str) -> Dict[str, List[Dict]]:
+    """
+    Every direct leg out of origin, grouped by destination.
+
+    Built once per station from the route -> station -> position maps and
+    cached, so find_direct_routes(origin, x) for any x is a dict lookup.
+    The legs are shared; copy them (_copy_leg) before handing them out.
+    """
+    global _legs_cache, _legs_cache_network
+
+    network = _network()
+    if _legs_cache_network is not network:
+        _legs_cache = {}
+        _legs_cache_network = network
+    legs = _legs_cache.get(origin)
+    if legs is not None:
+        return legs
+
+    legs = {}
+    station_index = network['station_index']
+    if origin in station_index:
+        routes = network['routes']
+        route_positions = get_network_model().route_positions
+        for route_id in station_index[origin]['routes']:
+            route = routes[route_id]
+            positions = route_positions[route_id]
+            origin_idx = positions.get(origin)
+            if origin_idx is None:
+                continue
+            for dest_idx in range(origin_idx + 1, len(route['stations'])):
+                destination = route['stations'][dest_idx]
+                if positions[destination] != dest_idx:
+                    continue  # Listed twice; list.index() finds the first
+                legs.setdefault(destination, []).append(
+                    _direct_leg(route_id, route, origin, destination, origin_idx, dest_idx))
+    _legs_cache[origin] = legs
+    return legs
 
 
 def find_direct_routes(origin: str, destination: str) -> List[Dict]:
@@ -33,49 +109,16 @@ def find_direct_routes(origin: str, destination: str) -> List[Dict]:
     Returns:
         List of route dictionaries with journey details
     """
-    direct_routes = []
-
-    # Get all routes serving the origin station
-    if origin not in station_index:
-        return []
-
-    origin_routes = station_index[origin]['routes']
-
-    # Check each route to see if it also serves the destination
-    for route_id in origin_routes:
-        route = routes[route_id]
-
-        # Check if both stations are on this route
-        if origin in route['stations'] and destination in route['stations']:
-            origin_idx = route['stations'].index(origin)
-            dest_idx = route['stations'].index(destination)
-
-            # Make sure they're in the right order (origin before destination)
-            if origin_idx < dest_idx:
-                # Calculate number of stops between stations
-                stops_between = dest_idx - origin_idx
-
-                direct_routes.append({
-                    'route_id': route_id,
-                    'operator': route['operator'],
-                    'route_type': route.get('route_type', 'Regular'),
-                    'origin': origin,
-                    'destination': destination,
-                    'stations': route['stations'][origin_idx:dest_idx + 1],
-                    'stops': stops_between,
-                    'travel_time': route.get('travel_time', {}),
-                    'price': route.get('price', 'Standard fare'),
-                    'full_route_origin': route['origin'],
-                    'full_route_destination': route['destination']
-                })
-
-    return direct_routes
+    return [_copy_leg(leg) for leg in _legs_from(origin).get(destination, [])]
 
 
 def find_one_interchange_routes(origin: str, destination: str) -> List[Dict]:
     """
     Find routes requiring exactly one interchange.
 
+    Only the origin's listed interchange stations are tried; see
+    find_routes_with_interchanges() for changes at any station.
+
     Args:
         origin: Starting station name
         destination: Ending station name
@@ -85,19 +128,19 @@ def find_one_interchange_routes(origin: str, destination: str) -> List[Dict]:
     """
     interchange_routes = []
 
+    station_index = _network()['station_index']
     if origin not in station_index or destination not in station_index:
         return []
 
     # Get all possible interchange stations from the origin
     origin_interchanges = station_index[origin].get('interchanges', [])
+    legs_from_origin = _legs_from(origin)
 
     # For each possible interchange station
     for interchange in origin_interchanges:
-        # Find routes from origin to interchange
-        leg1_routes = find_direct_routes(origin, interchange)
-
-        # Find routes from interchange to destination
-        leg2_routes = find_direct_routes(interchange, destination)
+        # Routes from origin to interchange, and from interchange to destination
+        leg1_routes = legs_from_origin.get(interchange, [])
+        leg2_routes = _legs_from(interchange).get(destination, [])
 
         # Combine them
         for leg1 in leg1_routes:
@@ -107,8 +150,8 @@ def find_one_interchange_routes(origin: str, destination: str) -> List[Dict]:
                     interchange_routes.append({
                         'type': 'one_interchange',
                         'interchange_at': interchange,
-                        'leg1': leg1,
-                        'leg2': leg2,
+                        'leg1': _copy_leg(leg1),
+                        'leg2': _copy_leg(leg2),
                         'total_stops': leg1['stops'] + leg2['stops'],
                         'route_ids': [leg1['route_id'], leg2['route_id']]
                     })
@@ -116,6 +159,100 @@ def find_one_interchange_routes(origin: str, destination: str) -> List[Dict]:
     return interchange_routes
 
 
+def find_routes_with_interchanges(origin: str, destination: str, n: int,
+                                  limit: Optional[int] = None) -> List[Dict]:
+    """
+    Find journeys with exactly n interchanges, changing at any station.
+
+    Journeys are grown one leg at a time as a station -> partial journeys
+    table, and each round is a hash join of that table against the cached
+    direct legs out of each station (a stop -> legs dict); the last round
+    only keeps stations with a direct leg to the destination. Each partial
+    journey carries the sets of stations and routes it has used, so the
+    "no station or route twice" checks are set lookups, not scans.
+
+    The number of journeys grows quickly with n (Stepford Central to
+    Llyn-by-the-Sea has ~150k with two changes); pass limit to get only the
+    fastest ones, and result dicts are built for those alone.
+
+    Args:
+        origin: Starting station name
+        destination: Ending station name
+        n: Number of interchanges (0 gives the direct routes)
+        limit: Return at most this many journeys (fastest first)
+
+    Returns:
+        List of journey dicts, sorted by calculate_journey_time():
+        {'type': 'interchanges', 'num_interchanges', 'interchanges_at',
+        'legs', 'total_stops', 'route_ids'}
+    """
+    station_index = _network()['station_index']
+    if origin not in station_index or destination not in station_index or n < 0:
+        return []
+    if origin == destination:
+        return []
+
+    # Journey time only depends on the routes ridden (see calculate_journey_time)
+    minutes = {}
+
+    def leg_minutes(leg):
+        route_id = leg['route_id']
+        if route_id not in minutes:
+            travel_time = leg['travel_time']
+            minutes[route_id] = parse_travel_time(travel_time.get('up', travel_time.get('down', 0)))
+        return minutes[route_id]
+
+    # Stations with a direct leg into the destination
+    into_destination = {station for station in station_index
+                        if destination in _legs_from(station)}
+
+    # station -> [(minutes, leg tuple, stations visited, route IDs used)] ending there
+    partial = {origin: [(0, (), frozenset([origin]), frozenset())]}
+    for round_number in range(n):
+        last_round = round_number == n - 1
+        grown = {}
+        for station, chains in partial.items():
+            for stop, legs in _legs_from(station).items():
+                if stop == destination:
+                    continue
+                if last_round and stop not in into_destination:
+                    continue
+                timed = [(leg, leg['route_id'], leg_minutes(leg)) for leg in legs]
+                ending = None
+                for total, chain, visited, used in chains:
+                    if stop in visited:
+                        continue
+                    visited_next = visited | {stop}
+                    for leg, route_id, leg_time in timed:
+                        if route_id not in used:
+                            if ending is None:
+                                ending = grown.setdefault(stop, [])
+                            ending.append((total + leg_time, chain + (leg,), visited_next, used | {route_id}))
+        partial = grown
+
+    found = []
+    for station, chains in partial.items():
+        for final in _legs_from(station).get(destination, []):
+            route_id = final['route_id']
+            extra = leg_minutes(final) + 4 * n
+            for total, chain, _, used in chains:
+                if route_id not in used:
+                    found.append((total + extra, len(found), chain + (final,)))
+
+    found = heapq.nsmallest(limit, found) if limit is not None else sorted(found)
+    journeys = []
+    for _, _, legs in found:
+        journeys.append({
+            'type': 'interchanges',
+            'num_interchanges': n,
+            'interchanges_at': [leg['destination'] for leg in legs[:-1]],
+            'legs': [_copy_leg(leg) for leg in legs],
+            'total_stops': sum(leg['stops'] for leg in legs),
+            'route_ids': [leg['route_id'] for leg in legs]
+        })
+    return journeys
+
+
 def parse_travel_time(time_str: str) -> int:
     """
     Convert travel time string to minutes.
@@ -149,7 +286,14 @@ def calculate_journey_time(journey: Dict) -> int:
     Returns:
         Total time in minutes
     """
-    if 'leg1' in journey:
+    if 'legs' in journey:
+        # Any number of legs, 4 minutes per interchange
+        total = 0
+        for leg in journey['legs']:
+            leg_time = leg.get('travel_time', {})
+            total += parse_travel_time(leg_time.get('up', leg_time.get('down', 0)))
+        return total + 4 * (len(journey['legs']) - 1)
+    elif 'leg1' in journey:
         # Multi-leg journey
         leg1_time = journey['leg1'].get('travel_time', {})
         leg2_time = journey['leg2'].get('travel_time', {})
@@ -209,6 +353,7 @@ def get_station_info(station_name: str) -> Optional[Dict]:
     Returns:
         Dictionary with station information
     """
+    station_index = _network()['station_index']
     if station_name not in station_index:
         return None
 
@@ -235,6 +380,7 @@ def search_station_name(query: str) -> List[str]:
         List of matching station names
     """
     query_lower = query.lower()
+    stations = _network()['stations']
 
     # Exact match
     exact_matches = [s for s in stations if s.lower() == query_lower]
@@ -268,7 +414,24 @@ def format_route_display(route: Dict, route_number: int = 1) -> str:
     Returns:
         Formatted string
     """
-    if 'leg1' in route:
+    if 'legs' in route:
+        # Journey from find_routes_with_interchanges()
+        legs = route['legs']
+        total_time = calculate_journey_time(route)
+        changes = len(legs) - 1
+
+        via = f"Via {', '.join(route['interchanges_at'])}" if changes else "Direct Route"
+        output = f"**Option {route_number} - {via}**\n"
+        hops = [f"{legs[0]['route_type']} ({legs[0]['route_id']})"]
+        for station, leg in zip(route['interchanges_at'], legs[1:]):
+            hops.append(f"Change at {station} → {leg['route_type']} ({leg['route_id']})")
+        output += f"🚆 {' → '.join(hops)}\n"
+        output += f"- Total travel time: ~{total_time} minutes (including {4 * changes} min interchange)\n"
+        output += f"- Total stops: {route['total_stops']}\n"
+        output += f"- Operators: {', '.join(leg['operator'] for leg in legs)}\n"
+
+        return output
+    elif 'leg1' in route:
         # Interchange route
         leg1 = route['leg1']
         leg2 = route['leg2']
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Stepford County Railway - Shared Network Model
+===============================================
+Parse the network sources once per process and share the result.
+
+rail_helpers, RoutePathfinder, RouteCorridorCalculator and navigation_helper
+used to read rail_routes.csv or the knowledge base JSON each on their own.
+NetworkModel reads each file at most once and builds every derived
+structure lazily, on first use:
+- service_graph: the rail_helpers graph from rail_routes.csv
+- route_graph: the RoutePathfinder service graph from the JSON routes
+- physical_graph: the RouteCorridorCalculator track graph
+- route_positions / station_routes: route -> station -> stop position, and
+  station -> [(route, position)] over the routes still running (the
+  RouteCorridorCalculator corridor index)
+
+Usage:
+    import network_model
+    model = network_model.get_network_model()
+    pathfinder = route_pathfinder.RoutePathfinder()     # uses the shared model
+    rail_helpers.shortest_path(model.service_graph, "Benton", "Llyn-by-the-Sea")
+
+Everything handed out is shared, so treat it as read-only; call
+get_network_model(reload=True) after editing the source files.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+ROUTES_CSV = "rail_routes.csv"
+KNOWLEDGE_BASE = "stepford_routes_with_segment_minutes_ai_knowledge_base.json"
+
+
+class NetworkModel:
+    """
+    One parse of the rail network sources, with derived graphs built on demand.
+    """
+
+    def __init__(self, routes_csv: str = ROUTES_CSV, knowledge_base: str = KNOWLEDGE_BASE):
+        """
+        Args:
+            routes_csv: Path to rail_routes.csv (read by service_graph)
+            knowledge_base: Path to the routes knowledge base JSON
+        """
+        self.routes_csv = routes_csv
+        self.knowledge_base_path = knowledge_base
+
+        self._knowledge_base: Optional[Dict] = None
+        self._service_network: Optional[Tuple[Dict, List[str], List[str]]] = None
+        self._route_graph: Optional[Dict] = None
+        self._physical_graph: Optional[Dict[str, Set[str]]] = None
+        self._route_positions: Optional[Dict[str, Dict[str, int]]] = None
+        self._station_routes: Optional[Dict[str, List[Tuple[str, int]]]] = None
+
+    # --- Sources -------------------------------------------------------------
+
+    @property
+    def knowledge_base(self) -> Dict:
+        """The parsed knowledge base JSON (routes, stations, connections, ...)."""
+        if self._knowledge_base is None:
+            with open(self.knowledge_base_path, 'r', encoding='utf-8') as f:
+                self._knowledge_base = json.load(f)
+        return self._knowledge_base
+
+    @property
+    def routes(self) -> Dict:
+        """Route code -> route data from the knowledge base."""
+        return self.knowledge_base.get('routes', {})
+
+    # --- Derived structures --------------------------------------------------
+
+    @property
+    def service_network(self) -> Tuple[Dict, List[str], List[str]]:
+        """(graph, operators, lines) exactly as rail_helpers.load_rail_network() returns."""
+        if self._service_network is None:
+            import rail_helpers
+            self._service_network = rail_helpers.load_rail_network(self.routes_csv)
+        return self._service_network
+
+    @property
+    def service_graph(self) -> Dict:
+        """The rail_helpers station -> edge list graph."""
+        return self.service_network[0]
+
+    @property
+    def route_graph(self) -> Dict:
+        """The RoutePathfinder station -> edge list graph built from the JSON routes."""
+        if self._route_graph is None:
+            from route_pathfinder import build_route_graph
+            self._route_graph = build_route_graph(self.routes)
+        return self._route_graph
+
+    @property
+    def physical_graph(self) -> Dict[str, Set[str]]:
+        """The RouteCorridorCalculator station -> adjacent stations track graph."""
+        if self._physical_graph is None:
+            from route_corridor_calculator import build_station_network
+            self._physical_graph = build_station_network(self.knowledge_base)
+        return self._physical_graph
+
+    @property
+    def route_positions(self) -> Dict[str, Dict[str, int]]:
+        """Route code -> station -> position in the route's station list."""
+        if self._route_positions is None:
+            route_positions = {}
+            for code, route in self.routes.items():
+                positions = route_positions[code] = {}
+                for i, station in enumerate(route.get('stations', [])):
+                    positions.setdefault(station, i)  # First call, like list.index()
+            self._route_positions = route_positions
+        return self._route_positions
+
+    @property
+    def station_routes(self) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Station -> [(route code, position)] for every non-removed route calling there.
+
+        Routes appear in knowledge base order; positions are first calls, as
+        in route_positions.
+        """
+        if self._station_routes is None:
+            station_routes = {}
+            routes = self.routes
+            for code, positions in self.route_positions.items():
+                if 'REMOVED' in routes[code].get('route_type', ''):
+                    continue
+                for station, i in positions.items():
+                    station_routes.setdefault(station, []).append((code, i))
+            self._station_routes = station_routes
+        return self._station_routes
+
+    # --- Module objects ------------------------------------------------------
+
+    def pathfinder(self):
+        """A RoutePathfinder over this model's routes and route graph."""
+        from route_pathfinder import RoutePathfinder
+        return RoutePathfinder(self.knowledge_base, graph=self.route_graph)
+
+    def corridor_calculator(self):
+        """A RouteCorridorCalculator over this model's data and track graph."""
+        from route_corridor_calculator import RouteCorridorCalculator
+        return RouteCorridorCalculator(model=self)
+
+    def __repr__(self) -> str:
+        built = [name for name in ('knowledge_base', 'service_network', 'route_graph',
+                                   'physical_graph', 'route_positions', 'station_routes')
+                 if getattr(self, '_' + name) is not None]
+        return f"NetworkModel({self.routes_csv!r}, {self.knowledge_base_path!r}, built={built})"
+
+
+# (abs csv path, abs JSON path) -> NetworkModel
+_MODELS: Dict[Tuple[str, str], NetworkModel] = {}
+
+
+def get_network_model(routes_csv: str = ROUTES_CSV, knowledge_base: str = KNOWLEDGE_BASE,
+                      reload: bool = False) -> NetworkModel:
+    """
+    Return the process-wide NetworkModel for these source files.
+
+    Args:
+        routes_csv: Path to rail_routes.csv
+        knowledge_base: Path to the routes knowledge base JSON
+        reload: Drop the existing model and parse the files again
+
+    Returns:
+        The shared NetworkModel (the same object on every call with the
+        same paths, relative paths resolved against the working directory)
+    """
+    key = (os.path.abspath(routes_csv), os.path.abspath(knowledge_base))
+    model = _MODELS.get(key)
+    if model is None or reload:
+        model = _MODELS[key] = NetworkModel(*key)
+    return model
@@ -8,13 +8,37 @@ Usage in GPT Python environment:
     import rail_helpers
     graph, operators, lines = rail_helpers.load_rail_network("rail_routes.csv")
     rail_helpers.operators_at_station(graph, "Stepford Central")
+
+For large networks, load a compact integer-indexed view instead. Every helper
+below accepts it in place of the dict graph:
+    index = rail_helpers.load_network_index("rail_routes.csv")
+    rail_helpers.operators_at_station(index, "Stepford Central")
 """
 
 import csv
-from collections import defaultdict
+import functools
+import hashlib
+import heapq
+import math
+import os
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict, deque
 from typing import Dict, List, Set, Tuple, Optional
 
 
+class RailGraph(dict):
+    """
+    The station -> edge list dict returned by load_rail_network().
+
+    Behaves exactly like a plain dict; source_hash records the SHA-256 of the
+    CSV it was loaded from, which keys the query cache (see cached_query).
+    """
+
+    source_hash: Optional[str] = None
+    bitsets: Optional["StationBitsets"] = None  # Built by station_bitsets() on first use
+
+
 def load_rail_network(path="rail_routes.csv") -> Tuple[Dict, List[str], List[str]]:
     """
     Load the rail network from CSV into a graph structure.
@@ -71,15 +95,712 @@ def load_rail_network(path="rail_routes.csv") -> Tuple[Dict, List[str], List[str
             operators.add(operator)
             lines.add(line)
 
-    return dict(graph), sorted(operators), sorted(lines)
+    graph = RailGraph(graph)
+    graph.source_hash = file_hash(path)
+    return graph, sorted(operators), sorted(lines)
+
+
+class NetworkIndex:
+    """
+    Compact integer-indexed view of the rail network.
+
+    Stations, operators, lines, service types and route terminals are interned
+    to small integer IDs. Adjacency is stored CSR-style: the edges leaving
+    station ``s`` occupy positions ``offsets[s]`` to ``offsets[s + 1]`` of the
+    parallel edge arrays (``targets``, ``times``, ``edge_lines``, ...).
+
+    Station IDs and per-station edge order match the dict graph built by
+    load_rail_network(), so every helper in this module returns the same
+    results for either representation. The index also behaves as a read-only
+    mapping of station -> list of edge dicts for code that walks the graph
+    directly (edge dicts are built on demand).
+    """
+
+    def __init__(self):
+        self.stations: List[str] = []
+        self.operators: List[str] = []
+        self.lines: List[str] = []
+        self.service_types: List[str] = []
+        self.terminals: List[str] = []
+
+        self.station_ids: Dict[str, int] = {}
+        self.operator_ids: Dict[str, int] = {}
+        self.line_ids: Dict[str, int] = {}
+        self.service_type_ids: Dict[str, int] = {}
+        self.terminal_ids: Dict[str, int] = {}
+
+        self.offsets = array("i", [0])
+        self.targets = array("i")
+        self.times = array("d")
+        self.edge_operators = array("i")
+        self.edge_lines = array("i")
+        self.edge_service_types = array("i")
+        self.edge_origins = array("i")
+        self.edge_destinations = array("i")
+
+        self._edge_groups: Dict[str, Dict[int, List[int]]] = {}
+        self.source_hash: Optional[str] = None  # SHA-256 of the source CSV, if known
+        self.bitsets: Optional["StationBitsets"] = None  # Built by station_bitsets()
+
+    @classmethod
+    def from_csv(cls, path="rail_routes.csv") -> "NetworkIndex":
+        """
+        Build the index straight from rail_routes.csv without creating edge dicts.
+
+        Args:
+            path: Path to the rail_routes.csv file
+
+        Returns:
+            NetworkIndex for the network
+        """
+        index = cls()
+        edges = []
+
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                u = index._intern_station(row["from_station"])
+                v = index._intern_station(row["to_station"])
+                attrs = (
+                    index._intern(index.operators, index.operator_ids, row["operator"]),
+                    index._intern(index.lines, index.line_ids, row["line"]),
+                    float(row["travel_time_min"]),
+                    index._intern(index.service_types, index.service_type_ids,
+                                  row.get("service_type", "")),
+                    index._intern(index.terminals, index.terminal_ids,
+                                  row.get("route_origin", "")),
+                    index._intern(index.terminals, index.terminal_ids,
+                                  row.get("route_destination", "")),
+                )
+                # Bidirectional, same order as load_rail_network()
+                edges.append((u, v) + attrs)
+                edges.append((v, u) + attrs)
+
+        index._build_csr(edges)
+        index.source_hash = file_hash(path)
+        return index
+
+    @classmethod
+    def from_graph(cls, graph: Dict) -> "NetworkIndex":
+        """
+        Build the index from a dict graph returned by load_rail_network().
+
+        Args:
+            graph: Network graph from load_rail_network()
+
+        Returns:
+            NetworkIndex for the same network
+        """
+        index = cls()
+        for station in graph:
+            index._intern_station(station)
+
+        edges = []
+        for station, edge_list in graph.items():
+            u = index.station_ids[station]
+            for e in edge_list:
+                edges.append((
+                    u,
+                    index._intern_station(e["to"]),
+                    index._intern(index.operators, index.operator_ids, e["operator"]),
+                    index._intern(index.lines, index.line_ids, e["line"]),
+                    e["time"],
+                    index._intern(index.service_types, index.service_type_ids,
+                                  e.get("service_type", "")),
+                    index._intern(index.terminals, index.terminal_ids,
+                                  e.get("route_origin", "")),
+                    index._intern(index.terminals, index.terminal_ids,
+                                  e.get("route_destination", "")),
+                ))
+
+        index._build_csr(edges)
+        index.source_hash = getattr(graph, "source_hash", None)
+        return index
+
+    @staticmethod
+    def _intern(names: List[str], ids: Dict[str, int], name: str) -> int:
+        """Return the ID for name, assigning the next free ID on first sight."""
+        value = ids.get(name)
+        if value is None:
+            value = ids[name] = len(names)
+            names.append(name)
+        return value
+
+    def _intern_station(self, name: str) -> int:
+        return self._intern(self.stations, self.station_ids, name)
+
+    def _build_csr(self, edges: List[Tuple]) -> None:
+        """Lay out edge tuples as CSR arrays with a stable counting sort by source."""
+        num_stations = len(self.stations)
+        counts = [0] * (num_stations + 1)
+        for edge in edges:
+            counts[edge[0] + 1] += 1
+        for s in range(num_stations):
+            counts[s + 1] += counts[s]
+        self.offsets = array("i", counts)
+
+        num_edges = len(edges)
+        self.targets = array("i", bytes(4 * num_edges))
+        self.times = array("d", bytes(8 * num_edges))
+        self.edge_operators = array("i", bytes(4 * num_edges))
+        self.edge_lines = array("i", bytes(4 * num_edges))
+        self.edge_service_types = array("i", bytes(4 * num_edges))
+        self.edge_origins = array("i", bytes(4 * num_edges))
+        self.edge_destinations = array("i", bytes(4 * num_edges))
+
+        cursor = counts[:-1]
+        for u, v, op, line, time, stype, origin, dest in edges:
+            pos = cursor[u]
+            cursor[u] = pos + 1
+            self.targets[pos] = v
+            self.times[pos] = time
+            self.edge_operators[pos] = op
+            self.edge_lines[pos] = line
+            self.edge_service_types[pos] = stype
+            self.edge_origins[pos] = origin
+            self.edge_destinations[pos] = dest
+
+    # --- ID lookups -------------------------------------------------------
+
+    def station_id(self, station: str) -> Optional[int]:
+        """Return the integer ID of a station, or None if it is not in the network."""
+        return self.station_ids.get(station)
+
+    def edge_range(self, sid: int) -> range:
+        """Return the range of edge IDs leaving station ``sid``."""
+        return range(self.offsets[sid], self.offsets[sid + 1])
+
+    def out_edges(self, sid: int):
+        """Iterate (target, line_id, time, edge_id) for edges leaving station ``sid``."""
+        start, end = self.offsets[sid], self.offsets[sid + 1]
+        return zip(self.targets[start:end], self.edge_lines[start:end],
+                   self.times[start:end], range(start, end))
+
+    def edge_dict(self, eid: int) -> Dict:
+        """Return the load_rail_network()-style edge dict for edge ``eid``."""
+        return {
+            "to": self.stations[self.targets[eid]],
+            "operator": self.operators[self.edge_operators[eid]],
+            "line": self.lines[self.edge_lines[eid]],
+            "time": self.times[eid],
+            "service_type": self.service_types[self.edge_service_types[eid]],
+            "route_origin": self.terminals[self.edge_origins[eid]],
+            "route_destination": self.terminals[self.edge_destinations[eid]],
+        }
+
+    def leg(self, sid: int, eid: int) -> Dict:
+        """Return the journey leg dict for travelling edge ``eid`` from station ``sid``."""
+        return {
+            "from": self.stations[sid],
+            "to": self.stations[self.targets[eid]],
+            "operator": self.operators[self.edge_operators[eid]],
+            "line": self.lines[self.edge_lines[eid]],
+            "time": self.times[eid],
+            "service_type": self.service_types[self.edge_service_types[eid]],
+        }
+
+    def edges_with(self, attr: str, value: int) -> List[int]:
+        """
+        Return the IDs of edges whose per-edge array ``attr`` equals ``value``.
+
+        Edges are grouped once per attribute (e.g. "edge_operators" or
+        "edge_lines") on first use, so later lookups only touch matching edges.
+        """
+        groups = self._edge_groups.get(attr)
+        if groups is None:
+            groups = defaultdict(list)
+            for eid, key in enumerate(getattr(self, attr)):
+                groups[key].append(eid)
+            self._edge_groups[attr] = groups
+        return groups.get(value, [])
+
+    def edge_source(self, eid: int) -> int:
+        """Return the station ID an edge leaves from."""
+        return bisect_right(self.offsets, eid) - 1
+
+    # --- Read-only mapping of station -> list of edge dicts ----------------
+
+    def __getitem__(self, station: str) -> List[Dict]:
+        sid = self.station_ids[station]
+        return [self.edge_dict(eid) for eid in self.edge_range(sid)]
+
+    def __contains__(self, station) -> bool:
+        return station in self.station_ids
+
+    def __iter__(self):
+        return iter(self.stations)
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def keys(self):
+        return iter(self.stations)
+
+    def items(self):
+        return ((station, self[station]) for station in self.stations)
+
+    def values(self):
+        return (self[station] for station in self.stations)
+
+    def get(self, station: str, default=None):
+        return self[station] if station in self.station_ids else default
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_edge_groups"] = {}  # Rebuilt on demand after unpickling
+        state["bitsets"] = None
+        return state
+
+    def __repr__(self) -> str:
+        return (f"NetworkIndex({len(self.stations)} stations, {len(self.targets)} edges, "
+                f"{len(self.lines)} lines)")
+
+
+def load_network_index(path="rail_routes.csv") -> NetworkIndex:
+    """
+    Load the rail network from CSV into a compact NetworkIndex.
+
+    Args:
+        path: Path to the rail_routes.csv file
+
+    Returns:
+        NetworkIndex usable anywhere a graph from load_rail_network() is accepted
+        (its .operators and .lines attributes list names in first-seen order;
+        sort them for the same lists load_rail_network() returns)
+    """
+    return NetworkIndex.from_csv(path)
+
+
+# --- Station bitsets ----------------------------------------------------------
+
+def _bits(mask: int) -> List[int]:
+    """Return the positions of the set bits in mask, lowest first."""
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+
+class StationBitsets:
+    """
+    Station memberships stored as integer bitmasks for one-operation set algebra.
+
+    Stations, lines and operators are numbered in sorted name order, so bit i
+    of a mask stands for the i-th name and decoding a mask yields a sorted
+    list. For each station:
+    - line_masks[s]: lines calling at the station
+    - operator_masks[s]: operators calling at the station
+    - neighbour_masks[s]: stations one segment away
+    and for each line / operator, line_stations[l] / operator_stations[o]: the
+    stations it serves. "Common lines", "shared interchanges" and "stations
+    served by both X and Y" are then a single & of two masks.
+
+    Not tied to rail_routes.csv: the corridor and pathfinder code can build
+    one from their own station -> lines / operators / neighbours maps with
+    from_memberships(). to_numpy() gives the same data as bool matrices.
+    """
+
+    def __init__(self, stations: List[str], lines: List[str], operators: List[str]):
+        self.stations = stations
+        self.lines = lines
+        self.operators = operators
+        self.station_ids = {name: i for i, name in enumerate(stations)}
+        self.line_ids = {name: i for i, name in enumerate(lines)}
+        self.operator_ids = {name: i for i, name in enumerate(operators)}
+
+        self.line_masks: List[int] = [0] * len(stations)
+        self.operator_masks: List[int] = [0] * len(stations)
+        self.neighbour_masks: List[int] = [0] * len(stations)
+        self.line_stations: List[int] = [0] * len(lines)
+        self.operator_stations: List[int] = [0] * len(operators)
+
+    @classmethod
+    def from_memberships(cls, lines_at: Dict[str, Set[str]],
+                         operators_at: Optional[Dict[str, Set[str]]] = None,
+                         neighbours: Optional[Dict[str, Set[str]]] = None) -> "StationBitsets":
+        """
+        Build the bitsets from plain station -> name-set maps.
+
+        Args:
+            lines_at: station -> lines (or route codes) calling there
+            operators_at: station -> operators calling there
+            neighbours: station -> adjacent stations
+
+        Returns:
+            StationBitsets over every station named in any of the maps
+        """
+        operators_at = operators_at or {}
+        neighbours = neighbours or {}
+        stations = set(lines_at) | set(operators_at) | set(neighbours)
+        for adjacent in neighbours.values():
+            stations.update(adjacent)
+        bitsets = cls(sorted(stations),
+                      sorted({line for names in lines_at.values() for line in names}),
+                      sorted({op for names in operators_at.values() for op in names}))
+
+        station_ids = bitsets.station_ids
+        for station, names in lines_at.items():
+            sid = station_ids[station]
+            for name in names:
+                lid = bitsets.line_ids[name]
+                bitsets.line_masks[sid] |= 1 << lid
+                bitsets.line_stations[lid] |= 1 << sid
+        for station, names in operators_at.items():
+            sid = station_ids[station]
+            for name in names:
+                oid = bitsets.operator_ids[name]
+                bitsets.operator_masks[sid] |= 1 << oid
+                bitsets.operator_stations[oid] |= 1 << sid
+        for station, adjacent in neighbours.items():
+            mask = 0
+            for name in adjacent:
+                mask |= 1 << station_ids[name]
+            bitsets.neighbour_masks[station_ids[station]] |= mask
+        return bitsets
+
+    @classmethod
+    def from_graph(cls, graph: Dict) -> "StationBitsets":
+        """
+        Build the bitsets from a graph from load_rail_network() or a NetworkIndex.
+
+        Prefer station_bitsets(graph), which builds them once per loaded network.
+        """
+        lines_at = {}
+        operators_at = {}
+        neighbours = {}
+        if isinstance(graph, NetworkIndex):
+            for sid, station in enumerate(graph.stations):
+                span = slice(graph.offsets[sid], graph.offsets[sid + 1])
+                lines_at[station] = {graph.lines[i] for i in set(graph.edge_lines[span])}
+                operators_at[station] = {graph.operators[i] for i in set(graph.edge_operators[span])}
+                neighbours[station] = {graph.stations[i] for i in set(graph.targets[span])}
+        else:
+            for station, edges in graph.items():
+                lines_at[station] = {edge["line"] for edge in edges}
+                operators_at[station] = {edge["operator"] for edge in edges}
+                neighbours[station] = {edge["to"] for edge in edges}
+        return cls.from_memberships(lines_at, operators_at, neighbours)
+
+    def _station_mask(self, names, name_ids: Dict[str, int], masks: List[int]) -> int:
+        """AND together the station masks of names (0 if any name is unknown)."""
+        result = (1 << len(self.stations)) - 1
+        for name in names:
+            i = name_ids.get(name)
+            if i is None:
+                return 0
+            result &= masks[i]
+        return result
+
+    def station_names(self, mask: int) -> List[str]:
+        """Decode a station mask into a sorted list of station names."""
+        return [self.stations[i] for i in _bits(mask)]
+
+    def line_names(self, mask: int) -> List[str]:
+        """Decode a line mask into a sorted list of line IDs."""
+        return [self.lines[i] for i in _bits(mask)]
+
+    def operator_names(self, mask: int) -> List[str]:
+        """Decode an operator mask into a sorted list of operator names."""
+        return [self.operators[i] for i in _bits(mask)]
+
+    def common_line_mask(self, station_a: str, station_b: str) -> int:
+        """Mask of lines calling at both stations (0 if either is unknown)."""
+        a = self.station_ids.get(station_a)
+        b = self.station_ids.get(station_b)
+        if a is None or b is None:
+            return 0
+        return self.line_masks[a] & self.line_masks[b]
+
+    def common_lines(self, station_a: str, station_b: str) -> List[str]:
+        """Sorted line IDs calling at both stations."""
+        return self.line_names(self.common_line_mask(station_a, station_b))
+
+    def common_operators(self, station_a: str, station_b: str) -> List[str]:
+        """Sorted operators calling at both stations."""
+        a = self.station_ids.get(station_a)
+        b = self.station_ids.get(station_b)
+        if a is None or b is None:
+            return []
+        return self.operator_names(self.operator_masks[a] & self.operator_masks[b])
+
+    def shared_neighbours(self, station_a: str, station_b: str) -> List[str]:
+        """Sorted stations adjacent to both stations."""
+        a = self.station_ids.get(station_a)
+        b = self.station_ids.get(station_b)
+        if a is None or b is None:
+            return []
+        return self.station_names(self.neighbour_masks[a] & self.neighbour_masks[b])
+
+    def stations_served_by(self, operators: List[str] = (), lines: List[str] = ()) -> List[str]:
+        """
+        Stations served by every given operator and every given line.
+
+        Args:
+            operators: Operator names that must all call at the station
+            lines: Line IDs that must all call at the station
+
+        Returns:
+            Sorted list of station names
+        """
+        mask = (self._station_mask(operators, self.operator_ids, self.operator_stations)
+                & self._station_mask(lines, self.line_ids, self.line_stations))
+        return self.station_names(mask)
+
+    def to_numpy(self) -> Dict:
+        """
+        Return the memberships as NumPy bool matrices (requires numpy).
+
+        Returns:
+            Dict with 'lines' (stations x lines), 'operators' (stations x
+            operators) and 'neighbours' (stations x stations)
+        """
+        import numpy as np
+
+        def matrix(masks, width):
+            out = np.zeros((len(masks), width), dtype=bool)
+            for row, mask in enumerate(masks):
+                out[row, _bits(mask)] = True
+            return out
+
+        n = len(self.stations)
+        return {
+            'lines': matrix(self.line_masks, len(self.lines)),
+            'operators': matrix(self.operator_masks, len(self.operators)),
+            'neighbours': matrix(self.neighbour_masks, n),
+        }
+
+    def __repr__(self) -> str:
+        return (f"StationBitsets({len(self.stations)} stations, {len(self.lines)} lines, "
+                f"{len(self.operators)} operators)")
+
+
+def station_bitsets(graph: Dict) -> StationBitsets:
+    """
+    Return the StationBitsets for a network, building them once per loaded graph.
+
+    Graphs from load_rail_network() and NetworkIndex objects keep the result
+    on the object (as .bitsets); any other mapping is rebuilt on each call.
+    Like the query cache, this assumes the loaded graph is not edited.
+
+    Args:
+        graph: Network graph from load_rail_network() or a NetworkIndex
+
+    Returns:
+        StationBitsets for the network
+    """
+    bitsets = getattr(graph, "bitsets", None)
+    if bitsets is None:
+        bitsets = StationBitsets.from_graph(graph)
+        if isinstance(graph, (RailGraph, NetworkIndex)):
+            graph.bitsets = bitsets
+    return bitsets
+
+
+# --- Query result cache ------------------------------------------------------
+
+QUERY_CACHE_SIZE = 4096
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is read-only; use rail_helpers.thaw() for an editable copy")
+
+
+class FrozenDict(dict):
+    """A dict that refuses changes; cached query results are built from these."""
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+class FrozenList(list):
+    """A list that refuses changes; cached query results are built from these."""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+def freeze(value):
+    """Return a read-only version of a result made of dicts, lists, tuples and sets."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    if isinstance(value, tuple):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+def thaw(value):
+    """Return an editable deep copy of a (possibly frozen) result."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(thaw(item) for item in value)
+    if isinstance(value, frozenset):
+        return set(value)
+    return value
+
+
+_KEY_TYPES = (str, int, float, bool, type(None))
+
+
+def _plain_argument(value) -> bool:
+    """True for arguments that can key the cache by value (no graphs, tables or guides)."""
+    if isinstance(value, tuple):
+        return all(_plain_argument(item) for item in value)
+    return isinstance(value, _KEY_TYPES)
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of helper results, shared by every @cached_query function.
+
+    Entries are keyed by (function, network content hash, representation,
+    arguments), so a network loaded from an edited CSV never sees results
+    computed for the old one; stale entries simply age out. Results are
+    stored frozen (FrozenDict / FrozenList) and handed out as they are, so
+    a hit costs no copy and no caller can change what later callers see.
+
+    Usage:
+        rail_helpers.QUERY_CACHE.stats()   # JSON-ready hit/miss counters
+        rail_helpers.QUERY_CACHE.clear()
+    """
+
+    def __init__(self, maxsize: int = QUERY_CACHE_SIZE):
+        """
+        Args:
+            maxsize: Most results kept; 0 disables caching (counters still run)
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple, object]" = OrderedDict()
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+
+    def call(self, name: str, key: Tuple, compute):
+        """Return the cached (frozen) result for key, or compute(), freeze, store and return it."""
+        entries = self._entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits[name] += 1
+            return entries[key]
+
+        self.misses[name] += 1
+        result = freeze(compute())
+        if self.maxsize > 0:
+            entries[key] = result
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """Drop every cached result and reset the counters."""
+        self._entries.clear()
+        self.hits.clear()
+        self.misses.clear()
+
+    def stats(self) -> Dict:
+        """
+        Return the counters as plain data (ready for json.dump or a CSV row).
+
+        Returns:
+            Dict with 'size', 'maxsize', total 'hits' and 'misses', and
+            'functions': name -> {'hits': n, 'misses': n}
+        """
+        names = sorted(set(self.hits) | set(self.misses))
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': sum(self.hits.values()),
+            'misses': sum(self.misses.values()),
+            'functions': {name: {'hits': self.hits.get(name, 0), 'misses': self.misses.get(name, 0)}
+                          for name in names},
+        }
+
+
+QUERY_CACHE = QueryCache()
+
+
+def cached_query(func):
+    """
+    Memoize a helper whose first argument is the network graph.
+
+    Only networks that know their content hash are cached (graphs from
+    load_rail_network(), indexes from load_network_index() or
+    NetworkIndex.from_graph() of such a graph), and only when every other
+    argument is a plain value (strings, numbers, None or tuples of them);
+    calls passing objects such as a JourneyTable or CoordinateHeuristic are
+    computed every time, so the cache never keeps those objects alive.
+    Results of cached calls are read-only (see QueryCache); use thaw() for
+    an editable copy, and edit the CSV rather than a loaded graph. The
+    uncached function stays available as ``func.__wrapped__``.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(graph, *args, **kwargs):
+        source_hash = getattr(graph, "source_hash", None)
+        if source_hash is None or not _plain_argument(args) \
+                or not _plain_argument(tuple(kwargs.values())):
+            return func(graph, *args, **kwargs)
+        key = (name, source_hash, isinstance(graph, NetworkIndex), args,
+               tuple(sorted(kwargs.items())))
+        return QUERY_CACHE.call(name, key, lambda: func(graph, *args, **kwargs))
+
+    return wrapper
+
+
+def _search_space(graph):
+    """
+    Return accessors for walking either graph representation.
+
+    Returns:
+        Tuple of (node_of, name_of, out_edges, leg_of, edge_of) where node_of
+        maps a station name to a search node (None if unknown), out_edges(node)
+        yields (next_node, line, time, edge_ref), leg_of(node, edge_ref) builds
+        the journey leg dict and edge_of(edge_ref) returns the full edge dict.
+    """
+    if isinstance(graph, NetworkIndex):
+        return (graph.station_id, graph.stations.__getitem__, graph.out_edges,
+                graph.leg, graph.edge_dict)
+
+    def node_of(station):
+        return station if station in graph else None
+
+    def out_edges(station):
+        return ((e["to"], e["line"], e["time"], e) for e in graph[station])
+
+    def leg_of(station, edge):
+        return {
+            'from': station,
+            'to': edge["to"],
+            'operator': edge["operator"],
+            'line': edge["line"],
+            'time': edge["time"],
+            'service_type': edge["service_type"]
+        }
+
+    return node_of, (lambda station: station), out_edges, leg_of, (lambda edge: edge)
 
 
+@cached_query
 def operators_at_station(graph: Dict, station: str) -> List[str]:
     """
     Find which operators serve a given station.
 
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         station: Station name
 
     Returns:
@@ -88,16 +809,22 @@ def operators_at_station(graph: Dict, station: str) -> List[str]:
     if station not in graph:
         return []
 
+    if isinstance(graph, NetworkIndex):
+        sid = graph.station_ids[station]
+        op_ids = set(graph.edge_operators[graph.offsets[sid]:graph.offsets[sid + 1]])
+        return sorted(graph.operators[op] for op in op_ids)
+
     ops = {edge["operator"] for edge in graph[station]}
     return sorted(ops)
 
 
+@cached_query
 def lines_at_station(graph: Dict, station: str) -> List[str]:
     """
     Find which lines serve a given station.
 
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         station: Station name
 
     Returns:
@@ -106,16 +833,22 @@ def lines_at_station(graph: Dict, station: str) -> List[str]:
     if station not in graph:
         return []
 
+    if isinstance(graph, NetworkIndex):
+        sid = graph.station_ids[station]
+        ids = set(graph.edge_lines[graph.offsets[sid]:graph.offsets[sid + 1]])
+        return sorted(graph.lines[line] for line in ids)
+
     line_ids = {edge["line"] for edge in graph[station]}
     return sorted(line_ids)
 
 
+@cached_query
 def direct_services_between(graph: Dict, station_a: str, station_b: str) -> List[Dict]:
     """
     Find all direct train services between two stations (no changes required).
 
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         station_a: Starting station
         station_b: Destination station
 
@@ -125,6 +858,21 @@ def direct_services_between(graph: Dict, station_a: str, station_b: str) -> List
     if station_a not in graph:
         return []
 
+    if isinstance(graph, NetworkIndex):
+        b = graph.station_id(station_b)
+        services = []
+        for eid in graph.edge_range(graph.station_ids[station_a]):
+            if graph.targets[eid] == b:
+                services.append({
+                    "operator": graph.operators[graph.edge_operators[eid]],
+                    "line": graph.lines[graph.edge_lines[eid]],
+                    "time": graph.times[eid],
+                    "service_type": graph.service_types[graph.edge_service_types[eid]],
+                    "route_origin": graph.terminals[graph.edge_origins[eid]],
+                    "route_destination": graph.terminals[graph.edge_destinations[eid]],
+                })
+        return services
+
     services = []
     for edge in graph[station_a]:
         if edge["to"] == station_b:
@@ -140,17 +888,22 @@ def direct_services_between(graph: Dict, station_a: str, station_b: str) -> List
     return services
 
 
+@cached_query
 def edges_for_operator(graph: Dict, operator_name: str) -> List[Dict]:
     """
     Get all unique edges (station pairs) operated by a specific operator.
 
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         operator_name: Name of the operator
 
     Returns:
         List of edge dicts with from, to, line, time, service_type
     """
+    if isinstance(graph, NetworkIndex):
+        return _index_edges_matching(graph, "edge_operators",
+                                     graph.operator_ids.get(operator_name), "line")
+
     seen = set()
     edges = []
 
@@ -178,17 +931,22 @@ def edges_for_operator(graph: Dict, operator_name: str) -> List[Dict]:
     return edges
 
 
+@cached_query
 def edges_for_line(graph: Dict, line_id: str) -> List[Dict]:
     """
     Get all edges for a specific line/route.
 
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         line_id: Line identifier (e.g., "R001")
 
     Returns:
         List of edge dicts with from, to, operator, time, service_type
     """
+    if isinstance(graph, NetworkIndex):
+        return _index_edges_matching(graph, "edge_lines",
+                                     graph.line_ids.get(line_id), "operator")
+
     seen = set()
     edges = []
 
@@ -215,12 +973,57 @@ def edges_for_line(graph: Dict, line_id: str) -> List[Dict]:
     return edges
 
 
+def _index_edges_matching(index: NetworkIndex, attr: str, value: Optional[int],
+                          label_field: str) -> List[Dict]:
+    """
+    NetworkIndex version of edges_for_operator()/edges_for_line().
+
+    Args:
+        index: NetworkIndex to scan
+        attr: Per-edge ID array to filter on ("edge_operators" or "edge_lines")
+        value: ID to match, or None if the name is not in the network
+        label_field: Which of "line"/"operator" to report for each edge
+
+    Returns:
+        List of unique edge dicts in the same order as the dict-graph version
+    """
+    if value is None:
+        return []
+
+    labels = index.lines if label_field == "line" else index.operators
+    label_ids = index.edge_lines if label_field == "line" else index.edge_operators
+    stations = index.stations
+    seen = set()
+    edges = []
+
+    # Matching edge IDs are in station order, so this visits edges in the
+    # same order as walking graph.items()
+    for eid in index.edges_with(attr, value):
+        u = index.edge_source(eid)
+        v = index.targets[eid]
+        key = (u, v) if u < v else (v, u)
+
+        if key in seen:
+            continue
+
+        seen.add(key)
+        edges.append({
+            "from": stations[u],
+            "to": stations[v],
+            label_field: labels[label_ids[eid]],
+            "time": index.times[eid],
+            "service_type": index.service_types[index.edge_service_types[eid]],
+        })
+
+    return edges
+
+
 def all_stations(graph: Dict) -> List[str]:
     """
     Get all station names in the network.
 
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
 
     Returns:
         Sorted list of station names
@@ -228,12 +1031,13 @@ def all_stations(graph: Dict) -> List[str]:
     return sorted(graph.keys())
 
 
+@cached_query
 def station_connections(graph: Dict, station: str) -> List[str]:
     """
     Get all stations directly connected to the given station.
 
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         station: Station name
 
     Returns:
@@ -242,6 +1046,11 @@ def station_connections(graph: Dict, station: str) -> List[str]:
     if station not in graph:
         return []
 
+    if isinstance(graph, NetworkIndex):
+        sid = graph.station_ids[station]
+        ids = set(graph.targets[graph.offsets[sid]:graph.offsets[sid + 1]])
+        return sorted(graph.stations[t] for t in ids)
+
     connected = {edge["to"] for edge in graph[station]}
     return sorted(connected)
 
@@ -251,7 +1060,7 @@ def search_stations(graph: Dict, query: str) -> List[str]:
     Search for stations matching a query string (case-insensitive fuzzy search).
 
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         query: Search string
 
     Returns:
@@ -281,12 +1090,13 @@ def search_stations(graph: Dict, query: str) -> List[str]:
     return word_matches
 
 
+@cached_query
 def station_info(graph: Dict, station: str) -> Optional[Dict]:
     """
     Get comprehensive information about a station.
 
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         station: Station name
 
     Returns:
@@ -311,42 +1121,98 @@ def station_info(graph: Dict, station: str) -> Optional[Dict]:
     }
 
 
+def _trace_line(out_edges, start_node, end_node, line) -> Optional[Tuple[List, List]]:
+    """
+    Breadth-first search from start_node to end_node using only edges of one line.
+
+    Returns:
+        Tuple of (nodes, steps) where steps are (from_node, edge_ref, time)
+        for each segment, or None if the line does not connect the two nodes
+    """
+    parent = {start_node: None}
+    queue = deque([start_node])
+
+    while queue:
+        current = queue.popleft()
+        if current == end_node:
+            break
+
+        # Explore neighbors on this line only
+        for next_node, edge_line, travel_time, ref in out_edges(current):
+            if edge_line == line and next_node not in parent:
+                parent[next_node] = (current, ref, travel_time)
+                queue.append(next_node)
+
+    if end_node not in parent:
+        return None
+
+    nodes = [end_node]
+    steps = []
+    step = parent[end_node]
+    while step is not None:
+        steps.append(step)
+        nodes.append(step[0])
+        step = parent[step[0]]
+
+    nodes.reverse()
+    steps.reverse()
+    return nodes, steps
+
+
 def services_on_same_line(graph: Dict, station_a: str, station_b: str) -> List[Dict]:
     """
     Find services where both stations are on the same line (multi-segment check).
     This checks if you can travel from A to B on the same line without changing trains.
 
+    Traces the path on each common line to verify the line really connects
+    the two stations.
+
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         station_a: Starting station
         station_b: Destination station
 
     Returns:
-        List of line services connecting the stations
+        List of valid routes on the same line with path details
     """
     if station_a not in graph or station_b not in graph:
         return []
 
-    # Get all lines serving station_a
-    lines_at_a = {edge["line"]: edge for edge in graph[station_a]}
+    # Lines serving both stations, as one AND of their line masks
+    bitsets = station_bitsets(graph)
+    common = bitsets.common_line_mask(station_a, station_b)
+    if not common:
+        return []
 
-    # Get all lines serving station_b
-    lines_at_b = {edge["line"]: edge for edge in graph[station_b]}
+    node_of, name_of, out_edges, leg_of, edge_of = _search_space(graph)
+    node_a = node_of(station_a)
+    node_b = node_of(station_b)
 
-    # Find common lines
-    common_lines = set(lines_at_a.keys()) & set(lines_at_b.keys())
+    # Get all lines serving station_a (line -> an edge on that line)
+    lines_at_a = {line: ref for _, line, _, ref in out_edges(node_a)}
+    if isinstance(graph, NetworkIndex):
+        common_lines = [graph.line_ids[line] for line in bitsets.line_names(common)]
+    else:
+        common_lines = bitsets.line_names(common)
 
     services = []
-    for line_id in common_lines:
-        # For each common line, check if there's a path from A to B on that line
-        edge_a = lines_at_a[line_id]
+    for line in common_lines:
+        # For each common line, trace a path from A to B using only edges from that line
+        traced = _trace_line(out_edges, node_a, node_b, line)
+        if traced is None:
+            continue
 
+        nodes, steps = traced
+        edge_info = edge_of(lines_at_a[line])
         services.append({
-            'line': line_id,
-            'operator': edge_a['operator'],
-            'service_type': edge_a['service_type'],
-            'route_origin': edge_a.get('route_origin', ''),
-            'route_destination': edge_a.get('route_destination', '')
+            'line': edge_info['line'],
+            'operator': edge_info['operator'],
+            'service_type': edge_info['service_type'],
+            'route_origin': edge_info.get('route_origin', ''),
+            'route_destination': edge_info.get('route_destination', ''),
+            'path': [name_of(node) for node in nodes],
+            'total_time': sum(time for _, _, time in steps),
+            'legs': [leg_of(from_node, ref) for from_node, ref, _ in steps]
         })
 
     return services
@@ -358,7 +1224,7 @@ def find_interchanges(graph: Dict, station_a: str, station_b: str) -> List[str]:
     An interchange is a station that connects to both A and B.
 
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         station_a: First station
         station_b: Second station
 
@@ -368,24 +1234,275 @@ def find_interchanges(graph: Dict, station_a: str, station_b: str) -> List[str]:
     if station_a not in graph or station_b not in graph:
         return []
 
-    connections_a = set(station_connections(graph, station_a))
-    connections_b = set(station_connections(graph, station_b))
-
     # Stations that connect to both A and B
-    interchanges = connections_a & connections_b
+    return station_bitsets(graph).shared_neighbours(station_a, station_b)
+
+
+INTERCHANGE_PENALTY = 4.0  # minutes added for each change of line
+
+
+def _line_aware_search(out_edges, start_node, end_node=None, heuristic=None):
+    """
+    Dijkstra over (station, arriving line) states with parent pointers.
+
+    Keying states by the line you arrive on matters because the interchange
+    penalty depends on it: reaching a station early on the "wrong" line must
+    not prune a slightly later arrival that can carry straight on. A state is
+    only worth exploring while it beats the best arrival at that station by
+    less than one interchange penalty - otherwise changing trains there from
+    the best arrival is at least as good - which keeps the state space close
+    to the size of the station graph.
+
+    With a heuristic this is A*: states come off the queue by time plus a
+    lower bound on the minutes left, so the search heads towards end_node.
+    Improved states are simply queued again, so the answer stays exact even
+    where the bound is not consistent.
+
+    Args:
+        out_edges: Accessor from _search_space()
+        start_node: Search node to start from
+        end_node: Stop as soon as this node is settled (None = settle everything)
+        heuristic: Optional function node -> lower bound on minutes to end_node
+
+    Returns:
+        Tuple of (labels, end_state) where:
+        - labels: state -> (total_time, num_interchanges, previous_state, edge_ref)
+        - end_state: first settled state at end_node, or None
+    """
+    start_state = (start_node, None)
+    labels = {start_state: (0, 0, None, None)}
+    best_at = {start_node: 0}  # node -> best arrival time on any line
+    counter = 0
+    # Entries: (total_time + bound, num_changes, counter, node, arriving_line, total_time)
+    pq = [(0, 0, counter, start_node, None, 0)]
+
+    while pq:
+        _, changes, _, node, line, time = heapq.heappop(pq)
+        state = (node, line)
+        label = labels[state]
+        if label[0] != time or label[1] != changes:
+            continue  # Stale entry, a better label was pushed later
+
+        if node == end_node:
+            return labels, state
+
+        for next_node, next_line, travel_time, ref in out_edges(node):
+            if line is None or next_line == line:
+                new_time = time + travel_time
+                new_changes = changes
+            else:
+                new_time = time + travel_time + INTERCHANGE_PENALTY
+                new_changes = changes + 1
+
+            best_here = best_at.get(next_node)
+            if best_here is not None:
+                if new_time >= best_here + INTERCHANGE_PENALTY:
+                    continue
+                if new_time < best_here:
+                    best_at[next_node] = new_time
+            else:
+                best_at[next_node] = new_time
+
+            next_state = (next_node, next_line)
+            best = labels.get(next_state)
+            if best is None or new_time < best[0] or (new_time == best[0] and new_changes < best[1]):
+                labels[next_state] = (new_time, new_changes, state, ref)
+                counter += 1
+                priority = new_time if heuristic is None else new_time + heuristic(next_node)
+                heapq.heappush(pq, (priority, new_changes, counter, next_node, next_line,
+                                    new_time))
+
+    return labels, None
+
+
+def _time_to_end(out_edges, end_node):
+    """
+    Exact minutes left to end_node from every (station, arriving line) state.
+
+    Mirrors _line_aware_search(), run backwards from the end. Edges are bidirectional
+    with equal times, so out_edges() also lists every edge into a node.
+
+    Returns:
+        Function (node, arriving_line) -> minutes left, or None if end_node
+        can't be reached. Pass line None for the start of a journey.
+    """
+    by_state = {}  # (node, line) -> minutes left when arriving on that line
+    by_change = {end_node: 0}  # node -> minutes left after changing to the best line
+    by_state_get = by_state.get
+    by_change_get = by_change.get
+    counter = 0
+    # Entries: (minutes_left, counter, node, line); line None is a by_change entry
+    pq = [(0, counter, end_node, None)]
 
-    return sorted(interchanges)
+    while pq:
+        left, _, node, line = heapq.heappop(pq)
+        if line is None:
+            if by_change[node] != left:
+                continue
+        elif by_state[(node, line)] != left:
+            continue
+
+        for prev_node, prev_line, travel_time, _ in out_edges(node):
+            if line is not None and prev_line != line:
+                continue
+            # Arriving at prev_node on prev_line and riding it to node...
+            new_left = left + travel_time
+            state = (prev_node, prev_line)
+            if new_left < by_state_get(state, float('inf')):
+                by_state[state] = new_left
+                counter += 1
+                heapq.heappush(pq, (new_left, counter, prev_node, prev_line))
+            # ...or arriving on another line and changing onto it
+            new_left += INTERCHANGE_PENALTY
+            if new_left < by_change_get(prev_node, float('inf')):
+                by_change[prev_node] = new_left
+                counter += 1
+                heapq.heappush(pq, (new_left, counter, prev_node, None))
+
+    def time_left(node, line):
+        if node == end_node:
+            return 0
+        change = by_change_get(node)
+        if line is None:
+            return None if change is None else change - INTERCHANGE_PENALTY
+        same = by_state_get((node, line))
+        if same is None or (change is not None and change < same):
+            return change
+        return same
+
+    return time_left
+
+
+def _journey_from_state(labels, state, name_of, leg_of) -> Dict:
+    """Rebuild a shortest_path()-style journey by walking parent pointers back from state."""
+    total_time, num_changes, prev, ref = labels[state]
+    legs = []
+    nodes = [state[0]]
+    while prev is not None:
+        legs.append(leg_of(prev[0], ref))
+        nodes.append(prev[0])
+        _, _, prev, ref = labels[prev]
+
+    legs.reverse()
+    nodes.reverse()
+    return {
+        'stations': [name_of(node) for node in nodes],
+        'total_time': total_time,
+        'num_interchanges': num_changes,
+        'legs': legs
+    }
 
 
-def shortest_path(graph: Dict, start: str, end: str) -> Optional[Dict]:
+class CoordinateHeuristic:
+    """
+    A* guidance for shortest_path() from station x/y coordinates.
+
+    No train covers more map units per minute than the fastest segment in the
+    network, so straight-line distance to the destination divided by that
+    speed never overestimates the minutes left. Stations without coordinates
+    get a bound of 0; runs of them between located stations are included
+    when working out the speed so the bound stays admissible.
+
+    Usage:
+        coords = plot_helpers.load_station_coords("station_coords.csv")
+        guide = rail_helpers.CoordinateHeuristic(graph, coords)
+        rail_helpers.shortest_path(graph, "Llyn-by-the-Sea", "Airport Terminal 3", guide)
+    """
+
+    def __init__(self, graph: Dict, coords: Dict[str, Tuple[float, float]]):
+        """
+        Args:
+            graph: Network graph from load_rail_network() or a NetworkIndex
+            coords: Dict mapping station name to (x, y), e.g. from
+                plot_helpers.load_station_coords()
+        """
+        node_of, _, out_edges, _, _ = _search_space(graph)
+        self.graph = graph
+        # Search node -> (x, y), for stations in both the graph and coords
+        self.coords = {}
+        for station, xy in coords.items():
+            node = node_of(station)
+            if node is not None:
+                self.coords[node] = xy
+        self.speed = self._max_speed(graph, node_of, out_edges)
+
+    def _max_speed(self, graph, node_of, out_edges) -> float:
+        """Fastest map units per minute between located stations."""
+        coords = self.coords
+        speed = 0.0
+        for station in graph:
+            u = node_of(station)
+            if u not in coords:
+                continue
+            ux, uy = coords[u]
+            # Dijkstra through stations without coordinates, so a located
+            # station reached via them is measured against the whole run
+            dist = {u: 0.0}
+            pq = [(0.0, 0, u)]
+            counter = 0
+            while pq:
+                time, _, node = heapq.heappop(pq)
+                if time > dist[node]:
+                    continue
+                if node != u and node in coords:
+                    vx, vy = coords[node]
+                    gap = math.hypot(vx - ux, vy - uy)
+                    if gap > 0:
+                        if time <= 0:
+                            return math.inf
+                        speed = max(speed, gap / time)
+                    continue
+                for next_node, _, travel_time, _ in out_edges(node):
+                    new_time = time + travel_time
+                    if new_time < dist.get(next_node, math.inf):
+                        dist[next_node] = new_time
+                        counter += 1
+                        heapq.heappush(pq, (new_time, counter, next_node))
+        return speed
+
+    def towards(self, end: str):
+        """
+        Return a lower bound function node -> minutes to end, or None.
+
+        None means A* can't help (the destination has no coordinates or
+        some segment takes no time at all) and a plain search should be used.
+        """
+        end_node = _search_space(self.graph)[0](end)
+        if end_node not in self.coords or not 0 < self.speed < math.inf:
+            return None
+        ex, ey = self.coords[end_node]
+        coords_get = self.coords.get
+        speed = self.speed
+
+        def minutes_left(node):
+            xy = coords_get(node)
+            if xy is None:
+                return 0.0
+            return math.hypot(ex - xy[0], ey - xy[1]) / speed
+
+        return minutes_left
+
+
+@cached_query
+def shortest_path(graph: Dict, start: str, end: str,
+                  guide: Optional[CoordinateHeuristic] = None) -> Optional[Dict]:
     """
     Find the shortest path between two stations using Dijkstra's algorithm.
     Handles any number of interchanges automatically.
 
+    The search runs over (station, arriving line) states, so a 4 minute
+    interchange penalty is charged exactly when the line changes, and keeps
+    parent pointers so the journey is only rebuilt once at the end.
+
+    Pass a CoordinateHeuristic to run A* instead: same answer, fewer stations
+    explored on long trips. If the destination has no coordinates the search
+    falls back to plain Dijkstra.
+
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         start: Starting station name
         end: Destination station name
+        guide: Optional CoordinateHeuristic built for the same graph
 
     Returns:
         Dict with path details or None if no path exists:
@@ -406,7 +1523,56 @@ def shortest_path(graph: Dict, start: str, end: str) -> Optional[Dict]:
             ]
         }
     """
-    import heapq
+    if start not in graph or end not in graph:
+        return None
+
+    if start == end:
+        return {
+            'stations': [start],
+            'total_time': 0,
+            'num_interchanges': 0,
+            'legs': []
+        }
+
+    node_of, name_of, out_edges, leg_of, _ = _search_space(graph)
+    heuristic = guide.towards(end) if guide is not None else None
+    labels, end_state = _line_aware_search(out_edges, node_of(start), node_of(end), heuristic)
+
+    # No path found
+    if end_state is None:
+        return None
+
+    return _journey_from_state(labels, end_state, name_of, leg_of)
+
+
+@cached_query
+def find_best_route(graph: Dict, start: str, end: str,
+                    table: Optional["JourneyTable"] = None,
+                    guide: Optional[CoordinateHeuristic] = None) -> Optional[Dict]:
+    """
+    Find the best route between two stations.
+
+    First checks for direct services on the same line, then uses Dijkstra.
+    This avoids Dijkstra preferring routes with shorter individual segments
+    but more transfers over longer-segment direct routes.
+
+    Pass a JourneyTable (see journey_table()) to answer from the precomputed
+    all-pairs table instead; stations the table doesn't know, or a table
+    that hasn't been built for the current CSV, fall back to searching the
+    graph.
+
+    Args:
+        graph: Network graph from load_rail_network() or a NetworkIndex
+        start: Starting station name
+        end: Destination station name
+        table: Optional precomputed JourneyTable for the same network
+        guide: Optional CoordinateHeuristic to run the multi-leg search as A*
+
+    Returns:
+        Dict with path details or None if no path exists (same format as shortest_path)
+    """
+    if table is not None and table.has_station(start) and table.has_station(end):
+        return table.lookup(start, end)
 
     if start not in graph or end not in graph:
         return None
@@ -419,69 +1585,858 @@ def shortest_path(graph: Dict, start: str, end: str) -> Optional[Dict]:
             'legs': []
         }
 
-    # Dijkstra's algorithm with priority queue
-    # State: (cumulative_time, counter, current_station, path_of_stations, legs, num_changes)
-    # Counter is used as tiebreaker to avoid comparing dicts/lists
+    # STEP 1: Check for direct routes on the same line
+    same_line_routes = services_on_same_line(graph, start, end)
+
+    if same_line_routes:
+        # Found routes on the same line - return the fastest one
+        best_route = min(same_line_routes, key=lambda r: (r['total_time'], r['line']))
+
+        return {
+            'stations': best_route['path'],
+            'total_time': best_route['total_time'],
+            'num_interchanges': 0,
+            'legs': best_route['legs']
+        }
+
+    # STEP 2: No direct route found - use Dijkstra for multi-leg journey
+    return shortest_path(graph, start, end, guide)
+
+
+def _passes_through(labels, key, node) -> bool:
+    """True if the settled label chain ending at key already visits node."""
+    while key is not None:
+        if key[0] == node:
+            return True
+        key = labels[key][2]
+    return False
+
+
+def k_best_journeys(graph: Dict, start: str, end: str, k: int = 3) -> List[Dict]:
+    """
+    Find the k fastest journeys that ride different sequences of lines.
+
+    Best-first label search over the same (station, arriving line) states as
+    shortest_path(), keeping up to k labels per state instead of one - the
+    k-shortest-walks idea behind Eppstein's algorithm, without materialising
+    a path graph. Two journeys with the same line sequence (say, changing
+    between the same two lines at a different station) count once: at any
+    state only the fastest label per line sequence survives, since every
+    continuation of a slower duplicate is beaten by the same continuation of
+    the faster one. Labels are ordered by time plus the exact minutes left
+    (from one backwards search from the destination), so the search runs
+    straight down the fastest journey, widens only as far as the k-th one
+    needs and stops as soon as it arrives.
+
+    Journeys never pass through a station twice. The per-state pruning
+    ignores that rule, so on small, loopy networks a slower alternative whose
+    faster duplicates could only continue by doubling back may be missed.
+    The first journey is always as fast as shortest_path()'s.
+
+    Args:
+        graph: Network graph from load_rail_network() or a NetworkIndex
+        start: Starting station name
+        end: Destination station name
+        k: Number of alternatives to return
+
+    Returns:
+        List of up to k journey dicts (same format as shortest_path), fastest
+        first
+    """
+    if k < 1 or start not in graph or end not in graph:
+        return []
+
+    if start == end:
+        return [{
+            'stations': [start],
+            'total_time': 0,
+            'num_interchanges': 0,
+            'legs': []
+        }]
+
+    node_of, name_of, out_edges, leg_of, _ = _search_space(graph)
+    start_node, end_node = node_of(start), node_of(end)
+
+    # States that never reach the end have no time left and are skipped
+    time_left = _time_to_end(out_edges, end_node)
+
+    # labels: (node, label number) -> (total_time, num_changes, previous key, edge_ref),
+    # so _journey_from_state() can walk them. Only settled labels are stored.
+    labels = {}
+    settled = defaultdict(list)  # (node, arriving line) -> line sequences settled there
+    found = []
     counter = 0
-    pq = [(0, counter, start, [start], [], 0)]
-    visited = {}  # station -> best_time_so_far
+    # Entries: (total_time + time_left, total_time, num_changes, counter, node, lines,
+    #           previous key, edge_ref)
+    pq = [(time_left(start_node, None), 0, 0, counter, start_node, (), None, None)]
+    if pq[0][0] is None:
+        return []
+
+    while pq:
+        _, time, changes, count, node, lines, prev, ref = heapq.heappop(pq)
+        line = lines[-1] if lines else None
+        # time_left is the same for every label at a state, so labels at one
+        # state still settle in time order, which the pruning relies on
+        seqs = settled[(node, line)]
+        if len(seqs) >= k or lines in seqs or _passes_through(labels, prev, node):
+            continue
+        seqs.append(lines)
+        key = (node, count)
+        labels[key] = (time, changes, prev, ref)
+
+        if node == end_node:
+            # Every settled label at the end has a distinct line sequence
+            found.append(key)
+            if len(found) == k:
+                break
+            continue
+
+        for next_node, next_line, travel_time, edge_ref in out_edges(node):
+            if line is None:
+                new_time, new_changes, new_lines = time + travel_time, 0, (next_line,)
+            elif next_line == line:
+                new_time, new_changes, new_lines = time + travel_time, changes, lines
+            else:
+                new_time = time + travel_time + INTERCHANGE_PENALTY
+                new_changes = changes + 1
+                new_lines = lines + (next_line,)
+
+            seqs = settled.get((next_node, next_line))
+            if seqs is not None and (len(seqs) >= k or new_lines in seqs):
+                continue
+            left = time_left(next_node, next_line)
+            if left is None:
+                continue
+            counter += 1
+            heapq.heappush(pq, (new_time + left, new_time, new_changes, counter, next_node,
+                                new_lines, key, edge_ref))
+
+    return [_journey_from_state(labels, key, name_of, leg_of) for key in found]
+
+
+# --- Fares -------------------------------------------------------------------
+
+def _parse_points(price: str) -> int:
+    """Points from a knowledge base price such as "450 Points + 90 Experience" ("Free" = 0)."""
+    words = price.split()
+    if len(words) >= 2 and words[1].lower().startswith("point") and words[0].isdigit():
+        return int(words[0])
+    return 0
+
+
+def load_line_prices(path="stepford_routes_with_segment_minutes_ai_knowledge_base.json",
+                     metadata_path: Optional[str] = None) -> Dict[str, int]:
+    """
+    Load the points cost of each line (route code).
+
+    Args:
+        path: Path to the JSON knowledge base (route "price" strings)
+        metadata_path: Optional scr_route_metadata_full.csv; its price_points
+            column overrides the JSON for the routes it lists
+
+    Returns:
+        Dict mapping line ID -> points charged for boarding it
+    """
+    import json
+
+    with open(path, encoding="utf-8") as f:
+        routes = json.load(f).get("routes", {})
+    prices = {code: _parse_points(route.get("price", "")) for code, route in routes.items()}
+
+    if metadata_path is not None:
+        import io
 
-    INTERCHANGE_PENALTY = 4.0  # minutes for each interchange
+        # The file starts with a blank line before the header
+        with open(metadata_path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(io.StringIO(f.read().lstrip()))
+            for row in reader:
+                points = (row.get("price_points") or "").strip()
+                if points:
+                    prices[row["route_code"]] = int(float(points))
+
+    return prices
+
+
+def pareto_journeys(graph: Dict, start: str, end: str, prices: Dict[str, int],
+                    max_interchanges: Optional[int] = None) -> List[Dict]:
+    """
+    Find every journey that is best on some trade-off of time, changes and points.
+
+    Multi-label search over (station, arriving line) states: each state keeps
+    every label (total_time, num_interchanges, points) that no other label
+    there beats on all three. Boarding a line - the first one or after a
+    change - costs its price. Labels are small tuples and pop in
+    lexicographic order, so once a label is settled it is final, and any
+    label already beaten by a journey found to the destination is dropped,
+    which keeps the work bounded as routes are added.
+
+    Args:
+        graph: Network graph from load_rail_network() or a NetworkIndex
+        start: Starting station name
+        end: Destination station name
+        prices: Line ID -> points, from load_line_prices(); unlisted lines are free
+        max_interchanges: Optional cap on changes of train
+
+    Returns:
+        List of non-dominated journey dicts (shortest_path format plus
+        'points'), fastest first. Each can be passed to format_journey().
+    """
+    if start not in graph or end not in graph:
+        return []
+
+    if start == end:
+        return [{
+            'stations': [start],
+            'total_time': 0,
+            'num_interchanges': 0,
+            'points': 0,
+            'legs': []
+        }]
+
+    node_of, name_of, out_edges, leg_of, _ = _search_space(graph)
+    if isinstance(graph, NetworkIndex):
+        price_of = {graph.line_ids[line]: points for line, points in prices.items()
+                    if line in graph.line_ids}.get
+    else:
+        price_of = prices.get
+    start_node, end_node = node_of(start), node_of(end)
+
+    def beaten(vectors, time, changes, points):
+        for t, c, p in vectors:
+            if t <= time and c <= changes and p <= points:
+                return True
+        return False
+
+    # labels: (node, label number) -> (total_time, num_changes, previous key, edge_ref)
+    labels = {}
+    settled = defaultdict(list)     # (node, arriving line) -> settled (time, changes, points)
+    settled_at = defaultdict(list)  # node -> settled (time, changes, points) on any line
+    found = []                      # (time, changes, points) of journeys to end
+    found_keys = []
+    counter = 0
+    # Entries: (total_time, num_changes, points, counter, node, line, previous key, edge_ref)
+    pq = [(0, 0, 0, counter, start_node, None, None, None)]
 
     while pq:
-        current_time, _, current_station, path, legs, num_changes = heapq.heappop(pq)
-
-        # If we've reached the destination
-        if current_station == end:
-            return {
-                'stations': path,
-                'total_time': current_time,
-                'num_interchanges': num_changes,
-                'legs': legs
-            }
+        time, changes, points, count, node, line, prev, ref = heapq.heappop(pq)
+        # Changing onto this line from a label settled here on another one
+        # costs a penalty, a change and the fare
+        fare = price_of(line, 0)
+        via_change = ((t + INTERCHANGE_PENALTY, c + 1, p + fare) for t, c, p in settled_at[node])
+        if (beaten(found, time, changes, points)
+                or beaten(settled[(node, line)], time, changes, points)
+                or beaten(via_change, time, changes, points)):
+            continue
+        settled[(node, line)].append((time, changes, points))
+        settled_at[node].append((time, changes, points))
+        key = (node, count)
+        labels[key] = (time, changes, prev, ref)
+
+        if node == end_node:
+            found.append((time, changes, points))
+            found_keys.append((key, points))
+            continue
 
-        # Skip if we've already found a better path to this station
-        if current_station in visited and visited[current_station] <= current_time:
+        for next_node, next_line, travel_time, edge_ref in out_edges(node):
+            if next_line == line:
+                new = (time + travel_time, changes, points)
+            elif line is None:
+                new = (time + travel_time, changes, points + price_of(next_line, 0))
+            else:
+                if max_interchanges is not None and changes >= max_interchanges:
+                    continue
+                new = (time + travel_time + INTERCHANGE_PENALTY, changes + 1,
+                       points + price_of(next_line, 0))
+            if beaten(found, *new) or beaten(settled.get((next_node, next_line), ()), *new):
+                continue
+            counter += 1
+            heapq.heappush(pq, new + (counter, next_node, next_line, key, edge_ref))
+
+    journeys = []
+    for key, points in found_keys:
+        journey = _journey_from_state(labels, key, name_of, leg_of)
+        journey['points'] = points
+        journeys.append(journey)
+    return journeys
+
+
+def reachable_within(graph: Dict, station: str, minutes: float,
+                     max_interchanges: Optional[int] = None) -> List[Dict]:
+    """
+    Find every station that can be reached from a station within a time budget.
+
+    Runs one Dijkstra over (station, arriving line) states from the origin
+    and never queues anything past the budget, instead of calling
+    shortest_path() once per station. Labels pop in (time, changes) order;
+    a state only settles a label with fewer changes than the ones already
+    settled there, so with max_interchanges every station still gets its
+    fastest journey within the cap. Equally fast journeys are settled
+    fewest changes first.
+
+    Usage:
+        rail_helpers.reachable_within(graph, "Benton", 15)
+
+    Args:
+        graph: Network graph from load_rail_network() or a NetworkIndex
+        station: Origin station name
+        minutes: Time budget, including interchange penalties
+        max_interchanges: Optional cap on changes of train
+
+    Returns:
+        List of {'station', 'time', 'num_interchanges'} dicts, nearest first,
+        starting with the origin itself at 0 minutes. Empty if the station
+        is unknown.
+    """
+    if station not in graph:
+        return []
+
+    node_of, name_of, out_edges, _, _ = _search_space(graph)
+    fewest = {}                     # (node, arriving line) -> fewest changes settled there
+    settled_at = defaultdict(list)  # node -> settled (time, changes) on any line
+    reached = {}                    # node -> (time, changes) of its first settled label
+    counter = 0
+    # Entries: (total_time, num_changes, counter, node, arriving_line)
+    pq = [(0, 0, counter, node_of(station), None)]
+
+    while pq:
+        time, changes, _, node, line = heapq.heappop(pq)
+        if fewest.get((node, line), changes + 1) <= changes:
+            continue
+        # Changing onto this line from a label settled here on another one
+        # is at least as good for anything that follows
+        if any(t + INTERCHANGE_PENALTY <= time and c < changes for t, c in settled_at[node]):
             continue
-        visited[current_station] = current_time
-
-        # Explore neighbors
-        for edge in graph[current_station]:
-            next_station = edge["to"]
-            travel_time = edge["time"]
-
-            # Calculate interchange penalty
-            # Add penalty if we're changing from a previous line
-            interchange_time = 0
-            if legs:  # Not the first leg
-                last_line = legs[-1]["line"]
-                current_line = edge["line"]
-                if last_line != current_line:
-                    interchange_time = INTERCHANGE_PENALTY
-                    new_num_changes = num_changes + 1
-                else:
-                    new_num_changes = num_changes
+        fewest[(node, line)] = changes
+        settled_at[node].append((time, changes))
+        if node not in reached:
+            reached[node] = (time, changes)
+
+        for next_node, next_line, travel_time, _ in out_edges(node):
+            if line is None or next_line == line:
+                new_time, new_changes = time + travel_time, changes
+            elif max_interchanges is not None and changes >= max_interchanges:
+                continue
             else:
-                new_num_changes = 0
-
-            new_time = current_time + travel_time + interchange_time
-            new_path = path + [next_station]
-            new_legs = legs + [{
-                'from': current_station,
-                'to': next_station,
-                'operator': edge["operator"],
-                'line': edge["line"],
-                'time': travel_time,
-                'service_type': edge["service_type"]
-            }]
-
-            # Only add to queue if we haven't visited or found a better route
-            if next_station not in visited or visited[next_station] > new_time:
-                counter += 1
-                heapq.heappush(pq, (new_time, counter, next_station, new_path, new_legs, new_num_changes))
+                new_time, new_changes = time + travel_time + INTERCHANGE_PENALTY, changes + 1
+            if new_time > minutes or fewest.get((next_node, next_line), new_changes + 1) <= new_changes:
+                continue
+            counter += 1
+            heapq.heappush(pq, (new_time, new_changes, counter, next_node, next_line))
 
-    # No path found
-    return None
+    # Settled in (time, changes) order, so reached is already nearest first
+    return [{'station': name_of(node), 'time': time, 'num_interchanges': changes}
+            for node, (time, changes) in reached.items()]
+
+
+# --- Precomputed all-pairs journey table -------------------------------------
+
+JOURNEY_TABLE_VERSION = 1
+CACHE_DIR_NAME = ".rail_cache"
+
+
+def file_hash(path: str) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_cache_file(path: str, version: int, source_hash: str) -> Optional[Dict]:
+    """
+    Load a pickled cache file written by write_cache_file().
+
+    A missing, truncated or unreadable file is treated like a stale one, so
+    an interrupted build never breaks later loads.
+
+    Args:
+        path: Cache file location
+        version: The format version the caller understands
+        source_hash: Hash of the source file the cache must have been built from
+
+    Returns:
+        The stored dict, or None if there is no usable cache for this source
+    """
+    import pickle
+
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except OSError:  # Missing, unreadable or a directory
+        return None
+    except (pickle.UnpicklingError, EOFError, AttributeError, ValueError, ImportError, IndexError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != version or data.get("source_hash") != source_hash:
+        return None
+    return data
+
+
+def write_cache_file(path: str, data: Dict) -> None:
+    """
+    Pickle data to path atomically.
+
+    Writes to a per-process temporary file and renames it over path, so
+    readers see either the old file or the complete new one.
+    """
+    import pickle
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _best_routes_from(index: NetworkIndex, origin: int) -> List[Optional[Tuple[float, int, List[int]]]]:
+    """
+    find_best_route() from one origin to every station, in one pass.
+
+    Runs one same-line BFS per line at the origin and one single-source
+    line-aware Dijkstra, instead of a search per destination.
+
+    Returns:
+        List indexed by destination station ID of (total_time, num_interchanges,
+        edge_ids) or None when the destination is unreachable
+    """
+    num_stations = len(index.stations)
+    best = [None] * num_stations
+    best[origin] = (0, 0, [])
+
+    # STEP 1: same-line journeys (fastest line wins, ties broken by line name)
+    same_line = {}
+    for line in sorted(set(index.edge_lines[index.offsets[origin]:index.offsets[origin + 1]]),
+                       key=index.lines.__getitem__):
+        parent = {origin: None}
+        queue = deque([origin])
+        while queue:
+            current = queue.popleft()
+            for next_node, edge_line, travel_time, eid in index.out_edges(current):
+                if edge_line == line and next_node not in parent:
+                    parent[next_node] = (current, eid)
+                    queue.append(next_node)
+
+        for node in parent:
+            if node == origin:
+                continue
+            eids = []
+            step = parent[node]
+            while step is not None:
+                eids.append(step[1])
+                step = parent[step[0]]
+            eids.reverse()
+            # Sum in travel order, as services_on_same_line() does
+            total_time = sum(index.times[eid] for eid in eids)
+            if node not in same_line or total_time < same_line[node][0]:
+                same_line[node] = (total_time, 0, eids)
+
+    # STEP 2: everything else from one single-source line-aware Dijkstra
+    labels, _ = _line_aware_search(index.out_edges, origin)
+    best_state = {}
+    for state, (time, changes, _, _) in labels.items():
+        node = state[0]
+        current = best_state.get(node)
+        if current is None or (time, changes) < labels[current][:2]:
+            best_state[node] = state
+
+    for node in range(num_stations):
+        if node == origin:
+            continue
+        if node in same_line:
+            best[node] = same_line[node]
+        elif node in best_state:
+            state = best_state[node]
+            time, changes, prev, eid = labels[state]
+            eids = []
+            while prev is not None:
+                eids.append(eid)
+                _, _, prev, eid = labels[prev]
+            eids.reverse()
+            best[node] = (time, changes, eids)
+
+    return best
+
+
+_WORKER_INDEX = None
+
+
+def _init_table_worker(csv_path: str) -> None:
+    global _WORKER_INDEX
+    _WORKER_INDEX = NetworkIndex.from_csv(csv_path)
+
+
+def _table_worker(origins: List[int]) -> List[Tuple[int, List]]:
+    return [(origin, _best_routes_from(_WORKER_INDEX, origin)) for origin in origins]
+
+
+def build_journey_table(path="rail_routes.csv", cache_dir: Optional[str] = None,
+                        jobs: Optional[int] = None) -> "JourneyTable":
+    """
+    Precompute find_best_route() for every ordered station pair and save it to disk.
+
+    Origins are spread across a process pool, each worker loading its own
+    NetworkIndex once. The table is written to
+    ``<cache_dir>/journey_table_<csv hash>.pkl`` (cache_dir defaults to a
+    .rail_cache folder next to the CSV), so a changed CSV gets a new table.
+
+    Args:
+        path: Path to the rail_routes.csv file
+        cache_dir: Where to write the table (default: .rail_cache next to the CSV)
+        jobs: Worker processes (default: CPU count; 1 builds in this process)
+
+    Returns:
+        The loaded JourneyTable
+    """
+    signature = JourneyTable._csv_signature(path)
+    source_hash = file_hash(path)
+    index = NetworkIndex.from_csv(path)
+    num_stations = len(index.stations)
+    jobs = jobs or os.cpu_count() or 1
+
+    results = [None] * num_stations
+    if jobs == 1 or num_stations < 2 * jobs:
+        for origin in range(num_stations):
+            results[origin] = _best_routes_from(index, origin)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Interleave origins so each chunk mixes hubs and quiet stations
+        chunks = [list(range(num_stations))[i::jobs * 4] for i in range(jobs * 4)]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_table_worker,
+                                 initargs=(path,)) as pool:
+            for chunk in pool.map(_table_worker, chunks):
+                for origin, row in chunk:
+                    results[origin] = row
+
+    # Flatten into dense CSR-style arrays: pair (a, b) is slot a * n + b
+    pair_offsets = array("i", [0])
+    pair_edges = array("i")
+    pair_times = array("d")
+    pair_changes = array("H")
+    for row in results:
+        for entry in row:
+            if entry is None:
+                pair_times.append(float("nan"))
+                pair_changes.append(0)
+            else:
+                time, changes, eids = entry
+                pair_times.append(time)
+                pair_changes.append(changes)
+                pair_edges.extend(eids)
+            pair_offsets.append(len(pair_edges))
+
+    data = {
+        "version": JOURNEY_TABLE_VERSION,
+        "source_hash": source_hash,
+        "index": index,
+        "pair_offsets": pair_offsets,
+        "pair_edges": pair_edges,
+        "pair_times": pair_times,
+        "pair_changes": pair_changes,
+    }
+
+    write_cache_file(JourneyTable.table_path(path, cache_dir, source_hash), data)
+
+    table = JourneyTable(path, cache_dir)
+    table._data = data
+    table._signature = signature
+    return table
+
+
+class JourneyTable:
+    """
+    Lazily loaded all-pairs table of find_best_route() answers.
+
+    Nothing is read until the first lookup. The table file is keyed by the
+    SHA-256 of the CSV, and every lookup checks the CSV's size and mtime
+    first, so after rail_routes.csv is edited the table for the old contents
+    is never served. Tables are only built by build_journey_table() (or the
+    --build-journey-table CLI), or on a miss when build=True; otherwise a
+    missing table makes has_station() False, so find_best_route() searches.
+    """
+
+    def __init__(self, path="rail_routes.csv", cache_dir: Optional[str] = None,
+                 jobs: Optional[int] = None, build: bool = False):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.jobs = jobs
+        self.build = build
+        self._data = None
+        self._signature = None  # (mtime_ns, size) of the CSV _data was checked against
+
+    @staticmethod
+    def table_path(path: str, cache_dir: Optional[str], source_hash: str) -> str:
+        """Return the on-disk location of the table for a CSV with the given hash."""
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+        return os.path.join(cache_dir, f"journey_table_{source_hash[:16]}.pkl")
+
+    @staticmethod
+    def _csv_signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> Optional[Dict]:
+        signature = self._csv_signature(self.path)
+        if signature is None:
+            self._data = self._signature = None
+            return None
+        if self._data is not None and signature == self._signature:
+            return self._data
+
+        source_hash = file_hash(self.path)
+        data = self._data
+        if data is None or data["source_hash"] != source_hash:
+            table_path = self.table_path(self.path, self.cache_dir, source_hash)
+            data = read_cache_file(table_path, JOURNEY_TABLE_VERSION, source_hash)
+            if data is None and self.build:
+                data = build_journey_table(self.path, self.cache_dir, self.jobs)._data
+
+        self._data = data
+        self._signature = signature if data is not None else None
+        return data
+
+    def has_station(self, station: str) -> bool:
+        """Return True if a table for the CSV's current contents exists and knows the station."""
+        data = self._load()
+        return data is not None and station in data["index"].station_ids
+
+    def lookup(self, start: str, end: str) -> Optional[Dict]:
+        """
+        Return the precomputed find_best_route() journey from start to end.
+
+        Returns:
+            Journey dict (same format as shortest_path) or None if either
+            station is unknown, no route exists or no table has been built
+            for the CSV's current contents
+        """
+        data = self._load()
+        if data is None:
+            return None
+        index = data["index"]
+        a = index.station_ids.get(start)
+        b = index.station_ids.get(end)
+        if a is None or b is None:
+            return None
+
+        slot = a * len(index.stations) + b
+        total_time = data["pair_times"][slot]
+        if total_time != total_time:  # NaN marks unreachable pairs
+            return None
+
+        stations = [start]
+        legs = []
+        node = a
+        for eid in data["pair_edges"][data["pair_offsets"][slot]:data["pair_offsets"][slot + 1]]:
+            legs.append(index.leg(node, eid))
+            node = index.targets[eid]
+            stations.append(index.stations[node])
+
+        return {
+            'stations': stations,
+            'total_time': total_time if legs else 0,
+            'num_interchanges': data["pair_changes"][slot],
+            'legs': legs
+        }
+
+
+_JOURNEY_TABLES: Dict[Tuple[str, Optional[str]], JourneyTable] = {}
+
+
+def journey_table(path="rail_routes.csv", cache_dir: Optional[str] = None) -> JourneyTable:
+    """
+    Return the shared lazily loaded JourneyTable for a CSV file.
+
+    The table itself is built by build_journey_table() or
+    ``python3 rail_helpers.py --build-journey-table``; until then
+    find_best_route() searches as if no table were passed.
+
+    Usage:
+        table = rail_helpers.journey_table("rail_routes.csv")
+        rail_helpers.find_best_route(graph, "Benton", "Llyn-by-the-Sea", table=table)
+    """
+    key = (os.path.abspath(path), cache_dir)
+    if key not in _JOURNEY_TABLES:
+        _JOURNEY_TABLES[key] = JourneyTable(path, cache_dir)
+    return _JOURNEY_TABLES[key]
+
+
+# --- Many-to-many journey matrix ---------------------------------------------
+
+def _matrix_row(index: NetworkIndex, origin: int,
+                destinations: List[Optional[int]]) -> Tuple[array, Dict[int, int]]:
+    """
+    shortest_path() minutes from one origin to every destination, in one search.
+
+    Returns:
+        Tuple of (minutes, interchanges) where minutes is an array('d') aligned
+        with destinations (NaN = unknown or unreachable) and interchanges maps
+        destination position -> interchange count, for non-zero counts only
+    """
+    labels, _ = _line_aware_search(index.out_edges, origin)
+    best = {}  # node -> (total_time, num_changes)
+    for (node, _), (time, changes, _, _) in labels.items():
+        current = best.get(node)
+        if current is None or (time, changes) < current:
+            best[node] = (time, changes)
+
+    minutes = array("d", [float("nan")]) * len(destinations)
+    interchanges = {}
+    for j, node in enumerate(destinations):
+        entry = best.get(node)
+        if entry is not None:
+            minutes[j] = entry[0]
+            if entry[1]:
+                interchanges[j] = entry[1]
+    return minutes, interchanges
+
+
+def _init_matrix_worker(index: NetworkIndex) -> None:
+    global _WORKER_INDEX
+    _WORKER_INDEX = index
+
+
+def _matrix_worker(task: Tuple[List[Tuple[int, int]], List[Optional[int]]]) -> List[Tuple]:
+    rows, destinations = task
+    return [(i, _matrix_row(_WORKER_INDEX, origin, destinations)) for i, origin in rows]
+
+
+def journey_matrix(graph: Dict, origins: List[str], destinations: List[str],
+                   jobs: Optional[int] = None, interchanges: bool = False) -> Dict:
+    """
+    Journey times from every origin to every destination.
+
+    Runs one single-source line-aware search per origin (not one search per
+    pair), spread over a process pool. Minutes match shortest_path().
+
+    Usage:
+        matrix = rail_helpers.journey_matrix(graph, ["Benton"], rail_helpers.all_stations(graph))
+        matrix['minutes'][0][matrix['destinations'].index("Llyn-by-the-Sea")]
+
+    Args:
+        graph: Network graph from load_rail_network() or a NetworkIndex
+        origins: Origin station names (matrix rows)
+        destinations: Destination station names (matrix columns)
+        jobs: Worker processes (default: CPU count; 1 searches in this process)
+        interchanges: Also return interchange counts
+
+    Returns:
+        Dict with:
+        - 'origins', 'destinations': the row and column station names
+        - 'minutes': one array('d') per origin, NaN where a station is
+          unknown or unreachable
+        - 'interchanges': (only if requested) dict of (row, column) -> count,
+          holding only the journeys that change trains
+    """
+    index = graph if isinstance(graph, NetworkIndex) else NetworkIndex.from_graph(graph)
+    origin_nodes = [index.station_id(station) for station in origins]
+    dest_nodes = [index.station_id(station) for station in destinations]
+    unknown = array("d", [float("nan")]) * len(destinations)
+
+    rows = [(i, node) for i, node in enumerate(origin_nodes) if node is not None]
+    results = {}
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(rows) < 2 * jobs:
+        for i, origin in rows:
+            results[i] = _matrix_row(index, origin, dest_nodes)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Interleave origins so each chunk mixes hubs and quiet stations
+        tasks = [(rows[k::jobs * 4], dest_nodes) for k in range(jobs * 4)]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_matrix_worker,
+                                 initargs=(index,)) as pool:
+            for chunk in pool.map(_matrix_worker, tasks):
+                results.update(chunk)
+
+    matrix = {
+        'origins': list(origins),
+        'destinations': list(destinations),
+        'minutes': [results[i][0] if i in results else array("d", unknown)
+                    for i in range(len(origins))],
+    }
+    if interchanges:
+        matrix['interchanges'] = {(i, j): count
+                                  for i, (_, counts) in results.items()
+                                  for j, count in counts.items()}
+    return matrix
+
+
+def write_journey_matrix_csv(matrix: Dict, path: str,
+                             interchanges_path: Optional[str] = None) -> None:
+    """
+    Write a journey_matrix() result as CSV.
+
+    The minutes file has one row per origin and one column per destination;
+    unreachable pairs are left empty. Interchange counts, if present and
+    interchanges_path is given, are written as origin,destination,interchanges
+    rows for the journeys that change trains.
+
+    Args:
+        matrix: Result of journey_matrix()
+        path: Output path for the minutes matrix
+        interchanges_path: Optional output path for the interchange counts
+    """
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["origin"] + matrix['destinations'])
+        for origin, row in zip(matrix['origins'], matrix['minutes']):
+            writer.writerow([origin] + ["" if m != m else round(m, 2) for m in row])
+
+    if interchanges_path is not None and 'interchanges' in matrix:
+        with open(interchanges_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["origin", "destination", "interchanges"])
+            for (i, j), count in sorted(matrix['interchanges'].items()):
+                writer.writerow([matrix['origins'][i], matrix['destinations'][j], count])
+
+
+def isochrones(matrix: Dict, minutes: float) -> Dict[str, List[Dict]]:
+    """
+    reachable_within() for every origin of a journey_matrix() at once.
+
+    Each row is filtered in one C-level pass (the budget comparison mapped
+    over the array('d'), then itertools.compress) instead of a search per
+    origin, so once the all-pairs matrix is built any number of budgets can
+    be tried cheaply. The matrix holds fastest journeys only, so there is no
+    interchange cap here; use reachable_within() for that.
+
+    Usage:
+        stations = rail_helpers.all_stations(graph)
+        matrix = rail_helpers.journey_matrix(graph, stations, stations, interchanges=True)
+        rail_helpers.isochrones(matrix, 15)["Benton"]
+
+    Args:
+        matrix: Result of journey_matrix()
+        minutes: Time budget, including interchange penalties
+
+    Returns:
+        Dict mapping origin -> list of {'station', 'time'} dicts, nearest
+        first (plus 'num_interchanges' if the matrix was built with
+        interchanges=True). Unknown origins map to an empty list.
+    """
+    from itertools import compress
+
+    destinations = matrix['destinations']
+    counts = matrix.get('interchanges')
+    within = float(minutes).__ge__  # NaN (unreachable) compares False
+    columns = range(len(destinations))
+    result = {}
+    for i, (origin, row) in enumerate(zip(matrix['origins'], matrix['minutes'])):
+        hits = sorted(compress(columns, map(within, row)), key=row.__getitem__)
+        if counts is None:
+            result[origin] = [{'station': destinations[j], 'time': row[j]} for j in hits]
+        else:
+            result[origin] = [{'station': destinations[j], 'time': row[j],
+                               'num_interchanges': counts.get((i, j), 0)} for j in hits]
+    return result
 
 
 def format_journey(journey: Dict) -> str:
@@ -504,6 +2459,8 @@ def format_journey(journey: Dict) -> str:
     output.append(f"Journey: {journey['stations'][0]} → {journey['stations'][-1]}")
     output.append(f"Total time: {journey['total_time']:.1f} minutes")
     output.append(f"Interchanges: {journey['num_interchanges']}")
+    if 'points' in journey:
+        output.append(f"Fares: {journey['points']} points")
     output.append("")
 
     current_line = None
@@ -557,7 +2514,7 @@ def print_operator_routes(graph: Dict, operator_name: str) -> None:
     Print all routes for a specific operator in a readable format.
 
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         operator_name: Operator name
     """
     edges = edges_for_operator(graph, operator_name)
@@ -588,7 +2545,7 @@ def print_station_summary(graph: Dict, station: str) -> None:
     Print a comprehensive summary of a station.
 
     Args:
-        graph: Network graph from load_rail_network()
+        graph: Network graph from load_rail_network() or a NetworkIndex
         station: Station name
     """
     info = station_info(graph, station)
@@ -611,6 +2568,33 @@ def print_station_summary(graph: Dict, station: str) -> None:
 
 # Example usage when run directly
 if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--build-journey-table":
+        # Build step: python3 rail_helpers.py --build-journey-table [csv] [jobs]
+        csv_path = sys.argv[2] if len(sys.argv) > 2 else "rail_routes.csv"
+        jobs = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        build_journey_table(csv_path, jobs=jobs)
+        print(f"✅ Journey table written to "
+              f"{JourneyTable.table_path(csv_path, None, file_hash(csv_path))}")
+        sys.exit(0)
+
+    if len(sys.argv) > 2 and sys.argv[1] == "--journey-matrix":
+        # python3 rail_helpers.py --journey-matrix out.csv [csv] [jobs] [--interchanges]
+        args = [a for a in sys.argv[2:] if a != "--interchanges"]
+        out_path = args[0]
+        csv_path = args[1] if len(args) > 1 else "rail_routes.csv"
+        jobs = int(args[2]) if len(args) > 2 else None
+        index = load_network_index(csv_path)
+        with_changes = "--interchanges" in sys.argv
+        matrix = journey_matrix(index, index.stations, index.stations, jobs, with_changes)
+        changes_path = os.path.splitext(out_path)[0] + "_interchanges.csv" if with_changes else None
+        write_journey_matrix_csv(matrix, out_path, changes_path)
+        print(f"✅ {len(index.stations)}x{len(index.stations)} journey matrix written to {out_path}")
+        if changes_path:
+            print(f"✅ Interchange counts written to {changes_path}")
+        sys.exit(0)
+
     print("Loading Stepford County Railway network...")
     graph, operators, lines = load_rail_network("rail_routes.csv")
 
@@ -647,7 +2631,7 @@ if __name__ == "__main__":
     print("\n" + "="*60)
     print("Example 4: Journey planning - Benton to Llyn-by-the-Sea")
     print("="*60)
-    journey = shortest_path(graph, "Benton", "Llyn-by-the-Sea")
+    journey = find_best_route(graph, "Benton", "Llyn-by-the-Sea")
     if journey:
         print(format_journey(journey))
     else:
@@ -10,88 +10,520 @@ This implements proper public transport routing logic:
 3. Identify which stations are passed but not stopped at
 
 No hardcoded corridors - everything is calculated algorithmically.
+
+`python3 route_corridor_calculator.py --all [--jobs N]` precomputes every
+route's corridor into .rail_cache/; calculators reuse that artifact while
+the knowledge base JSON is unchanged.
 """
 
-import json
+import os
+from array import array
 from collections import defaultdict, deque
 from typing import List, Dict, Tuple, Set, Optional
 
+ROUTES_FILE = 'stepford_routes_with_segment_minutes_ai_knowledge_base.json'
+CORRIDOR_ARTIFACT_VERSION = 1
 
-class RouteCorridorCalculator:
+
+def build_station_network(data: Dict) -> Dict[str, Set[str]]:
     """
-    Calculate route corridors and identify skipped stations.
+    Build the station network graph showing physical track connections.
 
-    This works like a real public transport routing engine:
-    - Network graph defines physical station connections
-    - Service data defines which stations are actually served
-    - Pathfinding calculates the corridor between consecutive stops
+    This is NOT the service graph - it's the underlying rail infrastructure.
+    Each edge represents a physical track connection between adjacent stations.
+
+    Uses the 'connections' data which shows all physical links, including
+    those used by express services that skip intermediate stations.
+
+    Args:
+        data: Parsed knowledge base JSON
+
+    Returns:
+        Dict mapping station name -> set of directly connected stations
     """
+    graph = defaultdict(set)
+
+    # Use the connections data if available (more accurate)
+    connections = data.get('connections', {})
+
+    if connections:
+        # Build from explicit connection data
+        for station, links in connections.items():
+            for link in links:
+                to_station = link.get('to_station')
+                if to_station:
+                    # Connections are already bidirectional in the data
+                    graph[station].add(to_station)
+    else:
+        # Fallback: Build from route stop lists
+        for route_code, route_data in data.get('routes', {}).items():
+            # Skip removed routes
+            if 'REMOVED' in route_data.get('route_type', ''):
+                continue
 
-    def __init__(self, routes_file='stepford_routes_with_segment_minutes_ai_knowledge_base.json'):
-        """Load route data and build the station network graph."""
-        with open(routes_file, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
+            stations = route_data.get('stations', [])
+            if len(stations) < 2:
+                continue
 
-        self.routes = self.data.get('routes', {})
-        self.stations_list = self.data.get('stations', [])
+            # Add edges between consecutive stations
+            for i in range(len(stations) - 1):
+                station_a = stations[i]
+                station_b = stations[i + 1]
 
-        # Build the physical station network graph
-        self.network_graph = self._build_station_network()
+                # Bidirectional
+                graph[station_a].add(station_b)
+                graph[station_b].add(station_a)
 
-    def _build_station_network(self) -> Dict[str, Set[str]]:
+    return graph
+
+
+class HopMatrix:
+    """
+    All-pairs hop distances and next hops over the physical station graph.
+
+    hops[a][b] is the number of track segments on a shortest path from
+    station ID a to b (-1 if unreachable) and next_hop[a][b] the station ID
+    after a on that path, so path() rebuilds any physical path by walking
+    next hops without searching. Rows are array('i') rows filled by one BFS
+    per station, which on the sparse track graph is O(n * (n + edges)); a
+    vectorized NumPy build (one dense n x n matrix product per BFS level)
+    costs more than that, so none is offered.
+    """
+
+    def __init__(self, stations: List[str], hops, next_hop):
+        self.stations = stations
+        self.station_ids = {name: i for i, name in enumerate(stations)}
+        self.hops = hops
+        self.next_hop = next_hop
+
+    @classmethod
+    def from_graph(cls, graph: Dict[str, Set[str]]) -> "HopMatrix":
         """
-        Build the station network graph showing physical track connections.
+        Build the matrices for a station -> adjacent stations graph.
 
-        This is NOT the service graph - it's the underlying rail infrastructure.
-        Each edge represents a physical track connection between adjacent stations.
+        Args:
+            graph: Physical network graph (RouteCorridorCalculator.network_graph)
 
-        Uses the 'connections' data which shows all physical links, including
-        those used by express services that skip intermediate stations.
+        Returns:
+            HopMatrix over every station in the graph
+        """
+        stations = sorted(set(graph) | {v for links in graph.values() for v in links})
+        ids = {name: i for i, name in enumerate(stations)}
+        out = [sorted(ids[v] for v in graph.get(name, ())) for name in stations]
+
+        n = len(out)
+        hops, next_hop = [], []
+        for source in range(n):
+            dist = array('i', [-1]) * n
+            first = array('i', [-1]) * n
+            dist[source] = 0
+            queue = deque([source])
+            while queue:
+                current = queue.popleft()
+                for neighbor in out[current]:
+                    if dist[neighbor] < 0:
+                        dist[neighbor] = dist[current] + 1
+                        first[neighbor] = neighbor if current == source else first[current]
+                        queue.append(neighbor)
+            hops.append(dist)
+            next_hop.append(first)
+        return cls(stations, hops, next_hop)
+
+    def distance(self, start: str, end: str) -> Optional[int]:
+        """Return the hop count from start to end, or None if either is unknown or unreachable."""
+        a = self.station_ids.get(start)
+        b = self.station_ids.get(end)
+        if a is None or b is None or self.hops[a][b] < 0:
+            return None
+        return self.hops[a][b]
+
+    def path(self, start: str, end: str) -> Optional[List[str]]:
+        """
+        Rebuild a shortest physical path by walking next hops.
 
         Returns:
-            Dict mapping station name -> set of directly connected stations
+            List of station names from start to end, or None if no path exists
+        """
+        a = self.station_ids.get(start)
+        b = self.station_ids.get(end)
+        if a is None or b is None or self.hops[a][b] < 0:
+            return None
+
+        path = [start]
+        next_row = self.next_hop
+        while a != b:
+            a = next_row[a][b]
+            path.append(self.stations[a])
+        return path
+
+
+STOP = 'stop'
+PASS = 'pass'
+
+
+class SkipIndex:
+    """
+    Stations x routes matrix of stop / pass / not-on-corridor states.
+
+    Built once from corridor results and stored as integer bitmasks, the
+    same way rail_helpers.StationBitsets stores memberships: bit r of
+    stopping[s] is set when route r stops at station s, bit r of passing[s]
+    when route r runs through s without stopping, and a station in neither
+    is not on the route's corridor. route_stops / route_passes hold the
+    transposed masks over station IDs. Removed routes are left out.
+    """
+
+    def __init__(self, routes: List[str], stations: List[str]):
+        self.routes = routes
+        self.stations = stations
+        self.route_ids = {code: i for i, code in enumerate(routes)}
+        self.station_ids = {name: i for i, name in enumerate(stations)}
+
+        self.stopping: List[int] = [0] * len(stations)
+        self.passing: List[int] = [0] * len(stations)
+        self.route_stops: List[int] = [0] * len(routes)
+        self.route_passes: List[int] = [0] * len(routes)
+        # Route code -> ((station, STOP or PASS), ...) in corridor order
+        self.patterns: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+
+    @classmethod
+    def from_corridors(cls, corridors: Dict[str, Dict], routes: Optional[Dict] = None) -> "SkipIndex":
         """
-        graph = defaultdict(set)
+        Build the index from calculate_route_corridor() results.
 
-        # Use the connections data if available (more accurate)
-        connections = self.data.get('connections', {})
+        Args:
+            corridors: Route code -> corridor dict (stops, corridor, skipped)
+            routes: Route code -> route data, used to leave out REMOVED
+                    routes (default: keep every corridor)
 
-        if connections:
-            # Build from explicit connection data
-            for station, links in connections.items():
-                for link in links:
-                    to_station = link.get('to_station')
-                    if to_station:
-                        # Connections are already bidirectional in the data
-                        graph[station].add(to_station)
-        else:
-            # Fallback: Build from route stop lists
-            for route_code, route_data in self.routes.items():
-                # Skip removed routes
-                if 'REMOVED' in route_data.get('route_type', ''):
-                    continue
+        Returns:
+            SkipIndex over every station on any kept corridor
+        """
+        kept = [code for code, corridor in corridors.items()
+                if corridor and not (routes and 'REMOVED' in routes.get(code, {}).get('route_type', ''))]
+        stations = sorted({station for code in kept
+                           for station in corridors[code]['corridor'] + corridors[code]['stops']})
+        index = cls(kept, stations)
+        station_ids = index.station_ids
+
+        for r, code in enumerate(kept):
+            corridor = corridors[code]
+            route_bit = 1 << r
+            for station in corridor['stops']:
+                s = station_ids[station]
+                index.stopping[s] |= route_bit
+                index.route_stops[r] |= 1 << s
+            for station in corridor['skipped']:
+                s = station_ids[station]
+                index.passing[s] |= route_bit
+                index.route_passes[r] |= 1 << s
+
+            stops = set(corridor['stops'])
+            index.patterns[code] = tuple((station, STOP if station in stops else PASS)
+                                         for station in corridor['corridor'])
+        return index
+
+    def _route_names(self, mask: int) -> List[str]:
+        from rail_helpers import _bits
+        return [self.routes[r] for r in _bits(mask)]
+
+    def passing_mask(self, station: str) -> int:
+        """Bitmask over route IDs of the routes passing station without stopping."""
+        s = self.station_ids.get(station)
+        return 0 if s is None else self.passing[s]
+
+    def stopping_mask(self, station: str) -> int:
+        """Bitmask over route IDs of the routes stopping at station."""
+        s = self.station_ids.get(station)
+        return 0 if s is None else self.stopping[s]
+
+    def routes_passing(self, station: str) -> List[str]:
+        """Route codes that run through station without calling, in route order."""
+        return self._route_names(self.passing_mask(station))
+
+    def routes_stopping(self, station: str) -> List[str]:
+        """Route codes that call at station, in route order."""
+        return self._route_names(self.stopping_mask(station))
+
+    def state(self, station: str, route_code: str) -> Optional[str]:
+        """
+        Return STOP, PASS or None (not on the route's corridor).
+        """
+        s = self.station_ids.get(station)
+        r = self.route_ids.get(route_code)
+        if s is None or r is None:
+            return None
+        if self.stopping[s] >> r & 1:
+            return STOP
+        if self.passing[s] >> r & 1:
+            return PASS
+        return None
+
+    def skip_pattern(self, route_code: str) -> Optional[Tuple[Tuple[str, str], ...]]:
+        """
+        Return the route's corridor as ((station, STOP or PASS), ...) in travel order.
+
+        Returns:
+            The stored pattern, or None if the route is not indexed
+        """
+        return self.patterns.get(route_code)
+
+    def to_numpy(self):
+        """
+        Return the states as a stations x routes int8 matrix (requires numpy).
+
+        0 is not on the corridor, 1 a stop and 2 a pass; rows follow
+        self.stations and columns self.routes.
+        """
+        import numpy as np
+        from rail_helpers import _bits
+
+        matrix = np.zeros((len(self.stations), len(self.routes)), dtype=np.int8)
+        for s in range(len(self.stations)):
+            matrix[s, _bits(self.stopping[s])] = 1
+            matrix[s, _bits(self.passing[s])] = 2
+        return matrix
+
+
+OVERLAP_METRICS = ('shared_stops', 'shared_skipped', 'shared_segments')
+
+
+class ServiceOverlap:
+    """
+    All-versus-all corridor overlap between services.
+
+    For every route pair holds the number of shared stops, shared skipped
+    (passed) stations and shared corridor segments. A segment is a pair of
+    consecutive corridor stations in either direction, so services running
+    opposite ways over the same track share it. Each count is one AND plus a
+    popcount of the routes' bitmasks; the diagonal holds each route's own
+    totals. Matrices are lists of array('i') rows indexed like self.routes.
+    """
+
+    def __init__(self, routes: List[str], segments: List[Tuple[str, str]]):
+        self.routes = routes
+        self.route_ids = {code: i for i, code in enumerate(routes)}
+        self.segments = segments
+        n = len(routes)
+        self.shared_stops = [array('i', [0]) * n for _ in range(n)]
+        self.shared_skipped = [array('i', [0]) * n for _ in range(n)]
+        self.shared_segments = [array('i', [0]) * n for _ in range(n)]
+
+    @classmethod
+    def from_skip_index(cls, skips: SkipIndex) -> "ServiceOverlap":
+        """
+        Compute every pair's overlap from a SkipIndex in one pass.
+
+        Args:
+            skips: SkipIndex (its route masks and corridor patterns are reused)
+
+        Returns:
+            ServiceOverlap over skips.routes
+        """
+        segment_ids: Dict[Tuple[str, str], int] = {}
+        segment_masks = []
+        for code in skips.routes:
+            corridor = [station for station, _ in skips.patterns[code]]
+            mask = 0
+            for a, b in zip(corridor, corridor[1:]):
+                key = (a, b) if a <= b else (b, a)
+                mask |= 1 << segment_ids.setdefault(key, len(segment_ids))
+            segment_masks.append(mask)
+
+        overlap = cls(list(skips.routes), list(segment_ids))
+        stops, passes = skips.route_stops, skips.route_passes
+        for i in range(len(overlap.routes)):
+            stops_i, passes_i, segments_i = stops[i], passes[i], segment_masks[i]
+            row_stops = overlap.shared_stops[i]
+            row_skipped = overlap.shared_skipped[i]
+            row_segments = overlap.shared_segments[i]
+            for j in range(i, len(overlap.routes)):
+                row_stops[j] = overlap.shared_stops[j][i] = (stops_i & stops[j]).bit_count()
+                row_skipped[j] = overlap.shared_skipped[j][i] = (passes_i & passes[j]).bit_count()
+                row_segments[j] = overlap.shared_segments[j][i] = (segments_i & segment_masks[j]).bit_count()
+        return overlap
+
+    def pair(self, route_code1: str, route_code2: str) -> Optional[Dict[str, int]]:
+        """Return {metric: count} for two routes, or None if either is not indexed."""
+        i = self.route_ids.get(route_code1)
+        j = self.route_ids.get(route_code2)
+        if i is None or j is None:
+            return None
+        return {metric: getattr(self, metric)[i][j] for metric in OVERLAP_METRICS}
+
+    def top_pairs(self, metric: str = 'shared_segments', n: int = 10) -> List[Tuple[str, str, int]]:
+        """
+        Return the n distinct route pairs with the largest overlap on metric.
+
+        Returns:
+            List of (route_code1, route_code2, count), largest first
+        """
+        import heapq
+
+        matrix = getattr(self, metric)
+        candidates = ((matrix[i][j], i, j) for i in range(len(self.routes))
+                      for j in range(i + 1, len(self.routes)) if matrix[i][j])
+        return [(self.routes[i], self.routes[j], count)
+                for count, i, j in heapq.nlargest(n, candidates, key=lambda c: c[0])]
+
+    def write_matrix_csv(self, path: str, metric: str = 'shared_segments') -> None:
+        """Write one metric as a square CSV matrix with route codes as row and column headers."""
+        import csv
+
+        matrix = getattr(self, metric)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow([metric] + self.routes)
+            for code, row in zip(self.routes, matrix):
+                writer.writerow([code] + list(row))
+
+    def format_report(self, n: int = 10) -> str:
+        """Format the most overlapping route pairs for each metric."""
+        lines = [f"Service overlap: {len(self.routes)} routes, {len(self.segments)} corridor segments"]
+        for metric in OVERLAP_METRICS:
+            lines.append(f"\nTop {n} pairs by {metric.replace('_', ' ')}:")
+            for code1, code2, count in self.top_pairs(metric, n):
+                lines.append(f"  {code1} / {code2}: {count}")
+        return '\n'.join(lines)
+
+
+def corridor_artifact_path(routes_file: str, cache_dir: Optional[str], source_hash: str) -> str:
+    """Return the on-disk location of the corridor artifact for a JSON file with the given hash."""
+    if cache_dir is None:
+        from rail_helpers import CACHE_DIR_NAME
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(routes_file)), CACHE_DIR_NAME)
+    return os.path.join(cache_dir, f"corridors_{source_hash[:16]}.pkl")
+
+
+def load_corridor_artifact(routes_file: str = ROUTES_FILE,
+                           cache_dir: Optional[str] = None) -> Optional[Dict[str, Dict]]:
+    """
+    Load the precomputed corridors for routes_file, if a current artifact exists.
+
+    Args:
+        routes_file: Path to the routes knowledge base JSON
+        cache_dir: Where the artifact lives (default: .rail_cache next to the JSON)
+
+    Returns:
+        Dict mapping route code -> calculate_route_corridor() result, or None
+        when there is no artifact, it is unreadable (e.g. a partial write), or
+        it was built from a different JSON file or artifact version
+    """
+    from rail_helpers import file_hash, read_cache_file
 
-                stations = route_data.get('stations', [])
-                if len(stations) < 2:
-                    continue
+    source_hash = file_hash(routes_file)
+    data = read_cache_file(corridor_artifact_path(routes_file, cache_dir, source_hash),
+                           CORRIDOR_ARTIFACT_VERSION, source_hash)
+    return None if data is None else data["corridors"]
 
-                # Add edges between consecutive stations
-                for i in range(len(stations) - 1):
-                    station_a = stations[i]
-                    station_b = stations[i + 1]
 
-                    # Bidirectional
-                    graph[station_a].add(station_b)
-                    graph[station_b].add(station_a)
+_WORKER_CALCULATOR = None
 
-        return graph
+
+def _init_corridor_worker(routes_file: str) -> None:
+    global _WORKER_CALCULATOR
+    _WORKER_CALCULATOR = RouteCorridorCalculator(routes_file)
+
+
+def _corridor_worker(route_codes: List[str]) -> List[Tuple[str, Dict]]:
+    return [(code, _WORKER_CALCULATOR.calculate_route_corridor(code)) for code in route_codes]
+
+
+def build_corridor_artifact(routes_file: str = ROUTES_FILE, cache_dir: Optional[str] = None,
+                            jobs: Optional[int] = None) -> Tuple[Dict[str, Dict], str]:
+    """
+    Compute calculate_route_corridor() for every route and save the results.
+
+    Routes are spread across a process pool, each worker building its own
+    calculator once. The artifact (stops, corridor, skipped and segment
+    details per route) is written to ``<cache_dir>/corridors_<JSON hash>.pkl``,
+    so an edited knowledge base gets a new artifact instead of stale corridors.
+
+    Args:
+        routes_file: Path to the routes knowledge base JSON
+        cache_dir: Where to write the artifact (default: .rail_cache next to the JSON)
+        jobs: Worker processes (default: CPU count; 1 builds in this process)
+
+    Returns:
+        (corridors, artifact_path) - corridors maps route code -> corridor dict
+    """
+    from rail_helpers import file_hash, write_cache_file
+
+    source_hash = file_hash(routes_file)
+    calculator = RouteCorridorCalculator(routes_file)
+    route_codes = list(calculator.routes)
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1 or len(route_codes) < 2 * jobs:
+        results = {code: calculator.calculate_route_corridor(code) for code in route_codes}
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Interleave routes so each chunk mixes long and short services
+        chunks = [route_codes[i::jobs * 4] for i in range(jobs * 4)]
+        results = {}
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_corridor_worker,
+                                 initargs=(routes_file,)) as pool:
+            for chunk in pool.map(_corridor_worker, chunks):
+                results.update(chunk)
+    corridors = {code: results[code] for code in route_codes}
+
+    artifact_path = corridor_artifact_path(routes_file, cache_dir, source_hash)
+    write_cache_file(artifact_path, {"version": CORRIDOR_ARTIFACT_VERSION, "source_hash": source_hash,
+                                     "corridors": corridors})
+    return corridors, artifact_path
+
+
+class RouteCorridorCalculator:
+    """
+    Calculate route corridors and identify skipped stations.
+
+    This works like a real public transport routing engine:
+    - Network graph defines physical station connections
+    - Service data defines which stations are actually served
+    - Pathfinding calculates the corridor between consecutive stops
+    """
+
+    def __init__(self, routes_file=ROUTES_FILE, model=None, cache_dir: Optional[str] = None):
+        """
+        Load route data and build the station network graph.
+
+        Both come from the shared NetworkModel for routes_file (or from the
+        model given), so every calculator in the process reuses one parse
+        and one graph. Precomputed corridors (see build_corridor_artifact)
+        in cache_dir are picked up on the first corridor() lookup.
+        """
+        if model is None:
+            from network_model import get_network_model
+            model = get_network_model(knowledge_base=routes_file)
+        self.routes_file = model.knowledge_base_path
+        self.cache_dir = cache_dir
+        self._corridors: Optional[Dict[str, Dict]] = None
+        self._hop_matrix: Optional[HopMatrix] = None
+        self._skip_index: Optional[SkipIndex] = None
+        self._service_overlap: Optional[ServiceOverlap] = None
+        self.data = model.knowledge_base
+
+        self.routes = self.data.get('routes', {})
+        self.stations_list = self.data.get('stations', [])
+
+        # Build the physical station network graph
+        self.network_graph = model.physical_graph
+
+        # Station -> [(route code, position)] over the non-removed routes
+        self.station_routes = model.station_routes
+
+    def _build_station_network(self) -> Dict[str, Set[str]]:
+        """Build the station network graph (see build_station_network)."""
+        return build_station_network(self.data)
 
     def shortest_station_path(self, start: str, end: str) -> Optional[List[str]]:
         """
         Find the shortest path between two stations in the network graph.
 
         Uses BFS since all track segments have equal weight for pathfinding.
-        This finds the physical route a train would take.
+        This finds the physical route a train would take. Once hop_matrix()
+        has been built the path is read from its next hops instead.
 
         Args:
             start: Starting station name
@@ -106,24 +538,61 @@ class RouteCorridorCalculator:
         if start not in self.network_graph or end not in self.network_graph:
             return None
 
-        # BFS to find shortest path
-        queue = deque([[start]])
-        visited = {start}
+        if self._hop_matrix is not None:
+            return self._hop_matrix.path(start, end)
 
-        while queue:
-            path = queue.popleft()
-            current = path[-1]
+        # BFS with parent pointers; the path is rebuilt once end is found
+        parent = {start: None}
+        queue = deque([start])
 
-            if current == end:
-                return path
+        while queue:
+            current = queue.popleft()
 
             for neighbor in self.network_graph[current]:
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append(path + [neighbor])
+                if neighbor not in parent:
+                    parent[neighbor] = current
+                    if neighbor == end:
+                        path = [end]
+                        while parent[path[-1]] is not None:
+                            path.append(parent[path[-1]])
+                        path.reverse()
+                        return path
+                    queue.append(neighbor)
 
         return None
 
+    def hop_matrix(self) -> HopMatrix:
+        """
+        Build (once) the all-pairs hop distance and next-hop matrix.
+
+        Worth it before many path queries (e.g. every station pair); a few
+        queries are cheaper with the BFS.
+
+        Returns:
+            HopMatrix over network_graph; shortest_station_path() uses it from now on
+        """
+        if self._hop_matrix is None:
+            self._hop_matrix = HopMatrix.from_graph(self.network_graph)
+        return self._hop_matrix
+
+    def _routes_between(self, start: str, end: str) -> List[Tuple[str, int, int]]:
+        """
+        Find the routes that call at start and later at end.
+
+        Intersects the two stations' (route, position) lists instead of
+        scanning every route's station list.
+
+        Returns:
+            List of (route_code, start_idx, end_idx), in route order
+        """
+        end_positions = dict(self.station_routes.get(end, ()))
+        found = []
+        for route_code, start_idx in self.station_routes.get(start, ()):
+            end_idx = end_positions.get(route_code)
+            if end_idx is not None and start_idx < end_idx:
+                found.append((route_code, start_idx, end_idx))
+        return found
+
     def _find_physical_path_and_corridor(self, start: str, end: str,
                                           route_stops: List[str] = None) -> Tuple[List[str], Dict, List]:
         """
@@ -152,33 +621,21 @@ class RouteCorridorCalculator:
         routes_via_station = defaultdict(list)
         all_paths = {}  # path (as tuple) -> list of route codes
 
-        for route_code, route_data in self.routes.items():
-            if 'REMOVED' in route_data.get('route_type', ''):
-                continue
+        # Routes serving both stations in order
+        for route_code, start_idx, end_idx in self._routes_between(start, end):
+            # Get all stations on this route between start and end
+            segment = self.routes[route_code]['stations'][start_idx:end_idx + 1]
+            path_tuple = tuple(segment)
 
-            stations = route_data.get('stations', [])
+            # Track this path
+            if path_tuple not in all_paths:
+                all_paths[path_tuple] = []
+            all_paths[path_tuple].append(route_code)
 
-            # Check if this route serves both stations in order
-            try:
-                start_idx = stations.index(start)
-                end_idx = stations.index(end)
-
-                if start_idx < end_idx:
-                    # Get all stations on this route between start and end
-                    segment = stations[start_idx:end_idx + 1]
-                    path_tuple = tuple(segment)
-
-                    # Track this path
-                    if path_tuple not in all_paths:
-                        all_paths[path_tuple] = []
-                    all_paths[path_tuple].append(route_code)
-
-                    # Track which routes serve each station
-                    for station in segment:
-                        if station not in [start, end]:
-                            routes_via_station[station].append(route_code)
-            except ValueError:
-                continue
+            # Track which routes serve each station
+            for station in segment:
+                if station not in [start, end]:
+                    routes_via_station[station].append(route_code)
 
         if not all_paths:
             # No routes found - fallback to direct
@@ -340,6 +797,28 @@ class RouteCorridorCalculator:
             'segment_details': segment_details
         }
 
+    def corridor(self, route_code: str) -> Optional[Dict]:
+        """
+        Return a route's corridor, from the precomputed artifact when possible.
+
+        The artifact is loaded on first use if its source hash matches the
+        knowledge base; routes it does not cover are calculated once and
+        kept. The returned dict is shared, so treat it as read-only.
+
+        Args:
+            route_code: Route identifier (e.g., "R026")
+
+        Returns:
+            Same as calculate_route_corridor()
+        """
+        if self._corridors is None:
+            self._corridors = load_corridor_artifact(self.routes_file, self.cache_dir) or {}
+        if route_code not in self._corridors:
+            if route_code not in self.routes:
+                return None
+            self._corridors[route_code] = self.calculate_route_corridor(route_code)
+        return self._corridors[route_code]
+
     def format_corridor_report(self, corridor_data: Dict, verbose: bool = False) -> str:
         """
         Format corridor data into a human-readable report.
@@ -448,11 +927,37 @@ class RouteCorridorCalculator:
         Returns:
             List of skipped station names, or None if route not found
         """
-        corridor = self.calculate_route_corridor(route_code)
+        corridor = self.corridor(route_code)
         if corridor:
             return corridor['skipped']
         return None
 
+    def skip_index(self) -> SkipIndex:
+        """
+        Build (once) the reverse skip index over every non-removed route.
+
+        Corridors come from corridor(), so a current --all artifact makes
+        this a load rather than 89 corridor calculations.
+
+        Returns:
+            SkipIndex answering routes_passing / routes_stopping / skip_pattern
+        """
+        if self._skip_index is None:
+            corridors = {code: self.corridor(code) for code in self.routes}
+            self._skip_index = SkipIndex.from_corridors(corridors, self.routes)
+        return self._skip_index
+
+    def service_overlap(self) -> ServiceOverlap:
+        """
+        Build (once) the all-versus-all overlap matrices for every non-removed route.
+
+        Returns:
+            ServiceOverlap built from skip_index()
+        """
+        if self._service_overlap is None:
+            self._service_overlap = ServiceOverlap.from_skip_index(self.skip_index())
+        return self._service_overlap
+
     def get_all_corridors_between(self, start: str, end: str) -> Optional[Dict]:
         """
         Find ALL possible corridors between two stations (generic query).
@@ -484,26 +989,14 @@ class RouteCorridorCalculator:
         # Find ALL routes between these stations
         all_paths = {}  # path (as tuple) -> list of route codes
 
-        for route_code, route_data in self.routes.items():
-            if 'REMOVED' in route_data.get('route_type', ''):
-                continue
-
-            stations = route_data.get('stations', [])
-
-            try:
-                start_idx = stations.index(start)
-                end_idx = stations.index(end)
-
-                if start_idx < end_idx:
-                    # Get segment
-                    segment = stations[start_idx:end_idx + 1]
-                    path_tuple = tuple(segment)
+        for route_code, start_idx, end_idx in self._routes_between(start, end):
+            # Get segment
+            segment = self.routes[route_code]['stations'][start_idx:end_idx + 1]
+            path_tuple = tuple(segment)
 
-                    if path_tuple not in all_paths:
-                        all_paths[path_tuple] = []
-                    all_paths[path_tuple].append(route_code)
-            except ValueError:
-                continue
+            if path_tuple not in all_paths:
+                all_paths[path_tuple] = []
+            all_paths[path_tuple].append(route_code)
 
         if not all_paths:
             return {
@@ -627,8 +1120,8 @@ class RouteCorridorCalculator:
         Returns:
             Comparison report
         """
-        c1 = self.calculate_route_corridor(route_code1)
-        c2 = self.calculate_route_corridor(route_code2)
+        c1 = self.corridor(route_code1)
+        c2 = self.corridor(route_code2)
 
         if not c1 or not c2:
             return "One or both routes not found."
@@ -662,6 +1155,23 @@ class RouteCorridorCalculator:
 if __name__ == "__main__":
     import sys
 
+    # Precompute every route's corridor (--all [--jobs N])
+    if len(sys.argv) > 1 and sys.argv[1] == '--all':
+        import time
+
+        jobs = None
+        if '--jobs' in sys.argv:
+            jobs = int(sys.argv[sys.argv.index('--jobs') + 1])
+
+        t0 = time.perf_counter()
+        corridors, artifact_path = build_corridor_artifact(jobs=jobs)
+        elapsed = time.perf_counter() - t0
+        total_skipped = sum(len(c['skipped']) for c in corridors.values())
+        print(f"Calculated {len(corridors)} corridors ({total_skipped} skipped stops) "
+              f"in {elapsed:.2f}s")
+        print(f"Wrote {artifact_path}")
+        sys.exit(0)
+
     # Create calculator
     calc = RouteCorridorCalculator()
 
@@ -669,8 +1179,34 @@ if __name__ == "__main__":
     if len(sys.argv) > 1:
         arg1 = sys.argv[1]
 
+        # Which services run through a station without calling (--passing flag)
+        if arg1 == '--passing' and len(sys.argv) >= 3:
+            station = sys.argv[2]
+            skips = calc.skip_index()
+            if station not in skips.station_ids:
+                print(f"Station '{station}' is not on any corridor.")
+            else:
+                passing = skips.routes_passing(station)
+                stopping = skips.routes_stopping(station)
+                print(f"{station}: {len(stopping)} services stop, {len(passing)} pass through")
+                for route_code in passing:
+                    route = calc.routes[route_code]
+                    print(f"  {route_code}: {route.get('operator', 'Unknown')} - "
+                          f"{route.get('route_type', 'Unknown')}")
+
+        # All-versus-all service overlap (--compare-all [DIR] writes the CSV matrices)
+        elif arg1 == '--compare-all':
+            overlap = calc.service_overlap()
+            print(overlap.format_report())
+            if len(sys.argv) > 2:
+                os.makedirs(sys.argv[2], exist_ok=True)
+                for metric in OVERLAP_METRICS:
+                    csv_path = os.path.join(sys.argv[2], f"service_overlap_{metric}.csv")
+                    overlap.write_matrix_csv(csv_path, metric)
+                    print(f"Wrote {csv_path}")
+
         # Check for generic corridor query (--between flag)
-        if arg1 == '--between' and len(sys.argv) >= 4:
+        elif arg1 == '--between' and len(sys.argv) >= 4:
             start = sys.argv[2]
             end = sys.argv[3]
 
@@ -690,7 +1226,7 @@ if __name__ == "__main__":
                 print(calc.compare_services(route_code, route_code2))
             else:
                 # Single route analysis
-                corridor = calc.calculate_route_corridor(route_code)
+                corridor = calc.corridor(route_code)
                 if corridor:
                     print(calc.format_corridor_report(corridor, verbose=verbose))
                 else:
@@ -711,6 +1247,9 @@ if __name__ == "__main__":
         print("  python3 route_corridor_calculator.py <ROUTE_CODE> --verbose")
         print("  python3 route_corridor_calculator.py <ROUTE1> <ROUTE2>  # Compare")
         print("  python3 route_corridor_calculator.py --between <START> <END>  # Generic corridor")
+        print("  python3 route_corridor_calculator.py --all [--jobs N]  # Precompute every corridor")
+        print("  python3 route_corridor_calculator.py --passing <STATION>  # Services running through")
+        print("  python3 route_corridor_calculator.py --compare-all [DIR]  # All-pairs overlap matrices")
         print("\nExamples:")
         print("  python3 route_corridor_calculator.py R026")
         print("  python3 route_corridor_calculator.py R078 --verbose")
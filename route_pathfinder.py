@@ -4,150 +4,290 @@ Stepford County Railway Pathfinder - Method 3 Implementation
 Use this to find optimal routes with transfers for your Custom GPT
 """
 
+import heapq
 import json
-from collections import defaultdict, deque
+import time
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import islice
 from typing import List, Dict, Tuple, Optional
 
+INF = float('inf')
+SLACK = 1.5            # keep routes up to 1.5x slower than one with no more transfers
+MAX_PATH_LENGTH = 15   # stations on a path before the search stops extending it
+MAX_LABELS = 200000    # find_routes() memory budget (labels)
+TIME_BUDGET = 5.0      # find_routes() time budget (seconds)
+
 def load_routes(json_file='stepford_routes_with_segment_minutes_ai_knowledge_base.json'):
     """Load route data from JSON file"""
     with open(json_file, 'r') as f:
         return json.load(f)
 
+
+def route_segment_time(route_data: Dict) -> Tuple[float, float]:
+    """
+    Estimate per-segment minutes for a route from its 'up' travel time.
+
+    Returns:
+        Tuple of (time_per_segment, total_time)
+    """
+    time_str = route_data.get('travel_time', {}).get('up', '0 minutes')
+    try:
+        total_time = float(time_str.split()[0])
+    except:
+        total_time = 0
+
+    segments = len(route_data.get('stations', [])) - 1
+    time_per_segment = total_time / segments if segments > 0 else 0
+    return time_per_segment, total_time
+
+
+def build_route_graph(routes: Dict) -> Dict:
+    """
+    Build the graph of station connections used by RoutePathfinder.
+
+    Args:
+        routes: Route code -> route data (the knowledge base 'routes' mapping)
+
+    Returns:
+        Dict mapping station -> list of edge dicts, both directions
+    """
+    graph = defaultdict(list)
+
+    for route_code, route_data in routes.items():
+        # Skip removed routes
+        if 'REMOVED' in route_data.get('route_type', ''):
+            continue
+
+        stations = route_data.get('stations', [])
+        if len(stations) < 2:
+            continue
+
+        # Estimate time per segment from the route's total travel time
+        time_per_segment, total_time = route_segment_time(route_data)
+
+        # Add BIDIRECTIONAL edges for consecutive stations
+        # Trains can run in both directions!
+        for i in range(len(stations) - 1):
+            from_station = stations[i]
+            to_station = stations[i + 1]
+
+            # Forward direction (A → B)
+            graph[from_station].append({
+                'to': to_station,
+                'time': time_per_segment,
+                'route': route_code,
+                'operator': route_data['operator'],
+                'type': route_data['route_type'],
+                'price': route_data['price'],
+                'total_route_time': total_time
+            })
+
+            # Reverse direction (B → A)
+            graph[to_station].append({
+                'to': from_station,
+                'time': time_per_segment,
+                'route': route_code,
+                'operator': route_data['operator'],
+                'type': route_data['route_type'],
+                'price': route_data['price'],
+                'total_route_time': total_time
+            })
+
+    return graph
+
+
 class RoutePathfinder:
-    def __init__(self, routes_data):
+    def __init__(self, routes_data=None, graph: Optional[Dict] = None):
+        """
+        Args:
+            routes_data: Knowledge base dict with a 'routes' mapping; defaults to
+                the shared NetworkModel's, reusing its already built graph
+            graph: Prebuilt build_route_graph() result for routes_data
+        """
+        if routes_data is None:
+            from network_model import get_network_model
+            model = get_network_model()
+            routes_data = model.knowledge_base
+            graph = model.route_graph
         self.routes = routes_data['routes']
-        self.graph = self._build_graph()
+        self.graph = graph if graph is not None else self._build_graph()
 
     def _build_graph(self):
         """Build graph of station connections"""
-        graph = defaultdict(list)
+        return build_route_graph(self.routes)
 
-        for route_code, route_data in self.routes.items():
-            # Skip removed routes
-            if 'REMOVED' in route_data.get('route_type', ''):
-                continue
-
-            stations = route_data.get('stations', [])
-            if len(stations) < 2:
-                continue
+    def find_routes(self, start: str, end: str, max_transfers: int = 2,
+                    max_labels: int = MAX_LABELS, time_budget: float = TIME_BUDGET):
+        """
+        Find routes from start to end with up to max_transfers
+        Returns sorted list of routes (best first)
 
-            # Parse travel time
-            time_str = route_data.get('travel_time', {}).get('up', '0 minutes')
-            try:
-                total_time = float(time_str.split()[0])
-            except:
-                total_time = 0
-
-            # Estimate time per segment
-            segments = len(stations) - 1
-            time_per_segment = total_time / segments if segments > 0 else 0
-
-            # Add BIDIRECTIONAL edges for consecutive stations
-            # Trains can run in both directions!
-            for i in range(len(stations) - 1):
-                from_station = stations[i]
-                to_station = stations[i + 1]
-
-                # Forward direction (A → B)
-                graph[from_station].append({
-                    'to': to_station,
-                    'time': time_per_segment,
-                    'route': route_code,
-                    'operator': route_data['operator'],
-                    'type': route_data['route_type'],
-                    'price': route_data['price'],
-                    'total_route_time': total_time
-                })
+        Collects the first 100 routes from iter_routes(); see there for how
+        the search works and what the budgets do.
 
-                # Reverse direction (B → A)
-                graph[to_station].append({
-                    'to': from_station,
-                    'time': time_per_segment,
-                    'route': route_code,
-                    'operator': route_data['operator'],
-                    'type': route_data['route_type'],
-                    'price': route_data['price'],
-                    'total_route_time': total_time
-                })
+        Args:
+            start: Starting station name
+            end: Destination station name
+            max_transfers: Maximum number of changes of train
+            max_labels: Hard cap on labels kept in memory
+            time_budget: Hard cap on search time in seconds
 
-        return graph
+        Returns:
+            Up to 100 route dicts ({'time', 'transfers', 'path', 'routes'}),
+            fewer transfers first, then by time
+        """
+        return list(islice(self.iter_routes(start, end, max_transfers, max_labels, time_budget), 100))
 
-    def find_routes(self, start: str, end: str, max_transfers: int = 2):
+    def iter_routes(self, start: str, end: str, max_transfers: int = 2,
+                    max_labels: int = MAX_LABELS, time_budget: float = TIME_BUDGET):
         """
-        Find all routes from start to end with up to max_transfers
-        Returns sorted list of routes (best first)
+        Yield routes from start to end one at a time, fewest transfers first, then fastest.
+
+        Label-setting search over (station, route, transfers) states, popped
+        from a heap in (transfers, time) order, so each route reaching end is
+        final when it pops and is yielded straight away; stop iterating once
+        you have enough. A label is dropped when an earlier one at the same
+        station on the same route has no more transfers and no more time, or
+        when it is over SLACK times slower than a route already yielded with
+        no more transfers. Paths carry parent pointers instead of copies and
+        never revisit a station.
+
+        The search stops once max_labels labels have been created or
+        time_budget seconds have passed. self.last_search holds the label
+        count, elapsed time and whether a budget cut the search short, and
+        is kept current while iterating.
+
+        Args:
+            start: Starting station name
+            end: Destination station name
+            max_transfers: Maximum number of changes of train
+            max_labels: Hard cap on labels kept in memory
+            time_budget: Hard cap on search time in seconds
+
+        Yields:
+            Route dicts ({'time', 'transfers', 'path', 'routes'})
         """
-        # BFS to find all paths with optimizations
-        queue = deque([(start, [start], [], None, 0, 0.0)])  # (station, path, routes_used, current_route, transfers, time)
-        all_paths = []
-        visited_states = set()
-        best_time_by_transfers = {}  # Track best time for each transfer count
-
-        while queue:
-            current, path, routes_used, current_route, transfers, current_time = queue.popleft()
-
-            # Early stopping: only prune if there's a route with SAME OR FEWER transfers that's faster
-            should_prune = False
-            for t in range(transfers + 1):  # Check all transfer counts <= current
-                if t in best_time_by_transfers and current_time > best_time_by_transfers[t] * 1.5:
-                    should_prune = True
-                    break
-            if should_prune:
+        started = time.perf_counter()
+        stats = self.last_search = {'labels': 0, 'seconds': 0.0, 'truncated': False}
+        if start not in self.graph or end not in self.graph:
+            return
+        if start == end:
+            yield {'time': 0.0, 'transfers': 0, 'path': [start], 'routes': []}
+            return
+
+        # Labels live in parallel lists; a label's path is rebuilt from parents
+        label_station = [start]
+        label_edge = [None]
+        label_parent = [-1]
+        label_depth = [1]
+
+        best = {}                 # (station, route) -> best time per transfer count
+        best_at_end = [INF] * (max_transfers + 1)  # fastest arrival with <= t transfers
+        heap = [(0, 0.0, 0)]      # (transfers, time, label)
+        pops = 0
+
+        def on_path(label, station):
+            while label >= 0:
+                if label_station[label] == station:
+                    return True
+                label = label_parent[label]
+            return False
+
+        while heap:
+            transfers, current_time, label = heapq.heappop(heap)
+
+            # Only prune if there's a route with SAME OR FEWER transfers that's much faster
+            if current_time > best_at_end[transfers] * SLACK:
                 continue
+            edge = label_edge[label]
+            current = label_station[label]
+            if edge is not None and min(best[(current, edge['route'])][:transfers + 1]) < current_time:
+                continue  # A faster label reached this state after this one was queued
 
-            # Create state signature to avoid revisiting same situation
-            state = (current, tuple(r['route'] for r in routes_used), transfers)
-            if state in visited_states:
-                continue
-            visited_states.add(state)
-
-            # Found destination
+            # Found destination: nothing left in the heap can beat it
             if current == end:
-                total_time = sum(r['time'] for r in routes_used)
-                all_paths.append({
-                    'time': total_time,
-                    'transfers': transfers,
-                    'path': path,
-                    'routes': routes_used
-                })
-                # Update best time for this transfer count
-                if transfers not in best_time_by_transfers or total_time < best_time_by_transfers[transfers]:
-                    best_time_by_transfers[transfers] = total_time
+                for t in range(transfers, max_transfers + 1):
+                    if current_time < best_at_end[t]:
+                        best_at_end[t] = current_time
+                stats['labels'] = len(label_station)
+                stats['seconds'] = time.perf_counter() - started
+                yield self._route_from_label(label, current_time, transfers,
+                                             label_station, label_edge, label_parent)
                 continue
 
-            # Stop if too many transfers or path too long or visited same station twice
-            if transfers > max_transfers or len(path) > 15:
+            # Stop if the path is too long
+            if label_depth[label] > MAX_PATH_LENGTH:
                 continue
 
-            # Avoid revisiting same station (prevents loops)
-            visited_in_path = set(path)
-
-            # Explore neighbors
-            for edge in self.graph.get(current, []):
-                next_station = edge['to']
+            pops += 1
+            if pops % 256 == 0 and time.perf_counter() - started > time_budget:
+                stats['truncated'] = True
+                break
 
-                # Skip if already visited in this path
-                if next_station in visited_in_path:
-                    continue
+            current_route = edge['route'] if edge is not None else None
+            for next_edge in self.graph[current]:
+                next_station = next_edge['to']
+                route = next_edge['route']
 
                 # Check if route changed (transfer)
                 new_transfers = transfers
-                if current_route is not None and edge['route'] != current_route:
+                if current_route is not None and route != current_route:
                     new_transfers += 1
+                    if new_transfers > max_transfers:
+                        continue
+
+                new_time = current_time + next_edge['time']
+                if new_time > best_at_end[new_transfers] * SLACK:
+                    continue
+
+                # Dominated by a label on the same route with no more transfers?
+                times = best.get((next_station, route))
+                if times is None:
+                    times = best[(next_station, route)] = [INF] * (max_transfers + 1)
+                elif min(times[:new_transfers + 1]) <= new_time:
+                    continue
 
-                if new_transfers <= max_transfers:
-                    new_path = path + [next_station]
-                    new_routes = routes_used + [edge]
-                    new_time = current_time + edge['time']
-                    queue.append((next_station, new_path, new_routes, edge['route'], new_transfers, new_time))
+                # Avoid revisiting a station (prevents loops)
+                if on_path(label, next_station):
+                    continue
 
-            # Limit results to prevent memory explosion
-            if len(all_paths) > 1000:
+                if len(label_station) >= max_labels:
+                    stats['truncated'] = True
+                    break
+                times[new_transfers] = new_time
+                label_station.append(next_station)
+                label_edge.append(next_edge)
+                label_parent.append(label)
+                label_depth.append(label_depth[label] + 1)
+                heapq.heappush(heap, (new_transfers, new_time, len(label_station) - 1))
+            if stats['truncated']:
                 break
 
-        # Sort: fewer transfers first, then by time
-        all_paths.sort(key=lambda x: (x['transfers'], x['time']))
-        return all_paths[:100]  # Return top 100 routes max
+        stats['labels'] = len(label_station)
+        stats['seconds'] = time.perf_counter() - started
+
+    @staticmethod
+    def _route_from_label(label: int, total_time: float, transfers: int,
+                          label_station: List[str], label_edge: List[Optional[Dict]],
+                          label_parent: List[int]) -> Dict:
+        """Walk parent pointers back from label and build a route dict."""
+        path = []
+        edges = []
+        while label >= 0:
+            path.append(label_station[label])
+            if label_edge[label] is not None:
+                edges.append(label_edge[label])
+            label = label_parent[label]
+        path.reverse()
+        edges.reverse()
+        return {
+            'time': total_time,
+            'transfers': transfers,
+            'path': path,
+            'routes': edges
+        }
 
     def format_route(self, route_info: Dict, verbose: bool = False) -> str:
         """Format a route for display"""
@@ -199,27 +339,229 @@ class RoutePathfinder:
         return '\n'.join(output)
 
     def get_best_routes(self, start: str, end: str, top_n: int = 5, max_transfers: int = 2) -> str:
-        """Get formatted string of best routes"""
-        routes = self.find_routes(start, end, max_transfers)
+        """Get formatted string of the top_n best routes"""
+        # Only the top_n routes are searched for
+        routes = list(islice(self.iter_routes(start, end, max_transfers), top_n))
 
         if not routes:
             return f"❌ No routes found from {start} to {end}"
 
         output = [f"🚄 Routes from {start} to {end}:\n"]
-        output.append(f"Found {len(routes)} possible routes. Showing top {min(top_n, len(routes))}:\n")
+        output.append(f"Showing the best {len(routes)}:\n")
 
         for i, route in enumerate(routes[:top_n], 1):
             output.append(f"{i}. {self.format_route(route, verbose=True)}\n")
 
         return '\n'.join(output)
 
+    def find_pareto_routes(self, start: str, end: str, max_transfers: int = 2) -> List[Dict]:
+        """
+        Find the Pareto-optimal routes over (time, transfers) with RAPTOR.
+
+        Unlike find_routes() this is exact and bounded: at most one route per
+        transfer count, each strictly faster than every route with fewer
+        transfers. Results use the same format as find_routes().
+        """
+        if not hasattr(self, '_raptor'):
+            self._raptor = RaptorRouter({'routes': self.routes})
+        return self._raptor.query(start, end, max_transfers)
+
+
+class RaptorRouter:
+    """
+    RAPTOR (Round-bAsed Public Transit Optimized Router) over route stop sequences.
+
+    Each non-removed route contributes two patterns (its station list and the
+    reverse, since trains run both ways). Patterns, stops and cumulative
+    minutes live in flat arrays:
+    - pattern_stops[pattern_offsets[p]:pattern_offsets[p + 1]] are pattern p's stop IDs
+    - pattern_times holds cumulative minutes at the same positions
+    - stop_patterns/stop_positions[stop_offsets[s]:stop_offsets[s + 1]] list
+      every (pattern, absolute position) serving stop s
+
+    Round k scans only the patterns serving stops improved in round k - 1,
+    so one query costs O(max_transfers x total pattern length) and returns
+    the full (time, transfers) Pareto set in a single pass. Segment times use
+    the same per-segment estimate as RoutePathfinder.
+    """
+
+    def __init__(self, routes_data: Dict, transfer_minutes: float = 0.0):
+        """
+        Args:
+            routes_data: Knowledge base dict with a 'routes' mapping
+            transfer_minutes: Extra minutes charged for each change of train
+        """
+        self.transfer_minutes = transfer_minutes
+        self.routes = routes_data['routes']
+
+        self.stops: List[str] = []
+        self.stop_ids: Dict[str, int] = {}
+        self.pattern_routes: List[str] = []
+        self.pattern_offsets = array('i', [0])
+        self.pattern_stops = array('i')
+        self.pattern_times = array('d')
+
+        for route_code, route_data in self.routes.items():
+            # Skip removed routes
+            if 'REMOVED' in route_data.get('route_type', ''):
+                continue
+
+            stations = route_data.get('stations', [])
+            if len(stations) < 2:
+                continue
+
+            time_per_segment, _ = route_segment_time(route_data)
+            for sequence in (stations, stations[::-1]):
+                for i, station in enumerate(sequence):
+                    if station not in self.stop_ids:
+                        self.stop_ids[station] = len(self.stops)
+                        self.stops.append(station)
+                    self.pattern_stops.append(self.stop_ids[station])
+                    self.pattern_times.append(i * time_per_segment)
+                self.pattern_routes.append(route_code)
+                self.pattern_offsets.append(len(self.pattern_stops))
+
+        # Invert to stop -> (pattern, position) lists, CSR-style
+        by_stop = [[] for _ in self.stops]
+        for p in range(len(self.pattern_routes)):
+            for pos in range(self.pattern_offsets[p], self.pattern_offsets[p + 1]):
+                by_stop[self.pattern_stops[pos]].append((p, pos))
+
+        self.stop_offsets = array('i', [0])
+        self.stop_patterns = array('i')
+        self.stop_positions = array('i')
+        for entries in by_stop:
+            for p, pos in entries:
+                self.stop_patterns.append(p)
+                self.stop_positions.append(pos)
+            self.stop_offsets.append(len(self.stop_patterns))
+
+    def query(self, start: str, end: str, max_transfers: int = 2) -> List[Dict]:
+        """
+        Return the Pareto-optimal routes from start to end.
+
+        Args:
+            start: Starting station name
+            end: Destination station name
+            max_transfers: Maximum number of changes of train
+
+        Returns:
+            List of route dicts in find_routes() format, fewest transfers first
+        """
+        source = self.stop_ids.get(start)
+        target = self.stop_ids.get(end)
+        if source is None or target is None:
+            return []
+        if source == target:
+            return [{'time': 0, 'transfers': 0, 'path': [start], 'routes': []}]
+
+        INF = float('inf')
+        pattern_offsets = self.pattern_offsets
+        pattern_stops = self.pattern_stops
+        pattern_times = self.pattern_times
+        stop_offsets = self.stop_offsets
+        stop_patterns = self.stop_patterns
+        stop_positions = self.stop_positions
+        transfer = self.transfer_minutes
+
+        best = [INF] * len(self.stops)  # best arrival over all rounds so far
+        best[source] = 0.0
+        prev_arrival = {source: 0.0}    # arrivals improved in the previous round
+        parents = []                    # per round: stop -> (board_pos, alight_pos)
+        marked = [source]
+        results = []
+
+        for k in range(max_transfers + 1):
+            # Earliest position at which each pattern is reached by a marked stop
+            queue = {}
+            for stop in marked:
+                for idx in range(stop_offsets[stop], stop_offsets[stop + 1]):
+                    p = stop_patterns[idx]
+                    pos = stop_positions[idx]
+                    if pos < queue.get(p, pattern_offsets[p + 1]):
+                        queue[p] = pos
+
+            arrivals = {}
+            round_parents = {}
+            for p, first_pos in queue.items():
+                board_pos = -1
+                board_time = INF
+                for pos in range(first_pos, pattern_offsets[p + 1]):
+                    stop = pattern_stops[pos]
+                    if board_pos >= 0:
+                        arrival = board_time + pattern_times[pos] - pattern_times[board_pos]
+                        # Local and target pruning; the tolerance stops float noise
+                        # in cumulative times posing as a faster extra-transfer route
+                        if arrival < best[stop] - 1e-9 and arrival < best[target] - 1e-9:
+                            best[stop] = arrival
+                            arrivals[stop] = arrival
+                            round_parents[stop] = (board_pos, pos)
+
+                    # Can we catch this pattern here earlier than the current trip?
+                    ready = prev_arrival.get(stop)
+                    if ready is not None:
+                        if k > 0:
+                            ready += transfer
+                        if board_pos < 0 or ready < board_time + pattern_times[pos] - pattern_times[board_pos]:
+                            board_pos = pos
+                            board_time = ready
+
+            parents.append(round_parents)
+            if target in round_parents:
+                results.append(self._reconstruct(parents, target))
+            if not arrivals:
+                break
+            marked = list(arrivals)
+            prev_arrival = arrivals
+
+        return results
+
+    def _reconstruct(self, parents: List[Dict], target: int) -> Dict:
+        """Walk round parents back from target and build a find_routes()-style dict."""
+        # Boarding in round k always uses an arrival improved in round k - 1,
+        # so each earlier round holds exactly the previous leg
+        segments = []
+        stop = target
+        for round_parents in reversed(parents):
+            board_pos, alight_pos = round_parents[stop]
+            segments.append((board_pos, alight_pos))
+            stop = self.pattern_stops[board_pos]
+
+        segments.reverse()
+        path = [self.stops[self.pattern_stops[segments[0][0]]]]
+        edges = []
+        total_time = 0.0
+        for board_pos, alight_pos in segments:
+            route_code = self.pattern_routes[bisect_right(self.pattern_offsets, board_pos) - 1]
+            route_data = self.routes[route_code]
+            time_per_segment, route_time = route_segment_time(route_data)
+            for pos in range(board_pos + 1, alight_pos + 1):
+                path.append(self.stops[self.pattern_stops[pos]])
+                edges.append({
+                    'to': path[-1],
+                    'time': time_per_segment,
+                    'route': route_code,
+                    'operator': route_data['operator'],
+                    'type': route_data['route_type'],
+                    'price': route_data['price'],
+                    'total_route_time': route_time
+                })
+            total_time += self.pattern_times[alight_pos] - self.pattern_times[board_pos]
+
+        transfers = len(segments) - 1
+        return {
+            'time': total_time + transfers * self.transfer_minutes,
+            'transfers': transfers,
+            'path': path,
+            'routes': edges
+        }
+
 # CLI Interface
 if __name__ == "__main__":
     import sys
 
-    # Load data
-    data = load_routes()
-    pathfinder = RoutePathfinder(data)
+    # Load data (shared NetworkModel)
+    pathfinder = RoutePathfinder()
 
     # Check command line arguments
     if len(sys.argv) >= 3:
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Synthetic Network Generator for Stepford County Railway tooling
+===============================================================
+Generates large, SCR-shaped test networks so the routing helpers can be
+benchmarked far beyond the 71 real stations.
+
+Stations sit on a square grid (so station_coords-style x/y are available) and
+each line is a random walk across neighbouring grid cells. Every line starts at
+a station some earlier line already serves, so the network is connected.
+
+Usage:
+    python3 synthetic_network.py 20000 synthetic_20k.csv
+"""
+
+import csv
+import math
+import random
+from typing import Dict, List, Tuple
+
+OPERATORS = ["Stepford Connect", "Metro", "Waterline", "AirLink", "Stepford Express"]
+SERVICE_TYPES = ["Stopping", "Semi-Fast", "Express", "Regional", "Speed Link"]
+
+CSV_FIELDS = ["operator", "line", "from_station", "to_station", "travel_time_min",
+              "service_type", "route_origin", "route_destination"]
+
+
+def station_name(i: int) -> str:
+    """Return the synthetic name for station number i."""
+    return f"Station {i:06d}"
+
+
+def _pick_start(rng: random.Random, served: List[int], served_set: set,
+                frontier: List[int], neighbours) -> int:
+    """Pick a served station to start a new line, favouring the edge of coverage."""
+    while frontier:
+        k = frontier.pop(rng.randrange(len(frontier))) if rng.random() < 0.5 else frontier.pop()
+        if k in served_set:
+            continue
+        return rng.choice([j for j in neighbours(k) if j in served_set])
+    return rng.choice(served)
+
+
+def generate_network(num_stations: int, stops_per_line: int = 16,
+                     seed: int = 0) -> Tuple[List[Dict], Dict[str, Tuple[float, float]]]:
+    """
+    Generate a connected synthetic network.
+
+    Args:
+        num_stations: Number of stations to generate
+        stops_per_line: Target number of stops on each line
+        seed: Random seed (same seed -> same network)
+
+    Returns:
+        Tuple of (rows, coords) where:
+        - rows: list of rail_routes.csv row dicts (one per segment)
+        - coords: dict mapping station name -> (x, y)
+    """
+    rng = random.Random(seed)
+    side = max(1, math.ceil(math.sqrt(num_stations)))
+    coords = {station_name(i): (float(i % side), float(i // side)) for i in range(num_stations)}
+
+    def neighbours(i):
+        x, y = i % side, i // side
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < side and 0 <= ny < side:
+                j = ny * side + nx
+                if j < num_stations:
+                    yield j
+
+    rows = []
+    served = [0]
+    served_set = {0}
+    frontier = list(neighbours(0))  # unserved stations next to a served one
+    uncovered = num_stations - 1
+    line_no = 0
+
+    while uncovered > 0 or line_no == 0:
+        line_no += 1
+        line = f"S{line_no:05d}"
+        operator = rng.choice(OPERATORS)
+        service_type = rng.choice(SERVICE_TYPES)
+        minutes_per_unit = rng.uniform(1.0, 2.5)
+
+        stops = [_pick_start(rng, served, served_set, frontier, neighbours)]
+        on_line = set(stops)
+        while len(stops) < stops_per_line:
+            options = [j for j in neighbours(stops[-1]) if j not in on_line]
+            if not options:
+                break
+            # Prefer stations no line serves yet so coverage finishes quickly
+            fresh = [j for j in options if j not in served_set]
+            nxt = rng.choice(fresh) if fresh and rng.random() < 0.8 else rng.choice(options)
+            stops.append(nxt)
+            on_line.add(nxt)
+
+        if len(stops) < 2:
+            continue
+
+        origin, destination = station_name(stops[0]), station_name(stops[-1])
+        for a, b in zip(stops, stops[1:]):
+            rows.append({
+                "operator": operator,
+                "line": line,
+                "from_station": station_name(a),
+                "to_station": station_name(b),
+                "travel_time_min": round(minutes_per_unit * rng.uniform(0.8, 1.6), 1),
+                "service_type": service_type,
+                "route_origin": origin,
+                "route_destination": destination,
+            })
+
+        for j in stops:
+            if j not in served_set:
+                served_set.add(j)
+                served.append(j)
+                uncovered -= 1
+                frontier.extend(k for k in neighbours(j) if k not in served_set)
+
+    return rows, coords
+
+
+def write_network_csv(path: str, num_stations: int, stops_per_line: int = 16,
+                      seed: int = 0) -> Dict[str, Tuple[float, float]]:
+    """
+    Generate a synthetic network and write it in rail_routes.csv format.
+
+    Args:
+        path: Output CSV path
+        num_stations: Number of stations to generate
+        stops_per_line: Target number of stops on each line
+        seed: Random seed
+
+    Returns:
+        Dict mapping station name -> (x, y) coordinates
+    """
+    rows, coords = generate_network(num_stations, stops_per_line, seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return coords
+
+
+if __name__ == "__main__":
+    import sys
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    out = sys.argv[2] if len(sys.argv) > 2 else f"synthetic_{size}.csv"
+    write_network_csv(out, size)
+    print(f"✅ Wrote {size}-station synthetic network to {out}")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test that coordinate-guided A* in rail_helpers.shortest_path finds journeys
+exactly as fast as plain Dijkstra.
+"""
+
+import csv
+import os
+import random
+
+import rail_helpers
+import synthetic_network
+from test_shortest_path import _check_journey, _load_rows
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load_coords(path):
+    # Same format as plot_helpers.load_station_coords (which needs matplotlib)
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["station"]: (float(row["x"]), float(row["y"])) for row in csv.DictReader(f)}
+
+
+def _assert_same_as_dijkstra(graph, guide, pairs):
+    for a, b in pairs:
+        plain = rail_helpers.shortest_path(graph, a, b)
+        guided = rail_helpers.shortest_path(graph, a, b, guide)
+        if plain is None:
+            assert guided is None
+            continue
+        assert abs(guided["total_time"] - plain["total_time"]) < 1e-9, (a, b)
+        _check_journey(graph, guided, a, b)
+
+
+def test_real_network_matches_dijkstra():
+    """station_coords.csv guidance never changes the journey time."""
+    graph, _, _ = rail_helpers.load_rail_network(os.path.join(HERE, "rail_routes.csv"))
+    coords = _load_coords(os.path.join(HERE, "station_coords.csv"))
+    stations = list(graph)
+    pairs = [(a, b) for a in stations[::3] for b in stations[::2]]
+    _assert_same_as_dijkstra(graph, rail_helpers.CoordinateHeuristic(graph, coords), pairs)
+
+    index = rail_helpers.load_network_index(os.path.join(HERE, "rail_routes.csv"))
+    _assert_same_as_dijkstra(index, rail_helpers.CoordinateHeuristic(index, coords), pairs[::5])
+
+
+def test_missing_coordinates_stay_exact():
+    """Stations without coordinates are bridged, or fall back to Dijkstra."""
+    rows, coords = synthetic_network.generate_network(300, seed=7)
+    graph, _ = _load_rows(rows)
+    rng = random.Random(7)
+    stations = list(graph)
+    partial = {s: xy for s, xy in coords.items() if rng.random() < 0.7}
+    guide = rail_helpers.CoordinateHeuristic(graph, partial)
+    assert guide.towards(next(s for s in stations if s not in partial)) is None
+
+    pairs = [(rng.choice(stations), rng.choice(stations)) for _ in range(150)]
+    _assert_same_as_dijkstra(graph, guide, pairs)
+    _assert_same_as_dijkstra(graph, rail_helpers.CoordinateHeuristic(graph, coords), pairs)
+
+
+def test_zero_time_segment_disables_guidance():
+    """A segment with no travel time gives no usable speed bound."""
+    rows = [
+        {"operator": "Metro", "line": "L1", "from_station": "A", "to_station": "B",
+         "travel_time_min": 0.0, "service_type": "Stopping", "route_origin": "A",
+         "route_destination": "B"},
+    ]
+    graph, _ = _load_rows(rows)
+    guide = rail_helpers.CoordinateHeuristic(graph, {"A": (0, 0), "B": (3, 4)})
+    assert guide.towards("B") is None
+    assert rail_helpers.shortest_path(graph, "A", "B", guide)["total_time"] == 0.0
+
+
+if __name__ == "__main__":
+    test_real_network_matches_dijkstra()
+    test_missing_coordinates_stay_exact()
+    test_zero_time_segment_disables_guidance()
+    print("✅ A* matches Dijkstra")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test that contraction_hierarchy answers exactly like rail_helpers.shortest_path.
+"""
+
+import os
+import random
+import tempfile
+
+import contraction_hierarchy
+import rail_helpers
+import synthetic_network
+from test_shortest_path import _check_journey, _load_rows, _write_rows
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROUTES_CSV = os.path.join(HERE, "rail_routes.csv")
+
+
+def _assert_matches_shortest_path(graph, ch, pairs):
+    for a, b in pairs:
+        expected = rail_helpers.shortest_path(graph, a, b)
+        journey = ch.shortest_path(a, b)
+        if expected is None:
+            assert journey is None and ch.shortest_time(a, b) is None, (a, b)
+            continue
+        assert abs(journey["total_time"] - expected["total_time"]) < 1e-9, (a, b)
+        assert abs(ch.shortest_time(a, b) - expected["total_time"]) < 1e-9, (a, b)
+        _check_journey(graph, journey, a, b)
+
+
+def test_real_network_matches_shortest_path():
+    """Every pair of rail_routes.csv stations gets the shortest_path() time."""
+    graph, _, _ = rail_helpers.load_rail_network(ROUTES_CSV)
+    ch = contraction_hierarchy.ContractionHierarchy.from_index(
+        rail_helpers.load_network_index(ROUTES_CSV))
+    stations = list(graph)
+    _assert_matches_shortest_path(graph, ch, [(a, b) for a in stations for b in stations])
+    assert ch.shortest_path("Benton", "Nowhere") is None
+
+
+def test_synthetic_network_matches_shortest_path():
+    """Random pairs on a generated network, including unreachable ones."""
+    rows, _ = synthetic_network.generate_network(300, seed=3)
+    # A separate one-way line nothing else connects to
+    rows.append({"operator": "Metro", "line": "Island", "from_station": "Isle A",
+                 "to_station": "Isle B", "travel_time_min": 2.5, "service_type": "Stopping",
+                 "route_origin": "Isle A", "route_destination": "Isle B"})
+    graph, index = _load_rows(rows)
+    ch = contraction_hierarchy.ContractionHierarchy.from_index(index)
+    rng = random.Random(3)
+    stations = list(graph)
+    pairs = [(rng.choice(stations), rng.choice(stations)) for _ in range(400)]
+    pairs += [("Isle A", "Isle B"), ("Isle B", "Isle A"), ("Isle A", stations[0])]
+    _assert_matches_shortest_path(graph, ch, pairs)
+
+
+def test_cache_is_keyed_by_source_hash():
+    """The saved hierarchy is reused, and rebuilt once the CSV changes."""
+    rows, _ = synthetic_network.generate_network(40, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "routes.csv")
+        cache_dir = os.path.join(tmp, "cache")
+        _write_rows(csv_path, rows)
+        first = contraction_hierarchy.load_contraction_hierarchy(csv_path, cache_dir)
+        assert len(os.listdir(cache_dir)) == 1
+        again = contraction_hierarchy.load_contraction_hierarchy(csv_path, cache_dir)
+        assert again is not first and list(again.rank) == list(first.rank)
+
+        graph, _, _ = rail_helpers.load_rail_network(csv_path)
+        stations = list(graph)
+        _assert_matches_shortest_path(graph, again, [(a, b) for a in stations[:8] for b in stations])
+
+        _write_rows(csv_path, rows[:len(rows) // 2])
+        rebuilt = contraction_hierarchy.load_contraction_hierarchy(csv_path, cache_dir)
+        assert len(os.listdir(cache_dir)) == 2
+        assert len(rebuilt.index.stations) < len(first.index.stations)
+
+        # A truncated cache file is rebuilt rather than raising
+        cache_path = contraction_hierarchy.hierarchy_path(csv_path, cache_dir, rail_helpers.file_hash(csv_path))
+        with open(cache_path, "r+b") as f:
+            f.truncate(100)
+        repaired = contraction_hierarchy.load_contraction_hierarchy(csv_path, cache_dir)
+        assert list(repaired.rank) == list(rebuilt.rank)
+
+
+if __name__ == "__main__":
+    test_real_network_matches_shortest_path()
+    test_synthetic_network_matches_shortest_path()
+    test_cache_is_keyed_by_source_hash()
+    print("✅ contraction hierarchy matches shortest_path")
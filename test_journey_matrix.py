@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test rail_helpers.journey_matrix against per-pair shortest_path queries.
+"""
+
+import csv
+import os
+import tempfile
+
+import rail_helpers
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROUTES_CSV = os.path.join(HERE, "rail_routes.csv")
+
+
+def _assert_matches_shortest_path(graph, matrix):
+    for i, a in enumerate(matrix["origins"]):
+        for j, b in enumerate(matrix["destinations"]):
+            minutes = matrix["minutes"][i][j]
+            journey = rail_helpers.shortest_path(graph, a, b)
+            if journey is None:
+                assert minutes != minutes, (a, b)
+                assert (i, j) not in matrix["interchanges"]
+                continue
+            assert abs(minutes - journey["total_time"]) < 1e-9, (a, b)
+            assert matrix["interchanges"].get((i, j), 0) == journey["num_interchanges"], (a, b)
+
+
+def test_matrix_matches_shortest_path():
+    """Every cell equals shortest_path(), in-process and with a pool."""
+    graph, _, _ = rail_helpers.load_rail_network(ROUTES_CSV)
+    stations = list(graph)
+    origins = stations[::4] + ["Nowhere"]
+    destinations = stations[::-3] + ["Nowhere"]
+    for g, jobs in ((graph, 1), (rail_helpers.load_network_index(ROUTES_CSV), 2)):
+        matrix = rail_helpers.journey_matrix(g, origins, destinations, jobs=jobs,
+                                             interchanges=True)
+        assert len(matrix["minutes"]) == len(origins)
+        assert all(len(row) == len(destinations) for row in matrix["minutes"])
+        _assert_matches_shortest_path(graph, matrix)
+    assert "interchanges" not in rail_helpers.journey_matrix(graph, origins[:2], destinations, jobs=1)
+
+
+def test_csv_output():
+    """The CSV has a header of destinations, one row per origin, blanks for no route."""
+    graph, _, _ = rail_helpers.load_rail_network(ROUTES_CSV)
+    origins = ["Benton", "Nowhere"]
+    destinations = ["Llyn-by-the-Sea", "Benton", "Airport Terminal 3"]
+    matrix = rail_helpers.journey_matrix(graph, origins, destinations, jobs=1, interchanges=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        minutes_path = os.path.join(tmp, "matrix.csv")
+        changes_path = os.path.join(tmp, "matrix_interchanges.csv")
+        rail_helpers.write_journey_matrix_csv(matrix, minutes_path, changes_path)
+        with open(minutes_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        with open(changes_path, newline="", encoding="utf-8") as f:
+            changes = list(csv.DictReader(f))
+
+    assert rows[0] == ["origin"] + destinations
+    assert rows[1][:3] == ["Benton", "16.0", "0.0"]
+    assert rows[2] == ["Nowhere", "", "", ""]
+    for row in changes:
+        journey = rail_helpers.shortest_path(graph, row["origin"], row["destination"])
+        assert int(row["interchanges"]) == journey["num_interchanges"] > 0
+
+
+if __name__ == "__main__":
+    test_matrix_matches_shortest_path()
+    test_csv_output()
+    print("✅ journey_matrix matches shortest_path")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test the precomputed all-pairs JourneyTable against find_best_route.
+"""
+
+import os
+import shutil
+import tempfile
+
+import rail_helpers
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROUTES_CSV = os.path.join(HERE, "rail_routes.csv")
+
+
+def _same_journey(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    return (abs(a["total_time"] - b["total_time"]) < 1e-9
+            and a["num_interchanges"] == b["num_interchanges"]
+            and a["stations"][0] == b["stations"][0]
+            and a["stations"][-1] == b["stations"][-1]
+            and len(a["stations"]) == len(a["legs"]) + 1)
+
+
+def test_table_matches_find_best_route():
+    """Table answers match a live find_best_route() search."""
+    graph, _, _ = rail_helpers.load_rail_network(ROUTES_CSV)
+    with tempfile.TemporaryDirectory() as tmp:
+        table = rail_helpers.build_journey_table(ROUTES_CSV, cache_dir=tmp, jobs=2)
+        stations = list(graph)
+        for a in stations[::3]:
+            for b in stations:
+                assert _same_journey(table.lookup(a, b),
+                                     rail_helpers.find_best_route(graph, a, b)), (a, b)
+
+
+def test_missing_table_falls_back_to_search():
+    """Without a built table nothing is written and find_best_route() searches."""
+    graph, _, _ = rail_helpers.load_rail_network(ROUTES_CSV)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "rail_routes.csv")
+        cache_dir = os.path.join(tmp, "cache")
+        shutil.copy(ROUTES_CSV, csv_path)
+
+        table = rail_helpers.JourneyTable(csv_path, cache_dir)
+        assert not table.has_station("Benton")
+        assert table.lookup("Benton", "Llyn-by-the-Sea") is None
+        assert (rail_helpers.find_best_route(graph, "Benton", "Llyn-by-the-Sea", table=table)
+                == rail_helpers.find_best_route(graph, "Benton", "Llyn-by-the-Sea"))
+        assert not os.path.exists(cache_dir)
+
+        # Built by another caller: the same table object picks it up
+        rail_helpers.build_journey_table(csv_path, cache_dir, jobs=1)
+        assert table.has_station("Benton")
+
+
+def test_table_is_lazy_and_keyed_by_csv_hash():
+    """A changed CSV gets a new table instead of stale journeys."""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "rail_routes.csv")
+        cache_dir = os.path.join(tmp, "cache")
+        shutil.copy(ROUTES_CSV, csv_path)
+
+        table = rail_helpers.JourneyTable(csv_path, cache_dir, jobs=1, build=True)
+        assert not os.path.exists(cache_dir)  # Nothing built until first use
+        before = table.lookup("Benton", "Llyn-by-the-Sea")
+        assert len(os.listdir(cache_dir)) == 1
+
+        # Slow every segment down; the next table must see the new times
+        with open(csv_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        header, rows = lines[0], lines[1:]
+        idx = header.split(",").index("travel_time_min")
+        slowed = []
+        for row in rows:
+            cells = row.split(",")
+            cells[idx] = str(float(cells[idx]) * 2)
+            slowed.append(",".join(cells))
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("\n".join([header] + slowed) + "\n")
+
+        # The table already loaded in this process notices the edit too
+        after = table.lookup("Benton", "Llyn-by-the-Sea")
+        assert len(os.listdir(cache_dir)) == 2
+        assert abs(after["total_time"] - 2 * before["total_time"]) < 1e-9
+        assert rail_helpers.JourneyTable(csv_path, cache_dir).lookup("Benton", "Llyn-by-the-Sea") == after
+
+
+def test_corrupt_table_is_rebuilt():
+    """A truncated or garbage table file is treated as stale and rebuilt."""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "rail_routes.csv")
+        cache_dir = os.path.join(tmp, "cache")
+        shutil.copy(ROUTES_CSV, csv_path)
+        expected = rail_helpers.JourneyTable(csv_path, cache_dir, jobs=1, build=True).lookup(
+            "Benton", "Llyn-by-the-Sea")
+        table_path = rail_helpers.JourneyTable.table_path(csv_path, cache_dir, rail_helpers.file_hash(csv_path))
+
+        with open(table_path, "rb") as f:
+            full = f.read()
+        for damaged in (full[:len(full) // 2], b"", b"not a pickle"):
+            with open(table_path, "wb") as f:
+                f.write(damaged)
+            again = rail_helpers.JourneyTable(csv_path, cache_dir, jobs=1, build=True).lookup(
+                "Benton", "Llyn-by-the-Sea")
+            assert again == expected
+            with open(table_path, "rb") as f:
+                assert len(f.read()) == len(full)  # Rebuilt in place
+        assert os.listdir(cache_dir) == [os.path.basename(table_path)]  # No temp files left
+        # A path that can't be opened as a file is a miss too
+        assert rail_helpers.read_cache_file(cache_dir, rail_helpers.JOURNEY_TABLE_VERSION, "") is None
+
+
+if __name__ == "__main__":
+    test_table_matches_find_best_route()
+    test_missing_table_falls_back_to_search()
+    test_table_is_lazy_and_keyed_by_csv_hash()
+    test_corrupt_table_is_rebuilt()
+    print("✅ JourneyTable matches find_best_route")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for rail_helpers.k_best_journeys.
+
+Compares against brute-force enumeration of every simple path, grouped by
+the sequence of lines it rides, on small generated networks.
+"""
+
+import os
+
+import rail_helpers
+import synthetic_network
+from test_shortest_path import PENALTY, _check_journey, _load_rows
+
+K = 5
+
+
+def _line_sequence(journey):
+    lines = []
+    for leg in journey["legs"]:
+        if not lines or lines[-1] != leg["line"]:
+            lines.append(leg["line"])
+    return tuple(lines)
+
+
+def _brute_force(graph, start, end):
+    """Best time per line sequence over all simple paths, sorted."""
+    best = {}
+
+    def dfs(station, lines, time, visited):
+        if station == end:
+            best[lines] = min(best.get(lines, float("inf")), time)
+            return
+        for edge in graph[station]:
+            nxt = edge["to"]
+            if nxt in visited:
+                continue
+            if not lines:
+                new_lines, new_time = (edge["line"],), time + edge["time"]
+            elif edge["line"] == lines[-1]:
+                new_lines, new_time = lines, time + edge["time"]
+            else:
+                new_lines, new_time = lines + (edge["line"],), time + edge["time"] + PENALTY
+            visited.add(nxt)
+            dfs(nxt, new_lines, new_time, visited)
+            visited.remove(nxt)
+
+    dfs(start, (), 0, {start})
+    return sorted(best.values())
+
+
+def _check_alternatives(graph, journeys, start, end):
+    times = [j["total_time"] for j in journeys]
+    assert times == sorted(times)
+    sequences = [_line_sequence(j) for j in journeys]
+    assert len(set(sequences)) == len(sequences)
+    for journey in journeys:
+        _check_journey(graph, journey, start, end)
+        assert len(set(journey["stations"])) == len(journey["stations"])
+
+
+def test_against_brute_force_on_small_networks():
+    """Best answer is optimal, later ones never beat the true i-th best."""
+    for seed in range(6):
+        rows, _ = synthetic_network.generate_network(12, stops_per_line=4, seed=seed)
+        graph, index = _load_rows(rows)
+        for a in graph:
+            for b in graph:
+                if a == b:
+                    continue
+                expected = _brute_force(graph, a, b)[:K]
+                for g in (graph, index):
+                    journeys = rail_helpers.k_best_journeys(g, a, b, K)
+                    if not expected:
+                        assert journeys == []
+                        continue
+                    _check_alternatives(graph, journeys, a, b)
+                    assert abs(journeys[0]["total_time"] - expected[0]) < 1e-9, (seed, a, b)
+                    for got, best in zip(journeys, expected):
+                        assert got["total_time"] >= best - 1e-9, (seed, a, b)
+
+
+def test_real_network_alternatives():
+    """On rail_routes.csv the first answer matches shortest_path."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    graph, _, _ = rail_helpers.load_rail_network(os.path.join(here, "rail_routes.csv"))
+    stations = list(graph)
+    for a in stations[::9]:
+        for b in stations[::7]:
+            journeys = rail_helpers.k_best_journeys(graph, a, b, 10)
+            best = rail_helpers.shortest_path(graph, a, b)
+            if best is None:
+                assert journeys == []
+                continue
+            assert abs(journeys[0]["total_time"] - best["total_time"]) < 1e-9, (a, b)
+            _check_alternatives(graph, journeys, a, b)
+
+    assert len(rail_helpers.k_best_journeys(graph, "Benton", "Llyn-by-the-Sea", 5)) == 5
+    assert rail_helpers.k_best_journeys(graph, "Benton", "Nowhere", 5) == []
+
+
+if __name__ == "__main__":
+    test_against_brute_force_on_small_networks()
+    test_real_network_alternatives()
+    print("✅ k_best_journeys matches brute force")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the LineIndex in the Custom GPT upload copy of rail_helpers.
+
+services_on_same_line() is checked against the breadth-first search it
+replaced, over every station pair of the upload network and on small
+graphs with a branch and a loop (which fall back to BFS).
+"""
+
+import importlib.util
+import os
+from collections import deque
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+UPLOAD_DIR = os.path.join(HERE, "custom_gpt_upload", "UPLOAD_TO_CUSTOM_GPT")
+
+
+def load_upload_rail_helpers():
+    """Import the upload copy of rail_helpers.py without shadowing the root one."""
+    spec = importlib.util.spec_from_file_location(
+        "upload_rail_helpers", os.path.join(UPLOAD_DIR, "rail_helpers.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+upload = load_upload_rail_helpers()
+
+
+def bfs_services_on_same_line(graph, station_a, station_b):
+    """The original path-copying BFS, kept as the reference."""
+    if station_a not in graph or station_b not in graph:
+        return []
+    lines_at_a = {edge["line"]: edge for edge in graph[station_a]}
+    lines_at_b = {edge["line"]: edge for edge in graph[station_b]}
+    services = []
+    for line_id in set(lines_at_a.keys()) & set(lines_at_b.keys()):  # Same tie order as the original
+        queue = deque([(station_a, [station_a], 0, [])])
+        visited = {station_a}
+        while queue:
+            current, path, total_time, legs = queue.popleft()
+            if current == station_b:
+                edge_info = lines_at_a[line_id]
+                services.append({
+                    'line': line_id,
+                    'operator': edge_info['operator'],
+                    'service_type': edge_info['service_type'],
+                    'route_origin': edge_info.get('route_origin', ''),
+                    'route_destination': edge_info.get('route_destination', ''),
+                    'path': path,
+                    'total_time': total_time,
+                    'legs': legs
+                })
+                break
+            for edge in graph[current]:
+                if edge['line'] == line_id and edge['to'] not in visited:
+                    visited.add(edge['to'])
+                    queue.append((edge['to'], path + [edge['to']], total_time + edge['time'],
+                                  legs + [{'from': current, 'to': edge['to'],
+                                           'operator': edge['operator'], 'line': edge['line'],
+                                           'time': edge['time'],
+                                           'service_type': edge['service_type']}]))
+    return services
+
+
+def _by_line(services):
+    return sorted(services, key=lambda s: s['line'])
+
+
+def _assert_all_pairs_match(graph):
+    for a in graph:
+        for b in graph:
+            got = _by_line(upload.services_on_same_line(graph, a, b))
+            expected = _by_line(bfs_services_on_same_line(graph, a, b))
+            assert got == expected, (a, b)
+
+
+def _edge(to, line, time):
+    return {"to": to, "operator": "Metro", "line": line, "time": time,
+            "service_type": "Stopping", "route_origin": "", "route_destination": ""}
+
+
+def _graph(segments):
+    graph = {}
+    for a, b, line, there, back in segments:
+        graph.setdefault(a, []).append(_edge(b, line, there))
+        graph.setdefault(b, []).append(_edge(a, line, back))
+    return graph
+
+
+def test_upload_network_matches_bfs():
+    """Every station pair of the shipped CSV gives the BFS answer."""
+    graph, _, lines = upload.load_rail_network(os.path.join(UPLOAD_DIR, "rail_routes.csv"))
+    index = upload.line_index(graph)
+    assert len(index.stops) == len(lines)  # every real line is a simple path
+    _assert_all_pairs_match(graph)
+
+    # find_best_route picks the same (fastest, first on ties) line as with the BFS
+    stations = sorted(graph)
+    indexed = [upload.find_best_route(graph, a, b) for a in stations for b in stations]
+    original = upload.services_on_same_line
+    upload.services_on_same_line = bfs_services_on_same_line
+    try:
+        searched = [upload.find_best_route(graph, a, b) for a in stations for b in stations]
+    finally:
+        upload.services_on_same_line = original
+    assert indexed == searched
+
+
+def test_branch_and_loop_fall_back_to_bfs():
+    """Lines that aren't a single chain are left out of the index but still answered."""
+    graph = _graph([
+        ("A", "B", "L1", 2, 3), ("B", "C", "L1", 4, 4), ("C", "D", "L1", 1, 1.5),
+        ("B", "E", "L2", 2, 2), ("E", "F", "L2", 3, 3), ("E", "G", "L2", 5, 5),   # branch
+        ("C", "H", "L3", 1, 1), ("H", "I", "L3", 1, 1), ("I", "C", "L3", 1, 1),   # loop
+        ("A", "D", "L4", 6, 6), ("A", "D", "L4", 7, 7),                           # listed twice
+    ])
+    index = upload.line_index(graph)
+    assert sorted(index.stops) == ["L1", "L4"]
+    assert index.stops["L1"] == ["A", "B", "C", "D"] or index.stops["L1"] == ["D", "C", "B", "A"]
+    assert index.ride("L1", "D", "A")[1] == 8.5 and index.ride("L1", "A", "D")[1] == 7
+    assert index.ride("L2", "B", "F") is None
+    _assert_all_pairs_match(graph)
+
+    # Graphs not built by load_rail_network get their index on first use
+    fresh = dict(graph)
+    assert upload.line_index(fresh) is not index
+    assert upload.line_index(fresh) is upload.line_index(fresh)
+
+
+def test_indexes_do_not_pin_graphs():
+    """Loaded graphs keep their own index; other graphs share a bounded LRU."""
+    import gc
+    import weakref
+
+    csv_path = os.path.join(UPLOAD_DIR, "rail_routes.csv")
+    before = len(upload._LINE_INDEXES)
+    graph, _, _ = upload.load_rail_network(csv_path)
+    assert graph.same_line_index is upload.line_index(graph)
+    assert len(upload._LINE_INDEXES) == before
+    ref = weakref.ref(graph)
+    del graph
+    gc.collect()
+    assert ref() is None  # Nothing module-level keeps the graph (or its index) alive
+
+    plain = [dict(_graph([("A", "B", "L1", 1, 1)])) for _ in range(upload.LINE_INDEX_CACHE_SIZE + 3)]
+    for g in plain:
+        upload.line_index(g)
+    assert len(upload._LINE_INDEXES) == upload.LINE_INDEX_CACHE_SIZE
+    assert upload._LINE_INDEXES[id(plain[-1])][0] is plain[-1]
+    assert id(plain[0]) not in upload._LINE_INDEXES
+
+
+if __name__ == "__main__":
+    test_upload_network_matches_bfs()
+    test_branch_and_loop_fall_back_to_bfs()
+    test_indexes_do_not_pin_graphs()
+    print("✅ LineIndex matches the BFS on every station pair")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for navigation_helper: lazy loading, the position-map direct leg
+lookups, and find_routes_with_interchanges against nested-loop search.
+"""
+
+import subprocess
+import sys
+
+import navigation_helper as nh
+
+
+def _reference_direct(origin, destination):
+    """Direct legs found with list.index over every route, as originally written."""
+    if origin not in nh.station_index:
+        return []
+    found = []
+    for route_id in nh.station_index[origin]['routes']:
+        stations = nh.routes[route_id]['stations']
+        if origin in stations and destination in stations:
+            if stations.index(origin) < stations.index(destination):
+                found.append((route_id, stations.index(origin), stations.index(destination)))
+    return found
+
+
+def _reference_journeys(origin, destination, n):
+    """(changes, routes) of every n-interchange journey, by nested loops."""
+    results = set()
+    direct = {}
+
+    def routes_between(station, stop):
+        if (station, stop) not in direct:
+            direct[(station, stop)] = [r for r, _, _ in _reference_direct(station, stop)]
+        return direct[(station, stop)]
+
+    def extend(station, visited, used, changes):
+        if len(used) == n:
+            for route_id in routes_between(station, destination):
+                if route_id not in used:
+                    results.add((tuple(changes), tuple(used + [route_id])))
+            return
+        for stop in nh.station_index:
+            if stop in visited or stop == destination:
+                continue
+            for route_id in routes_between(station, stop):
+                if route_id not in used:
+                    extend(stop, visited | {stop}, used + [route_id], changes + [stop])
+
+    extend(origin, {origin}, [], [])
+    return results
+
+
+def test_import_is_lazy():
+    """Importing the module doesn't read the knowledge base."""
+    code = ("import network_model, navigation_helper; "
+            "assert not network_model._MODELS; "
+            "navigation_helper.search_station_name('benton'); "
+            "assert network_model.get_network_model()._knowledge_base is not None")
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_direct_routes_match_list_index():
+    """Every station pair gives the same legs as the list.index version."""
+    for origin in nh.station_index:
+        for destination in nh.station_index:
+            legs = nh.find_direct_routes(origin, destination)
+            assert [(leg['route_id'], leg['stops']) for leg in legs] == [
+                (route_id, j - i) for route_id, i, j in _reference_direct(origin, destination)]
+            for leg in legs:
+                assert leg['stations'][0] == origin and leg['stations'][-1] == destination
+    assert nh.find_direct_routes("Nowhere", "Benton") == []
+
+
+def test_interchange_journeys_match_nested_loops():
+    """find_routes_with_interchanges finds exactly the nested-loop journeys."""
+    pairs = [("Benton", "Airport Terminal 3"), ("Airport Terminal 1", "Westwyvern"),
+             ("Stepford Victoria", "Newry")]
+    for origin, destination in pairs:
+        for n in range(3):
+            journeys = nh.find_routes_with_interchanges(origin, destination, n)
+            got = {(tuple(j['interchanges_at']), tuple(j['route_ids'])) for j in journeys}
+            assert len(got) == len(journeys)
+            assert got == _reference_journeys(origin, destination, n), (origin, destination, n)
+            times = [nh.calculate_journey_time(j) for j in journeys]
+            assert times == sorted(times)
+            for j in journeys:
+                assert j['num_interchanges'] == n == len(j['legs']) - 1
+                assert j['legs'][0]['origin'] == origin and j['legs'][-1]['destination'] == destination
+                assert j['total_stops'] == sum(leg['stops'] for leg in j['legs'])
+
+    two = nh.find_routes_with_interchanges("Benton", "Airport Terminal 3", 2)
+    assert "Change at" in nh.format_route_display(two[0])
+    fastest = nh.find_routes_with_interchanges("Stepford Central", "Llyn-by-the-Sea", 2, limit=5)
+    assert len(fastest) == 5 and fastest[0]['legs'][0]['origin'] == "Stepford Central"
+    one = {tuple(j['route_ids']) for j in nh.find_one_interchange_routes("Benton", "Airport Terminal 3")}
+    assert one <= {tuple(j['route_ids']) for j in nh.find_routes_with_interchanges("Benton", "Airport Terminal 3", 1)}
+
+
+def test_results_are_caller_owned():
+    """Editing returned legs or journeys does not change later answers."""
+    direct = nh.find_direct_routes("Benton", "Llyn-by-the-Sea")
+    expected = [dict(leg, stations=list(leg['stations'])) for leg in direct]
+    direct[0]['stops'] = -1
+    direct[0]['stations'].append("Nowhere")
+    direct.clear()
+    assert nh.find_direct_routes("Benton", "Llyn-by-the-Sea") == expected
+
+    one = nh.find_one_interchange_routes("Benton", "Airport Terminal 3")
+    one[0]['leg1']['route_id'] = "edited"
+    one[0]['leg2']['stations'].clear()
+    assert nh.find_one_interchange_routes("Benton", "Airport Terminal 3")[0]['leg1']['route_id'] != "edited"
+
+    journeys = nh.find_routes_with_interchanges("Benton", "Airport Terminal 3", 1)
+    first = [dict(leg, stations=list(leg['stations'])) for leg in journeys[0]['legs']]
+    journeys[0]['legs'][0]['stations'].append("Nowhere")
+    assert nh.find_routes_with_interchanges("Benton", "Airport Terminal 3", 1)[0]['legs'] == first
+    assert nh.find_direct_routes(first[0]['origin'], first[0]['destination'])
+
+
+if __name__ == "__main__":
+    test_import_is_lazy()
+    test_direct_routes_match_list_index()
+    test_interchange_journeys_match_nested_loops()
+    test_results_are_caller_owned()
+    print("✅ navigation_helper matches the nested-loop search")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test that rail_helpers functions give identical answers for the dict graph and
+the integer-indexed NetworkIndex.
+"""
+
+import os
+import random
+import tempfile
+
+import rail_helpers
+import synthetic_network
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROUTES_CSV = os.path.join(HERE, "rail_routes.csv")
+
+
+def _load_both(path):
+    graph, operators, lines = rail_helpers.load_rail_network(path)
+    index = rail_helpers.load_network_index(path)
+    return graph, operators, lines, index
+
+
+def _same_services(a, b):
+    key = lambda s: s["line"]
+    return sorted(a, key=key) == sorted(b, key=key)
+
+
+def _assert_equivalent(graph, operators, lines, index, pairs):
+    assert list(index) == list(graph)
+    assert sorted(index.operators) == operators
+    assert sorted(index.lines) == lines
+    assert rail_helpers.all_stations(index) == rail_helpers.all_stations(graph)
+
+    for station in list(graph)[:200] + ["Nowhere"]:
+        assert rail_helpers.operators_at_station(index, station) == \
+            rail_helpers.operators_at_station(graph, station)
+        assert rail_helpers.lines_at_station(index, station) == \
+            rail_helpers.lines_at_station(graph, station)
+        assert rail_helpers.station_info(index, station) == \
+            rail_helpers.station_info(graph, station)
+        if station in graph:
+            assert index[station] == graph[station]
+
+    for op in operators + ["No Such Operator"]:
+        assert rail_helpers.edges_for_operator(index, op) == \
+            rail_helpers.edges_for_operator(graph, op)
+    for line in lines[:50] + ["R999"]:
+        assert rail_helpers.edges_for_line(index, line) == \
+            rail_helpers.edges_for_line(graph, line)
+
+    for a, b in pairs:
+        assert rail_helpers.direct_services_between(index, a, b) == \
+            rail_helpers.direct_services_between(graph, a, b)
+        assert _same_services(rail_helpers.services_on_same_line(index, a, b),
+                              rail_helpers.services_on_same_line(graph, a, b))
+        assert rail_helpers.find_interchanges(index, a, b) == \
+            rail_helpers.find_interchanges(graph, a, b)
+
+        j_index = rail_helpers.shortest_path(index, a, b)
+        j_graph = rail_helpers.shortest_path(graph, a, b)
+        assert (j_index is None) == (j_graph is None)
+        if j_graph:
+            assert j_index['total_time'] == j_graph['total_time']
+
+
+def test_real_network_equivalence():
+    """Every helper matches on rail_routes.csv."""
+    graph, operators, lines, index = _load_both(ROUTES_CSV)
+    stations = list(graph)
+    pairs = [(a, b) for a in stations[::7] for b in stations[::5]]
+    pairs.append(("Benton", "Llyn-by-the-Sea"))
+    _assert_equivalent(graph, operators, lines, index, pairs)
+
+
+def test_from_graph_matches_from_csv():
+    """Building from the dict graph gives the same index as building from CSV."""
+    graph, _, _, index = _load_both(ROUTES_CSV)
+    rebuilt = rail_helpers.NetworkIndex.from_graph(graph)
+    assert rebuilt.stations == index.stations
+    assert rebuilt.offsets == index.offsets
+    assert rebuilt.targets == index.targets
+    assert rebuilt.times == index.times
+    assert [rebuilt.lines[l] for l in rebuilt.edge_lines] == \
+        [index.lines[l] for l in index.edge_lines]
+
+
+def test_synthetic_network_equivalence():
+    """Every helper matches on a generated network."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.csv")
+        synthetic_network.write_network_csv(path, 400, seed=3)
+        graph, operators, lines, index = _load_both(path)
+
+    rng = random.Random(3)
+    stations = list(graph)
+    pairs = [(rng.choice(stations), rng.choice(stations)) for _ in range(60)]
+    _assert_equivalent(graph, operators, lines, index, pairs)
+
+
+if __name__ == "__main__":
+    test_real_network_equivalence()
+    test_from_graph_matches_from_csv()
+    test_synthetic_network_equivalence()
+    print("✅ NetworkIndex matches the dict graph for every helper")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for network_model: one shared parse handed to every module, with
+derived graphs identical to what the modules used to build themselves.
+"""
+
+import json
+
+import network_model
+import rail_helpers
+import route_corridor_calculator
+import route_pathfinder
+
+
+def test_modules_share_one_model():
+    """RoutePathfinder, RouteCorridorCalculator and navigation_helper reuse the same objects."""
+    model = network_model.get_network_model()
+    assert network_model.get_network_model() is model
+    assert network_model.get_network_model(network_model.ROUTES_CSV) is model
+
+    pathfinder = route_pathfinder.RoutePathfinder()
+    calc = route_corridor_calculator.RouteCorridorCalculator()
+    import navigation_helper
+
+    assert pathfinder.graph is model.route_graph
+    assert pathfinder.routes is model.routes
+    assert calc.data is model.knowledge_base
+    assert calc.network_graph is model.physical_graph
+    assert navigation_helper.routes is model.routes
+    assert route_corridor_calculator.RouteCorridorCalculator().network_graph is calc.network_graph
+
+    graph, operators, lines = model.service_network
+    assert model.service_graph is graph
+    assert graph.source_hash == rail_helpers.file_hash(network_model.ROUTES_CSV)
+
+    fresh = network_model.get_network_model(reload=True)
+    assert fresh is not model and network_model.get_network_model() is fresh
+
+
+def test_derived_structures_match_module_builds():
+    """Each lazily built structure equals the module's own build."""
+    with open(network_model.KNOWLEDGE_BASE, encoding='utf-8') as f:
+        data = json.load(f)
+    model = network_model.NetworkModel()
+    assert model.knowledge_base == data
+    assert model.route_graph == route_pathfinder.RoutePathfinder(data).graph
+    assert model.physical_graph == route_corridor_calculator.build_station_network(data)
+    assert model.service_network == rail_helpers.load_rail_network()
+
+    active = 0
+    for code, route in data['routes'].items():
+        removed = 'REMOVED' in route.get('route_type', '')
+        active += 0 if removed else len(model.route_positions[code])
+        for station in route.get('stations', []):
+            i = model.route_positions[code][station]
+            assert route['stations'].index(station) == i
+            assert ((code, i) in model.station_routes.get(station, [])) != removed
+    assert sum(map(len, model.station_routes.values())) == active
+    assert "route_graph" in repr(model)
+
+
+if __name__ == "__main__":
+    test_modules_share_one_model()
+    test_derived_structures_match_module_builds()
+    print("✅ NetworkModel shared by every module")
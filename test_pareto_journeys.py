@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for rail_helpers.pareto_journeys and load_line_prices.
+
+Compares the (time, interchanges, points) Pareto set against brute-force
+enumeration of every simple path on small generated networks.
+"""
+
+import os
+import random
+
+import rail_helpers
+import synthetic_network
+from test_shortest_path import PENALTY, _check_journey, _load_rows
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _journey_vector(journey, prices):
+    time, changes, points, line = 0, 0, 0, None
+    for leg in journey["legs"]:
+        if leg["line"] != line:
+            if line is not None:
+                time += PENALTY
+                changes += 1
+            points += prices.get(leg["line"], 0)
+        time += leg["time"]
+        line = leg["line"]
+    return time, changes, points
+
+
+def _pareto_front(vectors):
+    front = []
+    for v in sorted(set(vectors)):
+        if not any(all(a <= b + 1e-9 for a, b in zip(f, v)) for f in front):
+            front.append(v)
+    return front
+
+
+def _brute_force(graph, start, end, prices):
+    vectors = []
+
+    def dfs(station, line, time, changes, points, visited):
+        if station == end:
+            vectors.append((round(time, 9), changes, points))
+            return
+        for edge in graph[station]:
+            nxt = edge["to"]
+            if nxt in visited:
+                continue
+            if edge["line"] == line:
+                step = (time + edge["time"], changes, points)
+            elif line is None:
+                step = (time + edge["time"], changes, points + prices.get(edge["line"], 0))
+            else:
+                step = (time + edge["time"] + PENALTY, changes + 1,
+                        points + prices.get(edge["line"], 0))
+            visited.add(nxt)
+            dfs(nxt, edge["line"], *step, visited)
+            visited.remove(nxt)
+
+    dfs(start, None, 0, 0, 0, {start})
+    return _pareto_front(vectors)
+
+
+def test_matches_brute_force_on_small_networks():
+    """The returned vectors are exactly the brute-force Pareto front."""
+    for seed in range(5):
+        rows, _ = synthetic_network.generate_network(12, stops_per_line=4, seed=seed)
+        graph, index = _load_rows(rows)
+        rng = random.Random(seed)
+        prices = {row["line"]: rng.choice([0, 150, 300, 450]) for row in rows}
+        for a in graph:
+            for b in graph:
+                if a == b:
+                    continue
+                expected = _brute_force(graph, a, b, prices)
+                for g in (graph, index):
+                    journeys = rail_helpers.pareto_journeys(g, a, b, prices)
+                    got = []
+                    for journey in journeys:
+                        _check_journey(graph, journey, a, b)
+                        vector = _journey_vector(journey, prices)
+                        assert vector[1:] == (journey["num_interchanges"], journey["points"])
+                        got.append((round(vector[0], 9),) + vector[1:])
+                    assert sorted(got) == expected, (seed, a, b, got, expected)
+
+
+def test_real_network_fares():
+    """Knowledge-base prices load, and the fastest option matches shortest_path."""
+    prices = rail_helpers.load_line_prices(
+        os.path.join(HERE, "stepford_routes_with_segment_minutes_ai_knowledge_base.json"),
+        os.path.join(HERE, "ee", "scr_route_metadata_full.csv"))
+    assert prices["R051"] == 450 and prices["R052"] == 0
+    assert rail_helpers._parse_points("300 Points + 90 Experience") == 300
+
+    graph, _, _ = rail_helpers.load_rail_network(os.path.join(HERE, "rail_routes.csv"))
+    journeys = rail_helpers.pareto_journeys(graph, "Benton", "Llyn-by-the-Sea", prices)
+    assert journeys[0]["total_time"] == rail_helpers.shortest_path(
+        graph, "Benton", "Llyn-by-the-Sea")["total_time"]
+    assert min(j["points"] for j in journeys) == 0
+    assert "Fares: " in rail_helpers.format_journey(journeys[-1])
+
+    capped = rail_helpers.pareto_journeys(graph, "Llyn-by-the-Sea", "Airport Terminal 3",
+                                          prices, max_interchanges=0)
+    assert capped and all(j["num_interchanges"] == 0 for j in capped)
+
+
+if __name__ == "__main__":
+    test_matches_brute_force_on_small_networks()
+    test_real_network_fares()
+    print("✅ pareto_journeys matches brute force")
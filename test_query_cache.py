@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the rail_helpers query cache (QUERY_CACHE / cached_query).
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import rail_helpers
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROUTES_CSV = os.path.join(HERE, "rail_routes.csv")
+
+
+def _fresh_cache(maxsize=rail_helpers.QUERY_CACHE_SIZE):
+    rail_helpers.QUERY_CACHE.clear()
+    rail_helpers.QUERY_CACHE.maxsize = maxsize
+
+
+def test_hits_match_uncached_results():
+    """Cached answers equal the uncached helpers, and repeat calls are hits."""
+    _fresh_cache()
+    graph, operators, _ = rail_helpers.load_rail_network(ROUTES_CSV)
+    index = rail_helpers.load_network_index(ROUTES_CSV)
+    assert graph.source_hash == index.source_hash == rail_helpers.file_hash(ROUTES_CSV)
+
+    for g in (graph, index):
+        for station in list(graph)[:10]:
+            first = rail_helpers.station_info(g, station)
+            assert rail_helpers.station_info(g, station) == first
+            assert first == rail_helpers.station_info.__wrapped__(g, station)
+        for op in operators:
+            assert (rail_helpers.edges_for_operator(g, op)
+                    == rail_helpers.edges_for_operator.__wrapped__(g, op))
+            rail_helpers.edges_for_operator(g, op)
+
+    stats = rail_helpers.QUERY_CACHE.stats()
+    assert stats['functions']['station_info'] == {'hits': 20, 'misses': 20}
+    assert stats['functions']['edges_for_operator'] == {'hits': 2 * len(operators),
+                                                         'misses': 2 * len(operators)}
+    assert stats['hits'] == sum(f['hits'] for f in stats['functions'].values())
+    json.dumps(stats)
+    _fresh_cache()
+
+
+def test_changed_csv_invalidates():
+    """A reloaded, edited CSV has a new hash, so old results are not reused."""
+    _fresh_cache()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "routes.csv")
+        shutil.copy(ROUTES_CSV, path)
+        graph, _, _ = rail_helpers.load_rail_network(path)
+        before = rail_helpers.lines_at_station(graph, "Benton")
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("Metro,R999,Benton,Nowhere,3.0,Stopping,Benton,Nowhere\n")
+        edited, _, _ = rail_helpers.load_rail_network(path)
+        assert edited.source_hash != graph.source_hash
+        assert rail_helpers.lines_at_station(edited, "Benton") == sorted(before + ["R999"])
+        assert rail_helpers.lines_at_station(graph, "Benton") == before
+    assert rail_helpers.QUERY_CACHE.stats()['functions']['lines_at_station']['hits'] == 1
+    _fresh_cache()
+
+
+def test_lru_bound_and_unhashed_graphs():
+    """The cache never grows past maxsize; graphs without a hash bypass it."""
+    _fresh_cache(maxsize=5)
+    graph, _, _ = rail_helpers.load_rail_network(ROUTES_CSV)
+    stations = list(graph)
+    for station in stations[:20]:
+        rail_helpers.station_connections(graph, station)
+    assert rail_helpers.QUERY_CACHE.stats()['size'] == 5
+    rail_helpers.station_connections(graph, stations[19])  # most recent: still cached
+    rail_helpers.station_connections(graph, stations[0])   # evicted long ago
+    counts = rail_helpers.QUERY_CACHE.stats()['functions']['station_connections']
+    assert counts == {'hits': 1, 'misses': 21}
+
+    _fresh_cache()
+    plain = dict(graph)
+    rail_helpers.shortest_path(plain, "Benton", "Llyn-by-the-Sea")
+    assert rail_helpers.QUERY_CACHE.stats()['misses'] == 0
+
+    _fresh_cache(maxsize=0)
+    rail_helpers.shortest_path(graph, "Benton", "Llyn-by-the-Sea")
+    rail_helpers.shortest_path(graph, "Benton", "Llyn-by-the-Sea")
+    assert rail_helpers.QUERY_CACHE.stats()['size'] == 0
+    assert rail_helpers.QUERY_CACHE.stats()['functions']['shortest_path']['misses'] == 2
+    _fresh_cache()
+
+
+def test_results_are_read_only():
+    """Cached results are frozen and shared, so no caller can change what later callers get."""
+    import copy
+    import pickle
+
+    _fresh_cache()
+    graph, _, _ = rail_helpers.load_rail_network(ROUTES_CSV)
+    journey = rail_helpers.shortest_path(graph, "Benton", "Llyn-by-the-Sea")
+    expected = rail_helpers.shortest_path.__wrapped__(graph, "Benton", "Llyn-by-the-Sea")
+    assert journey == expected
+    edits = [lambda: journey['stations'].append("Nowhere"),
+             lambda: journey['legs'][0].__setitem__('line', "edited"),
+             lambda: journey.update(total_time=-1),
+             lambda: journey['legs'].sort()]
+    for edit in edits:
+        try:
+            edit()
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("cached result was editable")
+
+    again = rail_helpers.shortest_path(graph, "Benton", "Llyn-by-the-Sea")
+    assert again is journey and again == expected  # Hits are not copied
+    assert json.loads(json.dumps(journey)) == expected
+    assert pickle.loads(pickle.dumps(journey)) == expected
+    assert copy.deepcopy(journey) == expected
+
+    editable = rail_helpers.thaw(journey)
+    editable['legs'][0]['line'] = "edited"
+    editable['stations'].append("Nowhere")
+    assert rail_helpers.shortest_path(graph, "Benton", "Llyn-by-the-Sea") == expected
+    assert rail_helpers.QUERY_CACHE.stats()['functions']['shortest_path'] == {'hits': 2, 'misses': 1}
+    _fresh_cache()
+
+
+def test_object_arguments_bypass_cache():
+    """Calls passing a table or guide object are not cached, so the cache never holds them."""
+    import gc
+    import weakref
+
+    _fresh_cache()
+    graph, _, _ = rail_helpers.load_rail_network(ROUTES_CSV)
+    with tempfile.TemporaryDirectory() as tmp:
+        table = rail_helpers.JourneyTable(ROUTES_CSV, cache_dir=tmp)
+        journey = rail_helpers.find_best_route(graph, "Benton", "Llyn-by-the-Sea", table=table)
+        assert journey == rail_helpers.find_best_route.__wrapped__(graph, "Benton", "Llyn-by-the-Sea")
+        assert rail_helpers.QUERY_CACHE.stats()['size'] == 0
+        journey['stations'].append("Nowhere")  # Uncached results stay the caller's own
+
+        alive = weakref.ref(table)
+        del table
+        gc.collect()
+        assert alive() is None
+    _fresh_cache()
+
+
+if __name__ == "__main__":
+    test_hits_match_uncached_results()
+    test_changed_csv_invalidates()
+    test_lru_bound_and_unhashed_graphs()
+    test_results_are_read_only()
+    test_object_arguments_bypass_cache()
+    print("✅ query cache behaves")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Exactness tests for route_pathfinder.RaptorRouter.
+
+Compares the RAPTOR Pareto set against brute-force enumeration of every
+sequence of trips on small random route sets.
+"""
+
+import random
+
+from route_pathfinder import RaptorRouter, load_routes
+
+
+def _random_routes(seed, num_stations=9, num_routes=7):
+    rng = random.Random(seed)
+    stations = [f"S{i}" for i in range(num_stations)]
+    routes = {}
+    for r in range(num_routes):
+        stops = rng.sample(stations, rng.randint(2, 5))
+        routes[f"R{r:03d}"] = {
+            'operator': rng.choice(["Metro", "AirLink"]),
+            'route_type': "Test Line",
+            'price': "0 Points",
+            'travel_time': {'up': f"{rng.randint(2, 20)} minutes"},
+            'stations': stops,
+        }
+    return {'routes': routes}
+
+
+def _brute_force(router, start, end, max_transfers):
+    """Best arrival per transfer count, enumerating every trip sequence."""
+    best = {}
+    patterns = range(len(router.pattern_routes))
+
+    def positions(p):
+        return range(router.pattern_offsets[p], router.pattern_offsets[p + 1])
+
+    def search(stop, time, transfers, used):
+        for p in patterns:
+            for board in positions(p):
+                if router.pattern_stops[board] != stop:
+                    continue
+                for alight in positions(p):
+                    if alight <= board:
+                        continue
+                    arrival = time + router.pattern_times[alight] - router.pattern_times[board]
+                    if transfers:
+                        arrival += router.transfer_minutes
+                    nxt = router.pattern_stops[alight]
+                    if nxt == end:
+                        best[transfers] = min(best.get(transfers, float('inf')), arrival)
+                    elif transfers < max_transfers and nxt not in used:
+                        search(nxt, arrival, transfers + 1, used | {nxt})
+
+    search(start, 0.0, 0, {start})
+    return best
+
+
+def _pareto(best, max_transfers):
+    """Reduce per-transfer bests to the strictly improving (Pareto) sequence."""
+    front = []
+    current = float('inf')
+    for k in range(max_transfers + 1):
+        if k in best and best[k] < current - 1e-9:
+            front.append((k, best[k]))
+            current = best[k]
+    return front
+
+
+def _check_route(router, route, start, end):
+    assert route['path'][0] == start and route['path'][-1] == end
+    assert len(route['routes']) == len(route['path']) - 1
+    assert abs(sum(e['time'] for e in route['routes']) +
+               route['transfers'] * router.transfer_minutes - route['time']) < 1e-9
+    changes = sum(1 for a, b in zip(route['routes'], route['routes'][1:]) if a['route'] != b['route'])
+    assert changes <= route['transfers']
+
+
+def test_matches_brute_force():
+    """RAPTOR returns exactly the brute-force Pareto front."""
+    for seed in range(20):
+        for transfer_minutes in (0.0, 3.0):
+            router = RaptorRouter(_random_routes(seed), transfer_minutes=transfer_minutes)
+            for start in router.stops:
+                for end in router.stops:
+                    if start == end:
+                        continue
+                    s, e = router.stop_ids[start], router.stop_ids[end]
+                    expected = _pareto(_brute_force(router, s, e, 2), 2)
+                    routes = router.query(start, end, max_transfers=2)
+                    got = [(r['transfers'], r['time']) for r in routes]
+                    assert len(got) == len(expected), (seed, start, end, got, expected)
+                    for (k1, t1), (k2, t2) in zip(got, expected):
+                        assert k1 == k2 and abs(t1 - t2) < 1e-9, (seed, start, end, got, expected)
+                    for route in routes:
+                        _check_route(router, route, start, end)
+
+
+def test_real_network():
+    """Real knowledge base: Pareto order holds and journeys are well formed."""
+    router = RaptorRouter(load_routes())
+    routes = router.query("Airport Terminal 3", "Llyn-by-the-Sea", max_transfers=4)
+    assert routes
+    for a, b in zip(routes, routes[1:]):
+        assert a['transfers'] < b['transfers'] and a['time'] > b['time']
+    for route in routes:
+        _check_route(router, route, "Airport Terminal 3", "Llyn-by-the-Sea")
+    assert router.query("Benton", "Benton")[0]['routes'] == []
+    assert router.query("Benton", "Nowhere") == []
+
+
+if __name__ == "__main__":
+    test_matches_brute_force()
+    test_real_network()
+    print("✅ RAPTOR matches brute force")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for rail_helpers.reachable_within and rail_helpers.isochrones.
+
+Checked against per-station shortest_path() queries, and against
+pareto_journeys() (fastest journey within the cap) when interchanges are
+capped.
+"""
+
+import os
+
+import rail_helpers
+import synthetic_network
+from test_shortest_path import _load_rows
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROUTES_CSV = os.path.join(HERE, "rail_routes.csv")
+
+
+def _expected(graph, station, minutes, max_interchanges=None):
+    """Fastest journey to every station within the budget, one search per station."""
+    expected = {}
+    for other in graph:
+        if max_interchanges is None:
+            journey = rail_helpers.shortest_path(graph, station, other)
+        else:
+            journeys = rail_helpers.pareto_journeys(graph, station, other, {}, max_interchanges)
+            journey = journeys[0] if journeys else None
+        if journey is not None and journey["total_time"] <= minutes + 1e-9:
+            expected[other] = (journey["total_time"], journey["num_interchanges"])
+    return expected
+
+
+def _assert_reachable(graph, station, minutes, max_interchanges=None):
+    expected = _expected(graph, station, minutes, max_interchanges)
+    reached = rail_helpers.reachable_within(graph, station, minutes, max_interchanges)
+    assert reached[0] == {'station': station, 'time': 0, 'num_interchanges': 0}
+    times = [r['time'] for r in reached]
+    assert times == sorted(times)
+    got = {r['station']: (r['time'], r['num_interchanges']) for r in reached}
+    assert set(got) == set(expected), (station, minutes, set(got) ^ set(expected))
+    for other, (time, changes) in expected.items():
+        assert abs(got[other][0] - time) < 1e-9, (station, other)
+        if max_interchanges is None:
+            # shortest_path() may settle an equally fast journey with more changes
+            assert got[other][1] <= changes, (station, other)
+        else:
+            assert got[other][1] == changes, (station, other)
+
+
+def test_matches_shortest_path_on_real_network():
+    """Every station within the budget, at its shortest_path() time."""
+    graph, _, _ = rail_helpers.load_rail_network(ROUTES_CSV)
+    index = rail_helpers.load_network_index(ROUTES_CSV)
+    for station in list(graph)[::6]:
+        for minutes in (0, 8, 15, 40, 1000):
+            _assert_reachable(graph, station, minutes)
+    _assert_reachable(index, "Benton", 15)
+    assert rail_helpers.reachable_within(graph, "Nowhere", 15) == []
+
+
+def test_interchange_cap():
+    """With a cap, each station gets the fastest journey within the cap."""
+    for seed in range(4):
+        rows, _ = synthetic_network.generate_network(40, stops_per_line=5, seed=seed)
+        graph, index = _load_rows(rows)
+        for station in list(graph)[::5]:
+            for cap in (0, 1, 2):
+                _assert_reachable(graph, station, 60, cap)
+        _assert_reachable(index, next(iter(graph)), 60, 1)
+
+
+def test_isochrones_match_reachable_within():
+    """Filtering the all-pairs matrix gives the same stations and times."""
+    index = rail_helpers.load_network_index(ROUTES_CSV)
+    origins = index.stations[::5] + ["Nowhere"]
+    matrix = rail_helpers.journey_matrix(index, origins, index.stations, jobs=1,
+                                         interchanges=True)
+    for minutes in (10, 25):
+        result = rail_helpers.isochrones(matrix, minutes)
+        assert result["Nowhere"] == []
+        for origin in origins[:-1]:
+            expected = rail_helpers.reachable_within(index, origin, minutes)
+            got = result[origin]
+            assert [r['time'] for r in got] == sorted(r['time'] for r in got)
+            assert got and len(got) == len(expected)
+            reached = {r['station']: r for r in expected}
+            for r in got:
+                assert abs(r['time'] - reached[r['station']]['time']) < 1e-9, (origin, r)
+                assert r['num_interchanges'] >= reached[r['station']]['num_interchanges']
+
+    plain = rail_helpers.journey_matrix(index, origins[:2], index.stations, jobs=1)
+    assert all(set(r) == {'station', 'time'} for r in rail_helpers.isochrones(plain, 30)[origins[0]])
+
+
+if __name__ == "__main__":
+    test_matches_shortest_path_on_real_network()
+    test_interchange_cap()
+    test_isochrones_match_reachable_within()
+    print("✅ reachable_within matches shortest_path")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Tests for RouteCorridorCalculator: the station -> (route, position) index
+against the original scan of every route's station list, the precomputed
+corridor artifact, the physical path search and hop matrix, and the
+reverse skip index and all-pairs service overlap.
+"""
+
+import importlib.util
+import json
+import os
+import random
+import shutil
+import tempfile
+from collections import deque
+
+import route_corridor_calculator as rcc
+import network_model
+from route_corridor_calculator import RouteCorridorCalculator
+
+
+class ScanCorridorCalculator(RouteCorridorCalculator):
+    """Finds the routes between two stations with list.index over every route, as originally written."""
+
+    def _routes_between(self, start, end):
+        found = []
+        for route_code, route_data in self.routes.items():
+            if 'REMOVED' in route_data.get('route_type', ''):
+                continue
+            stations = route_data.get('stations', [])
+            try:
+                start_idx = stations.index(start)
+                end_idx = stations.index(end)
+            except ValueError:
+                continue
+            if start_idx < end_idx:
+                found.append((route_code, start_idx, end_idx))
+        return found
+
+
+def path_copy_bfs(graph, start, end):
+    """shortest_station_path's original BFS, queueing a copied path per node."""
+    if start == end:
+        return [start]
+    if start not in graph or end not in graph:
+        return None
+    queue = deque([[start]])
+    visited = {start}
+    while queue:
+        path = queue.popleft()
+        if path[-1] == end:
+            return path
+        for neighbor in graph[path[-1]]:
+            if neighbor not in visited:
+                visited.add(neighbor)
+                queue.append(path + [neighbor])
+    return None
+
+
+def synthetic_corridors(num_routes, num_lines=20, line_length=60, seed=23):
+    """
+    Corridor dicts for random services over a synthetic network.
+
+    Each service runs along a stretch of one of num_lines station lines (in
+    either direction), stopping at both ends and at a random subset between.
+    """
+    rng = random.Random(seed)
+    lines = [[f"L{line:02d} S{i:03d}" for i in range(line_length)] for line in range(num_lines)]
+    for line in lines[1:]:  # Shared interchange stations
+        line[rng.randrange(line_length)] = lines[0][rng.randrange(line_length)]
+    corridors = {}
+    for r in range(num_routes):
+        line = rng.choice(lines)
+        a, b = sorted(rng.sample(range(line_length), 2))
+        corridor = line[a:b + 1] if rng.random() < 0.5 else line[a:b + 1][::-1]
+        stops = [corridor[0]] + [s for s in corridor[1:-1] if rng.random() < 0.6] + [corridor[-1]]
+        stop_set = set(stops)
+        corridors[f"S{r:04d}"] = {'route_code': f"S{r:04d}", 'stops': stops, 'corridor': corridor,
+                                  'skipped': [s for s in corridor if s not in stop_set]}
+    return corridors
+
+
+def set_overlap(c1, c2):
+    """Pairwise overlap counts by plain set intersection."""
+    def segments(c):
+        return {tuple(sorted(pair)) for pair in zip(c['corridor'], c['corridor'][1:])}
+    return {'shared_stops': len(set(c1['stops']) & set(c2['stops'])),
+            'shared_skipped': len(set(c1['skipped']) & set(c2['skipped'])),
+            'shared_segments': len(segments(c1) & segments(c2))}
+
+
+calc = RouteCorridorCalculator()
+scan = ScanCorridorCalculator()
+
+
+def test_station_routes():
+    """The shared model's index holds the first call of every non-removed route."""
+    # A fresh calculator, since other tests may reload the shared model
+    fresh = RouteCorridorCalculator()
+    assert fresh.station_routes is network_model.get_network_model().station_routes
+    assert RouteCorridorCalculator().station_routes is fresh.station_routes
+    assert fresh.station_routes == calc.station_routes
+    for station, entries in calc.station_routes.items():
+        for route_code, position in entries:
+            route = calc.routes[route_code]
+            assert 'REMOVED' not in route.get('route_type', '')
+            assert route['stations'].index(station) == position
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "routes.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({'routes': {
+                'A1': {'stations': ['X', 'Y', 'X']},
+                'B1': {'stations': ['Y', 'X'], 'route_type': 'REMOVED'},
+            }}, f)
+        small = network_model.NetworkModel(knowledge_base=path)
+        assert small.station_routes == {'X': [('A1', 0)], 'Y': [('A1', 1)]}
+
+
+def test_routes_between_matches_scan():
+    """The index finds the same routes, positions and order as the scan."""
+    stations = sorted(calc.station_routes)
+    for a in stations:
+        for b in stations:
+            assert calc._routes_between(a, b) == scan._routes_between(a, b), (a, b)
+
+
+def test_corridors_match_scan():
+    """Whole-route corridors and station-pair comparisons are unchanged."""
+    for route_code in calc.routes:
+        assert calc.calculate_route_corridor(route_code) == scan.calculate_route_corridor(route_code)
+    for a, b in [('St Helens Bridge', 'Leighton Stepford Road'),
+                 ('Stepford Central', 'Airport Central'),
+                 ('Benton', 'Llyn-by-the-Sea'),
+                 ('Nowhere', 'Benton')]:
+        assert calc.get_all_corridors_between(a, b) == scan.get_all_corridors_between(a, b)
+
+
+def test_corridor_artifact():
+    """--all artifacts match calculate_route_corridor and are used by lookups."""
+    with tempfile.TemporaryDirectory() as tmp:
+        serial, path = rcc.build_corridor_artifact(calc.routes_file, tmp, jobs=1)
+        pooled, pooled_path = rcc.build_corridor_artifact(calc.routes_file, tmp, jobs=2)
+        assert path == pooled_path and os.path.exists(path)
+        assert list(serial) == list(pooled) == list(calc.routes)
+        for route_code in calc.routes:
+            assert serial[route_code] == pooled[route_code] == calc.calculate_route_corridor(route_code)
+
+        cached = RouteCorridorCalculator(cache_dir=tmp)
+        cached.calculate_route_corridor = None  # Lookups must not recompute
+        for route_code in calc.routes:
+            assert cached.get_skipped_stations(route_code) == serial[route_code]['skipped']
+        assert cached.compare_services('R026', 'R035') == calc.compare_services('R026', 'R035')
+        assert cached.get_skipped_stations('R000') is None
+
+
+def test_stale_artifact_ignored():
+    """An edited knowledge base no longer matches its artifact."""
+    with tempfile.TemporaryDirectory() as tmp:
+        routes_file = os.path.join(tmp, "routes.json")
+        shutil.copy(calc.routes_file, routes_file)
+        rcc.build_corridor_artifact(routes_file, jobs=1)
+        assert rcc.load_corridor_artifact(routes_file) is not None
+
+        with open(routes_file, encoding="utf-8") as f:
+            data = json.load(f)
+        data['routes']['R026']['stations'].pop(1)
+        with open(routes_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        assert rcc.load_corridor_artifact(routes_file) is None
+
+
+        # A partial write is a cache miss, not an error
+        corridors, path = rcc.build_corridor_artifact(routes_file, jobs=1)
+        with open(path, "rb") as f:
+            full = f.read()
+        with open(path, "wb") as f:
+            f.write(full[:len(full) // 2])
+        assert rcc.load_corridor_artifact(routes_file) is None
+        assert RouteCorridorCalculator(routes_file).corridor('R026') == corridors['R026']
+
+
+def _check_matrix(matrix, graph):
+    stations = sorted(graph)
+    for a in stations:
+        for b in stations:
+            expected = path_copy_bfs(graph, a, b)
+            path = matrix.path(a, b)
+            if expected is None:
+                assert path is None and matrix.distance(a, b) is None
+                continue
+            assert len(path) == len(expected) == matrix.distance(a, b) + 1
+            assert path[0] == a and path[-1] == b
+            assert all(v in graph[u] for u, v in zip(path, path[1:]))
+
+
+def test_shortest_station_path():
+    """Parent-pointer BFS returns the path-copying BFS's path."""
+    graph = calc.network_graph
+    stations = sorted(graph) + ['Nowhere']
+    fresh = RouteCorridorCalculator()
+    for a in stations:
+        for b in stations:
+            assert fresh.shortest_station_path(a, b) == path_copy_bfs(graph, a, b)
+
+
+def test_hop_matrix():
+    """Matrix paths are shortest, valid and used once built."""
+    graph = calc.network_graph
+    _check_matrix(rcc.HopMatrix.from_graph(graph), graph)
+
+    # Disconnected stations and one-way links
+    matrix = rcc.HopMatrix.from_graph({'A': {'B'}, 'B': {'C'}, 'D': set()})
+    assert matrix.path('A', 'C') == ['A', 'B', 'C'] and matrix.path('C', 'A') is None
+    assert matrix.distance('A', 'D') is None and matrix.path('D', 'D') == ['D']
+
+    fresh = RouteCorridorCalculator()
+    built = fresh.hop_matrix()
+    assert fresh.hop_matrix() is built
+    for a in sorted(graph):
+        for b in sorted(graph):
+            assert fresh.shortest_station_path(a, b) == built.path(a, b)
+    assert fresh.shortest_station_path('Benton', 'Nowhere') is None
+
+
+def test_skip_index():
+    """Skip index queries match scanning every corridor's stop and skipped lists."""
+    skips = calc.skip_index()
+    assert calc.skip_index() is skips
+    active = [code for code in calc.routes if 'REMOVED' not in calc.routes[code].get('route_type', '')]
+    assert skips.routes == active
+
+    for station in skips.stations:
+        assert skips.routes_passing(station) == [
+            code for code in active if station in calc.calculate_route_corridor(code)['skipped']]
+        assert skips.routes_stopping(station) == [
+            code for code in active if station in calc.calculate_route_corridor(code)['stops']]
+    for code in active:
+        corridor = calc.calculate_route_corridor(code)
+        pattern = skips.skip_pattern(code)
+        assert [station for station, _ in pattern] == corridor['corridor']
+        assert [station for station, state in pattern if state == rcc.PASS] == corridor['skipped']
+        for station, state in pattern:
+            assert skips.state(station, code) == state
+
+    assert 'R081' in skips.routes_passing('Benton Bridge')
+    assert skips.routes_passing('Nowhere') == [] and skips.skip_pattern('R000') is None
+
+    small = rcc.SkipIndex.from_corridors({
+        'A1': {'stops': ['X', 'Z'], 'corridor': ['X', 'Y', 'Z'], 'skipped': ['Y']},
+        'B1': {'stops': ['X', 'Y'], 'corridor': ['X', 'Y'], 'skipped': []},
+        'C1': {'stops': ['Y', 'Z'], 'corridor': ['Y', 'Z'], 'skipped': []},
+    }, {'C1': {'route_type': 'REMOVED'}})
+    assert small.routes == ['A1', 'B1']
+    assert small.routes_passing('Y') == ['A1'] and small.routes_stopping('Y') == ['B1']
+    assert small.state('Z', 'B1') is None and small.state('Z', 'A1') == rcc.STOP
+    if importlib.util.find_spec("numpy") is not None:
+        assert small.to_numpy().tolist() == [[1, 1], [2, 1], [1, 0]]
+
+
+def test_service_overlap():
+    """Bitmask overlap counts equal set intersections for every route pair."""
+    overlap = calc.service_overlap()
+    assert calc.service_overlap() is overlap
+    assert overlap.routes == calc.skip_index().routes
+    for a in overlap.routes:
+        for b in overlap.routes:
+            assert overlap.pair(a, b) == set_overlap(calc.corridor(a), calc.corridor(b)), (a, b)
+    assert overlap.pair('R026', 'R000') is None
+
+    corridors = synthetic_corridors(150)
+    synthetic = rcc.ServiceOverlap.from_skip_index(rcc.SkipIndex.from_corridors(corridors))
+    for a in synthetic.routes:
+        for b in synthetic.routes:
+            assert synthetic.pair(a, b) == set_overlap(corridors[a], corridors[b])
+
+    top = synthetic.top_pairs('shared_segments', 5)
+    best = max(set_overlap(corridors[a], corridors[b])['shared_segments']
+               for i, a in enumerate(synthetic.routes) for b in synthetic.routes[i + 1:])
+    assert len(top) == 5 and top[0][2] == best
+    assert [count for _, _, count in top] == sorted((count for _, _, count in top), reverse=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "overlap.csv")
+        synthetic.write_matrix_csv(path, 'shared_stops')
+        with open(path, encoding="utf-8") as f:
+            rows = [line.rstrip("\n").split(",") for line in f]
+    assert rows[0] == ['shared_stops'] + synthetic.routes
+    assert rows[3][0] == synthetic.routes[2]
+    assert [int(v) for v in rows[3][1:]] == list(synthetic.shared_stops[2])
+
+
+if __name__ == "__main__":
+    test_station_routes()
+    test_routes_between_matches_scan()
+    test_corridors_match_scan()
+    test_corridor_artifact()
+    test_stale_artifact_ignored()
+    test_shortest_station_path()
+    test_hop_matrix()
+    test_skip_index()
+    test_service_overlap()
+    print("✅ corridor index, artifact, physical paths, skip index and overlap check out")
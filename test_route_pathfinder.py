@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for route_pathfinder.RoutePathfinder.find_routes and iter_routes.
+
+The label-setting search is compared against brute-force enumeration of
+every loop-free path on small random route sets: for each transfer limit
+the fastest route found must equal the fastest path that exists.
+"""
+
+import random
+
+from route_pathfinder import RoutePathfinder, load_routes
+from test_raptor import _random_routes
+
+INF = float('inf')
+
+
+def _brute_force(pathfinder, start, end, max_transfers):
+    """Fastest loop-free path per exact transfer count."""
+    best = {}
+
+    def search(station, route, transfers, time, visited):
+        if station == end:
+            best[transfers] = min(best.get(transfers, INF), time)
+            return
+        for edge in pathfinder.graph.get(station, []):
+            nxt = edge['to']
+            if nxt in visited:
+                continue
+            changes = transfers + (route is not None and edge['route'] != route)
+            if changes <= max_transfers:
+                search(nxt, edge['route'], changes, time + edge['time'], visited | {nxt})
+
+    search(start, None, 0, 0.0, {start})
+    return best
+
+
+def _check_route(pathfinder, route, start, end, max_transfers):
+    path = route['path']
+    assert path[0] == start and path[-1] == end
+    assert len(set(path)) == len(path)
+    assert len(route['routes']) == len(path) - 1
+    for a, b, edge in zip(path, path[1:], route['routes']):
+        assert edge['to'] == b and edge in pathfinder.graph[a]
+    changes = sum(1 for x, y in zip(route['routes'], route['routes'][1:]) if x['route'] != y['route'])
+    assert changes == route['transfers'] <= max_transfers
+    assert abs(sum(e['time'] for e in route['routes']) - route['time']) < 1e-9
+
+
+def test_matches_brute_force():
+    """Fastest route per transfer limit equals the brute-force optimum."""
+    for seed in range(40):
+        pathfinder = RoutePathfinder(_random_routes(seed))
+        stations = sorted(pathfinder.graph)
+        rng = random.Random(seed)
+        for _ in range(6):
+            start, end = rng.sample(stations, 2)
+            for max_transfers in range(4):
+                routes = pathfinder.find_routes(start, end, max_transfers)
+                expected = _brute_force(pathfinder, start, end, max_transfers)
+                assert not pathfinder.last_search['truncated']
+                for route in routes:
+                    _check_route(pathfinder, route, start, end, max_transfers)
+                assert routes == sorted(routes, key=lambda r: (r['transfers'], r['time']))
+                for k in range(max_transfers + 1):
+                    fastest = min((t for n, t in expected.items() if n <= k), default=INF)
+                    got = min((r['time'] for r in routes if r['transfers'] <= k), default=INF)
+                    assert abs(got - fastest) < 1e-9 or got == fastest == INF, (seed, start, end, k)
+
+
+def test_real_network_and_budgets():
+    """Hub-to-hub searches stay small, and the budgets cut the search off."""
+    pathfinder = RoutePathfinder(load_routes())
+    routes = pathfinder.find_routes("Llyn-by-the-Sea", "Airport Terminal 3", max_transfers=5)
+    assert routes[0]['transfers'] == 1
+    assert pathfinder.last_search['labels'] < 20000
+    assert not pathfinder.last_search['truncated']
+    for route in routes:
+        _check_route(pathfinder, route, "Llyn-by-the-Sea", "Airport Terminal 3", 5)
+
+    assert pathfinder.find_routes("Benton", "Benton") == [
+        {'time': 0.0, 'transfers': 0, 'path': ["Benton"], 'routes': []}]
+    assert pathfinder.find_routes("Benton", "Nowhere") == []
+
+    pathfinder.find_routes("Llyn-by-the-Sea", "Airport Terminal 3", 5, max_labels=100)
+    assert pathfinder.last_search['truncated'] and pathfinder.last_search['labels'] == 100
+    pathfinder.find_routes("Llyn-by-the-Sea", "Airport Terminal 3", 5, time_budget=0.0)
+    assert pathfinder.last_search['truncated']
+
+
+def test_iter_routes_streams_in_order():
+    """iter_routes yields find_routes' list lazily, (transfers, time) ordered."""
+    pathfinder = RoutePathfinder(load_routes())
+    routes = pathfinder.iter_routes("Benton", "Llyn-by-the-Sea", max_transfers=3)
+    first = next(routes)
+    labels_at_first = pathfinder.last_search['labels']
+    rest = list(routes)
+    assert pathfinder.last_search['labels'] > labels_at_first
+    streamed = [first] + rest
+    assert streamed[:100] == pathfinder.find_routes("Benton", "Llyn-by-the-Sea", max_transfers=3)
+    keys = [(r['transfers'], r['time']) for r in streamed]
+    assert keys == sorted(keys)
+
+    text = pathfinder.get_best_routes("Benton", "Llyn-by-the-Sea", top_n=3)
+    assert text.count("⏱️") == 3 and "Showing the best 3" in text
+    assert list(pathfinder.iter_routes("Benton", "Nowhere")) == []
+
+
+if __name__ == "__main__":
+    test_matches_brute_force()
+    test_real_network_and_budgets()
+    test_iter_routes_streams_in_order()
+    print("✅ find_routes matches brute force")
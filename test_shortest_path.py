@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Exactness tests for rail_helpers.shortest_path.
+
+Compares the line-aware Dijkstra against brute-force enumeration of every
+simple path (with every choice of line per segment) on small generated
+networks.
+"""
+
+import csv
+import os
+import tempfile
+
+import rail_helpers
+import synthetic_network
+
+PENALTY = rail_helpers.INTERCHANGE_PENALTY
+
+
+def _write_rows(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=synthetic_network.CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _load_rows(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "net.csv")
+        _write_rows(path, rows)
+        graph, _, _ = rail_helpers.load_rail_network(path)
+        index = rail_helpers.load_network_index(path)
+    return graph, index
+
+
+def _brute_force(graph, start, end):
+    """Minimum journey time over all simple paths, by branch and bound DFS."""
+    best = [float("inf")]
+
+    def dfs(station, line, time, visited):
+        if time >= best[0]:
+            return
+        if station == end:
+            best[0] = time
+            return
+        for edge in graph[station]:
+            nxt = edge["to"]
+            if nxt in visited:
+                continue
+            penalty = PENALTY if line is not None and edge["line"] != line else 0
+            visited.add(nxt)
+            dfs(nxt, edge["line"], time + edge["time"] + penalty, visited)
+            visited.remove(nxt)
+
+    dfs(start, None, 0, {start})
+    return best[0] if best[0] != float("inf") else None
+
+
+def _journey_cost(journey):
+    """Recompute total time and interchanges from a journey's legs."""
+    time, changes, line = 0, 0, None
+    for leg in journey["legs"]:
+        if line is not None and leg["line"] != line:
+            time += PENALTY
+            changes += 1
+        time += leg["time"]
+        line = leg["line"]
+    return time, changes
+
+
+def _check_journey(graph, journey, start, end):
+    assert journey["stations"][0] == start and journey["stations"][-1] == end
+    assert len(journey["stations"]) == len(journey["legs"]) + 1
+    for leg, a, b in zip(journey["legs"], journey["stations"], journey["stations"][1:]):
+        assert leg["from"] == a and leg["to"] == b
+        assert any(e["to"] == b and e["line"] == leg["line"] and e["time"] == leg["time"]
+                   for e in graph[a])
+    time, changes = _journey_cost(journey)
+    assert abs(time - journey["total_time"]) < 1e-9
+    assert changes == journey["num_interchanges"]
+
+
+def test_matches_brute_force_on_small_networks():
+    """shortest_path equals the brute-force optimum for every station pair."""
+    for seed in range(6):
+        rows, _ = synthetic_network.generate_network(12, stops_per_line=4, seed=seed)
+        graph, index = _load_rows(rows)
+        stations = list(graph)
+        for a in stations:
+            for b in stations:
+                expected = _brute_force(graph, a, b)
+                for g in (graph, index):
+                    journey = rail_helpers.shortest_path(g, a, b)
+                    if expected is None:
+                        assert journey is None
+                        continue
+                    assert abs(journey["total_time"] - expected) < 1e-9, (seed, a, b)
+                    _check_journey(graph, journey, a, b)
+
+
+def test_arriving_line_is_not_pruned():
+    """An early arrival on the wrong line must not hide a later through service."""
+    rows = [
+        {"operator": "Metro", "line": "L1", "from_station": "A", "to_station": "B",
+         "travel_time_min": 1.0, "service_type": "Stopping", "route_origin": "A",
+         "route_destination": "C"},
+        {"operator": "Metro", "line": "L1", "from_station": "B", "to_station": "C",
+         "travel_time_min": 1.0, "service_type": "Stopping", "route_origin": "A",
+         "route_destination": "C"},
+        {"operator": "AirLink", "line": "L2", "from_station": "A", "to_station": "B",
+         "travel_time_min": 0.5, "service_type": "Express", "route_origin": "A",
+         "route_destination": "B"},
+    ]
+    graph, index = _load_rows(rows)
+    for g in (graph, index):
+        journey = rail_helpers.shortest_path(g, "A", "C")
+        assert journey["total_time"] == 2.0
+        assert journey["num_interchanges"] == 0
+        assert [leg["line"] for leg in journey["legs"]] == ["L1", "L1"]
+
+
+def test_real_network_journeys_are_consistent():
+    """Journeys on rail_routes.csv are valid and their costs add up."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    graph, _, _ = rail_helpers.load_rail_network(os.path.join(here, "rail_routes.csv"))
+    stations = list(graph)
+    for a in stations[::4]:
+        for b in stations[::3]:
+            journey = rail_helpers.shortest_path(graph, a, b)
+            if a == b:
+                assert journey["legs"] == []
+            elif journey:
+                _check_journey(graph, journey, a, b)
+
+
+if __name__ == "__main__":
+    test_matches_brute_force_on_small_networks()
+    test_arriving_line_is_not_pruned()
+    test_real_network_journeys_are_consistent()
+    print("✅ shortest_path matches brute force")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for rail_helpers.StationBitsets: every bitmask query must equal the
+same question answered with Python sets over the graph's edges.
+"""
+
+import os
+
+import rail_helpers
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROUTES_CSV = os.path.join(HERE, "rail_routes.csv")
+
+
+def _sets(graph, station, key):
+    return {edge[key] for edge in graph[station]}
+
+
+def test_matches_set_algebra():
+    """Common lines/operators, shared neighbours and operator pairs on the real network."""
+    graph, operators, lines = rail_helpers.load_rail_network(ROUTES_CSV)
+    index = rail_helpers.load_network_index(ROUTES_CSV)
+    bitsets = rail_helpers.station_bitsets(graph)
+    assert rail_helpers.station_bitsets(graph) is bitsets
+    assert bitsets.lines == lines and bitsets.operators == operators
+    assert rail_helpers.station_bitsets(index).line_masks == bitsets.line_masks
+
+    stations = sorted(graph)
+    for a in stations:
+        for b in stations:
+            assert bitsets.common_lines(a, b) == sorted(_sets(graph, a, "line") & _sets(graph, b, "line"))
+            assert bitsets.common_operators(a, b) == sorted(
+                _sets(graph, a, "operator") & _sets(graph, b, "operator"))
+            assert bitsets.shared_neighbours(a, b) == sorted(_sets(graph, a, "to") & _sets(graph, b, "to"))
+            assert (rail_helpers.find_interchanges(index, a, b)
+                    == rail_helpers.find_interchanges(graph, a, b)
+                    == bitsets.shared_neighbours(a, b))
+
+    for x in operators:
+        for y in operators:
+            expected = sorted(s for s in stations if {x, y} <= _sets(graph, s, "operator"))
+            assert bitsets.stations_served_by([x, y]) == expected
+    line = lines[0]
+    assert bitsets.stations_served_by(lines=[line]) == sorted(
+        s for s in stations if line in _sets(graph, s, "line"))
+    assert bitsets.stations_served_by() == stations
+    assert bitsets.stations_served_by(["No Such Operator"]) == []
+    assert bitsets.common_lines("Nowhere", stations[0]) == []
+
+
+def test_from_memberships():
+    """Other modules can build the index from their own station maps."""
+    bitsets = rail_helpers.StationBitsets.from_memberships(
+        {"A": {"R1", "R2"}, "B": {"R2"}, "C": {"R1", "R2"}},
+        neighbours={"A": {"B"}, "B": {"A", "C"}, "C": {"B", "D"}})
+    assert bitsets.stations == ["A", "B", "C", "D"]
+    assert bitsets.common_lines("A", "C") == ["R1", "R2"]
+    assert bitsets.shared_neighbours("A", "C") == ["B"]
+    assert bitsets.stations_served_by(lines=["R1"]) == ["A", "C"]
+    assert bitsets.common_operators("A", "B") == []
+
+
+if __name__ == "__main__":
+    test_matches_set_algebra()
+    test_from_memberships()
+    print("✅ StationBitsets agree with set algebra")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming station knowledge parser against the original
+DOTALL regex, its reporting of malformed blocks, and the hash-keyed
+station knowledge snapshot.
+"""
+
+import io
+import os
+import re
+import shutil
+import tempfile
+
+import station_knowledge_helper as skh
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PART1 = os.path.join(HERE, "scr_stations_part1.md")
+PART2 = os.path.join(HERE, "scr_stations_part2.md")
+FULL = os.path.join(HERE, "scr_stations_full_content.md")
+
+STATION_PATTERN = (r'## Station \d+: (.+?)\n\n\*\*Page ID:\*\* (\d+)\n\*\*URL:\*\* (.+?)\n\n'
+                   r'\*\*Summary:\*\*\n(.+?)\n\n\*\*Full Content:\*\*\n\n(.+?)\n\n={80}')
+
+
+def regex_load_station_knowledge(*filepaths):
+    """load_station_knowledge as originally written: one re.DOTALL regex per file."""
+    stations = {}
+    for filepath in filepaths:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for match in re.findall(STATION_PATTERN, content, re.DOTALL):
+            stations[match[0].strip()] = {
+                'name': match[0].strip(),
+                'page_id': match[1],
+                'url': match[2],
+                'summary': match[3].strip(),
+                'full_content': match[4].strip()
+            }
+    return stations
+
+
+def _block(number, name, page_id="100", separator="=" * 80):
+    return (f"## Station {number}: {name}\n\n**Page ID:** {page_id}\n"
+            f"**URL:** https://example.test/{name}\n\n**Summary:**\n{name} summary.\n\n"
+            f"**Full Content:**\n\n{name} content.\nSecond line.\n\n{separator}\n\n")
+
+
+def test_matches_regex():
+    """Every station record equals the regex parse, for the parts and the full file."""
+    errors = []
+    parsed = skh.load_station_knowledge(PART1, PART2, errors=errors, use_snapshot=False)
+    assert errors == []
+    assert parsed == regex_load_station_knowledge(PART1, PART2)
+    assert len(parsed) == 82
+
+    with open(FULL, encoding="utf-8") as f:
+        streamed = {record['name']: record for record in skh.iter_station_records(f, errors)}
+    assert errors == []
+    assert streamed == regex_load_station_knowledge(FULL) == parsed
+
+
+def test_reports_malformed_blocks():
+    """Bad separators and missing fields are reported, not silently dropped."""
+    text = ("# Header\n\n" + "=" * 80 + "\n\n"
+            + _block(1, "Alpha", separator="=" * 40)
+            + _block(2, "Bravo", page_id="")
+            + _block(3, "Charlie").replace("=" * 80 + "\n\n", "")
+            + _block(4, "Delta")
+            + _block(5, "Echo").rstrip("=\n"))
+    errors = []
+    records = list(skh.iter_station_records(io.StringIO(text), errors))
+
+    assert [r['name'] for r in records] == ["Alpha", "Charlie", "Delta", "Echo"]
+    assert records[0]['full_content'] == "Alpha content.\nSecond line."
+    assert [(name, problem.split()[0]) for _, name, problem in errors] == [
+        ("Alpha", "separator"), ("Bravo", "missing"), ("Charlie", "no"), ("Echo", "file")]
+    assert errors[0][0] == 18  # Line of the short separator
+
+    # The regex swallows Bravo into Alpha and Delta into Charlie, and drops Echo
+    matches = re.findall(STATION_PATTERN, text, re.DOTALL)
+    assert [m[0] for m in matches] == ["Alpha", "Charlie"]
+    assert "## Station 2: Bravo" in matches[0][4] and "## Station 4: Delta" in matches[1][4]
+
+
+def test_upload_copy_agrees():
+    """The Custom GPT upload copy parses the same records."""
+    import importlib.util
+
+    path = os.path.join(HERE, "custom_gpt_upload", "UPLOAD_TO_CUSTOM_GPT", "station_knowledge_helper.py")
+    spec = importlib.util.spec_from_file_location("upload_station_knowledge_helper", path)
+    upload = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(upload)
+    assert (upload.load_station_knowledge(PART1, PART2, use_snapshot=False)
+            == skh.load_station_knowledge(PART1, PART2, use_snapshot=False))
+
+
+def test_snapshot():
+    """Snapshots reproduce the parse and per-station results, and go stale on edits or corruption."""
+    with tempfile.TemporaryDirectory() as tmp:
+        part1 = os.path.join(tmp, "part1.md")
+        part2 = os.path.join(tmp, "part2.md")
+        shutil.copy(PART1, part1)
+        shutil.copy(PART2, part2)
+
+        parsed = skh.load_station_knowledge(part1, part2, use_snapshot=False)
+        skh._DERIVED.clear()
+        expected = {name: (skh.extract_station_info(station), skh.get_platform_summary(station),
+                           skh.build_route_platform_map(station),
+                           skh.build_directional_platform_map(station))
+                    for name, station in parsed.items()}
+
+        assert skh.load_station_snapshot(part1, part2) is None
+        # Ordinary loads never write a snapshot; build_snapshot opts in
+        assert skh.load_station_knowledge(part1, part2) == parsed
+        assert not os.path.exists(os.path.join(tmp, skh.SNAPSHOT_DIR_NAME))
+        built = skh.load_station_knowledge(part1, part2, build_snapshot=True)
+        assert built == parsed
+        skh._DERIVED.clear()
+        snapshot = skh.load_station_snapshot(part1, part2)
+        assert snapshot is not None and snapshot['errors'] == []
+        assert os.listdir(os.path.join(tmp, skh.SNAPSHOT_DIR_NAME)) == [
+            os.path.basename(skh.snapshot_path(part1, None, snapshot['source_hash']))]
+
+        loaded = skh.load_station_knowledge(part1, part2)
+        assert loaded == parsed
+        for name, station in loaded.items():
+            got = (skh.extract_station_info(station), skh.get_platform_summary(station),
+                   skh.build_route_platform_map(station), skh.build_directional_platform_map(station))
+            assert got == expected[name]
+        # Results are copies: editing one does not change the snapshot
+        skh.extract_station_info(loaded["Benton"])['zone'] = "edited"
+        assert skh.extract_station_info(loaded["Benton"]) == expected["Benton"][0]
+        # ... including the lists nested inside them
+        name = next(name for name in loaded if expected[name][2])
+        route_map = skh.build_route_platform_map(loaded[name])
+        next(iter(route_map.values())).append("edited")
+        assert skh.build_route_platform_map(loaded[name]) == expected[name][2]
+
+        # A corrupt snapshot is a miss: the markdown is parsed again
+        path = skh.snapshot_path(part1, None, snapshot['source_hash'])
+        with open(path, "rb") as f:
+            full = f.read()
+        for damaged in (b"\x80\x05truncated", full[:len(full) // 2], full[:40], b""):
+            with open(path, "wb") as f:
+                f.write(damaged)
+            assert skh.load_station_snapshot(part1, part2) is None
+        skh._DERIVED.clear()
+        assert skh.load_station_knowledge(part1, part2) == parsed
+        assert skh.load_station_knowledge(part1, part2, build_snapshot=True) == parsed
+        assert skh.load_station_snapshot(part1, part2) is not None
+
+        with open(part2, "a", encoding="utf-8") as f:
+            f.write("\n\n" + _block(99, "Zulu"))
+        assert skh.load_station_snapshot(part1, part2) is None
+        assert "Zulu" in skh.load_station_knowledge(part1, part2)
+        assert len(os.listdir(os.path.join(tmp, skh.SNAPSHOT_DIR_NAME))) == 1
+        assert "Zulu" in skh.load_station_knowledge(part1, part2, build_snapshot=True)
+        assert len(os.listdir(os.path.join(tmp, skh.SNAPSHOT_DIR_NAME))) == 2
+
+        custom = os.path.join(tmp, "custom")
+        skh.build_station_snapshot(part1, part2, cache_dir=custom)
+        assert skh.load_station_snapshot(part1, part2, cache_dir=custom) is not None
+
+        # A failed write warns and leaves no temporary file behind
+        failing = os.path.join(tmp, "failing")
+        replace = skh.os.replace
+
+        def fail(src, dst):
+            raise OSError("disk full")
+        skh.os.replace = fail
+        try:
+            assert skh.build_station_snapshot(part1, part2, cache_dir=failing) is not None
+        finally:
+            skh.os.replace = replace
+        assert os.listdir(failing) == []
+    skh._DERIVED.clear()
+
+
+if __name__ == "__main__":
+    test_matches_regex()
+    test_reports_malformed_blocks()
+    test_upload_copy_agrees()
+    test_snapshot()
+    print("✅ streaming station parser and snapshots check out")
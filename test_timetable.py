@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for timetable.py: station-call loading and the Connection Scan router.
+
+CSA arrivals are checked against a brute-force fixpoint that keeps
+re-riding every trip until no arrival improves.
+"""
+
+import random
+
+import timetable
+
+INF = float("inf")
+
+
+def _reference_arrivals(tt, start, departure):
+    """Earliest arrival per station by relaxing whole trips until nothing changes."""
+    source = tt.stop_ids[start]
+    arrival = {source: departure}
+    changed = True
+    while changed:
+        changed = False
+        for trip, p in enumerate(tt.trip_patterns):
+            begin = tt.trip_starts[trip]
+            stops = tt.pattern_stops[p]
+            minutes = tt.pattern_minutes[p]
+            riding = False
+            for pos in range(len(stops) - 1):
+                stop = stops[pos]
+                if not riding and stop in arrival:
+                    ready = arrival[stop] + (0 if stop == source else tt.transfer_minutes)
+                    riding = ready <= begin + minutes[pos]
+                if riding:
+                    arr = begin + minutes[pos + 1]
+                    if arr < arrival.get(stops[pos + 1], INF):
+                        arrival[stops[pos + 1]] = arr
+                        changed = True
+    return {tt.stops[s]: t for s, t in arrival.items()}
+
+
+def _check_journey(tt, journey, start, end, departure):
+    assert journey['stations'][0] == start and journey['stations'][-1] == end
+    assert journey['num_interchanges'] == len(journey['legs']) - 1
+    assert abs(journey['total_time'] - (journey['arrive'] - departure)) < 1e-9
+    ready = departure
+    at = start
+    for leg in journey['legs']:
+        assert leg['from'] == at and leg['stops'][0] == at and leg['stops'][-1] == leg['to']
+        assert leg['depart'] >= ready - 1e-9
+        p = tt.pattern_keys.index((leg['line'], leg['direction']))
+        calls = tt.pattern_minutes[p]
+        names = [tt.stops[s] for s in tt.pattern_stops[p]]
+        i = next(i for i in range(len(names)) if names[i:i + len(leg['stops'])] == leg['stops'])
+        assert abs((leg['arrive'] - leg['depart']) - (calls[i + len(leg['stops']) - 1] - calls[i])) < 1e-9
+        ready = leg['arrive'] + tt.transfer_minutes
+        at = leg['to']
+    assert abs(journey['legs'][-1]['arrive'] - journey['arrive']) < 1e-9
+
+
+def _assert_matches_reference(tt, starts, departures):
+    for start in starts:
+        for departure in departures:
+            expected = _reference_arrivals(tt, start, departure)
+            got = tt.earliest_arrival_times(start, departure)
+            assert got.keys() == expected.keys(), (start, departure)
+            for station, arrive in expected.items():
+                assert abs(got[station] - arrive) < 1e-9, (start, departure, station)
+                if station == start:
+                    continue
+                journey = tt.earliest_arrival(start, station, departure)
+                assert abs(journey['arrive'] - arrive) < 1e-9, (start, station, departure)
+                _check_journey(tt, journey, start, station, departure)
+            unreached = [s for s in tt.stops if s not in expected]
+            for station in unreached[:3]:
+                assert tt.earliest_arrival(start, station, departure) is None
+
+
+def test_load_station_calls():
+    """Every pattern is complete and runs forwards in time."""
+    patterns = timetable.load_station_calls()
+    assert len(patterns) > 150
+    for (route, direction), pattern in patterns.items():
+        assert direction in ("up", "down")
+        calls = pattern['calls']
+        assert len(calls) >= 2
+        assert all(a[1] <= b[1] for a, b in zip(calls, calls[1:])), (route, direction)
+
+    # The "up" export for R024 runs backwards; it is mirrored from "down"
+    down = patterns[("R024", "down")]['calls']
+    up = patterns[("R024", "up")]['calls']
+    assert [s for s, _ in up] == [s for s, _ in reversed(down)]
+    assert up[0][1] == 0 and up[-1][1] == down[-1][1]
+
+
+def test_real_timetable_matches_reference():
+    """CSA over the real patterns, with a per-route headway override."""
+    tt = timetable.Timetable(timetable.load_station_calls(), headway=20,
+                             headways={"R001": 7.5, "R024": 45},
+                             service_start=timetable.parse_clock("07:00"),
+                             service_end=timetable.parse_clock("08:00"))
+    _assert_matches_reference(tt, ["Benton", "Llyn-by-the-Sea", "Stepford Central"],
+                              [timetable.parse_clock("07:05"), timetable.parse_clock("07:41")])
+
+
+def test_random_patterns_match_reference():
+    """Random overlapping routes, with and without a transfer allowance."""
+    for seed in range(4):
+        rng = random.Random(seed)
+        names = [f"S{i}" for i in range(15)]
+        patterns = {}
+        for r in range(8):
+            stations = rng.sample(names, rng.randint(2, 6))
+            minutes = [0.0]
+            for _ in stations[1:]:
+                minutes.append(minutes[-1] + rng.choice([0, 1, 2, 3.5, 5]))
+            patterns[(f"R{r}", "down")] = {'operator': "Metro", 'calls': list(zip(stations, minutes))}
+        headways = {f"R{r}": rng.choice([4, 6, 10]) for r in range(8)}
+        for transfer in (0, 3):
+            tt = timetable.Timetable(patterns, headways=headways, service_start=0,
+                                     service_end=40, transfer_minutes=transfer)
+            _assert_matches_reference(tt, [s for s in names[:5] if s in tt.stop_ids], [0, 7.5, 20])
+
+
+def test_headways_and_service_window():
+    """Waits follow the headway; nothing runs after the service ends."""
+    patterns = {("R1", "down"): {'operator': "Metro", 'calls': [("A", 0.0), ("B", 10.0)]}}
+    tt = timetable.Timetable(patterns, headway=30, service_start=360, service_end=420)
+    assert tt.earliest_arrival("A", "B", 361)['arrive'] == 400
+    assert tt.earliest_arrival("A", "B", 360)['depart'] == 360
+    assert tt.earliest_arrival("A", "B", 391) is None
+    assert tt.earliest_arrival("B", "A", 300) is None
+    assert tt.earliest_arrival("A", "A", 100)['legs'] == []
+
+    faster = timetable.Timetable(patterns, headway=30, headways={"R1": 5},
+                                 service_start=360, service_end=420)
+    assert faster.earliest_arrival("A", "B", 361)['arrive'] == 375
+    assert timetable.format_clock(timetable.parse_clock("08:05")) == "08:05"
+    assert "06:05 Metro R1" in timetable.format_timed_journey(faster.earliest_arrival("A", "B", 361))
+
+
+if __name__ == "__main__":
+    test_load_station_calls()
+    test_real_timetable_matches_reference()
+    test_random_patterns_match_reference()
+    test_headways_and_service_window()
+    print("✅ Connection Scan matches brute force")
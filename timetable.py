@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Timetable compiler and Connection Scan router
+=============================================
+rail_helpers plans with average segment times, so it can't answer timed
+questions such as "leaving Benton at 08:10, when am I in Llyn-by-the-Sea?".
+This module expands the per-station calls in ee/scr_station_calls_full*.csv
+into timed trips - one departure from each route's origin every headway
+minutes - and answers earliest-arrival queries with the Connection Scan
+Algorithm (CSA): a single pass over every connection (one train running
+between two consecutive stops) in departure order.
+
+Connections are stored in flat arrays sorted by departure time:
+- conn_dep_stops/conn_arr_stops: stop IDs at either end
+- conn_dep_times/conn_arr_times: minutes after midnight
+- conn_trips: trip ID; conn_positions: position of the departure stop in
+  the trip's pattern (to list intermediate stops)
+
+Times are minutes after midnight (parse_clock("08:10") == 490.0); trips
+running past midnight simply carry on counting (25:30 == 1530.0).
+
+Usage:
+    import timetable
+    tt = timetable.compile_timetable(headway=15, headways={"R001": 10})
+    journey = tt.earliest_arrival("Benton", "Llyn-by-the-Sea", timetable.parse_clock("08:10"))
+    print(timetable.format_timed_journey(journey))
+
+    python3 timetable.py Benton "Llyn-by-the-Sea" 08:10 [headway]
+"""
+
+import csv
+import os
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from rail_helpers import INTERCHANGE_PENALTY
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Newest export first: earlier files take precedence for a route/direction
+STATION_CALLS_FILES = [
+    "scr_station_calls_full (2).csv",
+    "scr_station_calls_full (1).csv",
+    "scr_station_calls_full.csv",
+]
+
+DEFAULT_HEADWAY = 15.0      # minutes between departures from a route's origin
+SERVICE_START = 5 * 60.0    # first departure from each origin (05:00)
+SERVICE_END = 24 * 60.0     # no departures from an origin at or after this
+
+
+def parse_clock(text: str) -> float:
+    """Convert "HH:MM" to minutes after midnight."""
+    hours, minutes = text.strip().split(":")
+    return int(hours) * 60 + float(minutes)
+
+
+def format_clock(minutes: float) -> str:
+    """Convert minutes after midnight to "HH:MM" (hours keep counting past 24)."""
+    whole = int(round(minutes))
+    return f"{whole // 60:02d}:{whole % 60:02d}"
+
+
+def _stopping_calls(rows: List[Dict]) -> Optional[List[Tuple[str, float]]]:
+    """Return [(station, cumulative_minutes)] for the calls a train stops at, or None if incomplete."""
+    calls = []
+    for row in sorted(rows, key=lambda r: int(r["seq"])):
+        if row["stops"].strip().lower() != "true":
+            continue
+        station = row["station"].strip()
+        minutes = row["cumulative_minutes"].strip()
+        if not station or not minutes:
+            return None
+        calls.append((station, float(minutes)))
+    return calls if len(calls) >= 2 else None
+
+
+def _increasing(calls: List[Tuple[str, float]]) -> bool:
+    return all(a[1] <= b[1] for a, b in zip(calls, calls[1:]))
+
+
+def load_station_calls(paths: Optional[List[str]] = None) -> Dict[Tuple[str, str], Dict]:
+    """
+    Load the stopping pattern of every route and direction.
+
+    The exports overlap and differ in quality, so for each (route, direction)
+    the first file (in paths order) with a complete pattern wins. Non-stopping
+    calls are dropped. Some "up" patterns carry cumulative minutes that don't
+    increase along the route (negated or misaligned copies of "down"); those
+    are rebuilt by mirroring the opposite direction when it serves the same
+    stations in reverse, and dropped otherwise.
+
+    Args:
+        paths: CSV files to read (default: STATION_CALLS_FILES under ee/)
+
+    Returns:
+        Dict mapping (route_code, direction) -> {'operator': name,
+        'calls': [(station, cumulative_minutes), ...]} with direction lower-case
+    """
+    if paths is None:
+        paths = [os.path.join(HERE, "ee", name) for name in STATION_CALLS_FILES]
+
+    patterns = {}
+    for path in paths:
+        rows_by_key = defaultdict(list)
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                key = (row["route_code"].strip(), row["direction"].strip().lower())
+                rows_by_key[key].append(row)
+
+        for key, rows in rows_by_key.items():
+            if key in patterns:
+                continue
+            calls = _stopping_calls(rows)
+            if calls is not None:
+                patterns[key] = {'operator': rows[0]["operator"].strip(), 'calls': calls}
+
+    opposite = {"up": "down", "down": "up"}
+    for (route, direction), pattern in list(patterns.items()):
+        calls = pattern['calls']
+        if _increasing(calls):
+            continue
+        other = patterns.get((route, opposite.get(direction)))
+        if (other is not None and _increasing(other['calls'])
+                and [s for s, _ in other['calls']] == [s for s, _ in reversed(calls)]):
+            total = other['calls'][-1][1]
+            pattern['calls'] = [(station, total - minutes) for station, minutes in reversed(other['calls'])]
+        else:
+            del patterns[(route, direction)]
+
+    return patterns
+
+
+class Timetable:
+    """
+    Timed connections for every trip, ready for Connection Scan queries.
+
+    Build with compile_timetable(). Each (route, direction) pattern runs
+    trips from its origin every headway minutes between service_start and
+    service_end; each trip contributes one connection per pair of
+    consecutive stops.
+    """
+
+    def __init__(self, patterns: Dict[Tuple[str, str], Dict],
+                 headway: float = DEFAULT_HEADWAY,
+                 headways: Optional[Dict[str, float]] = None,
+                 service_start: float = SERVICE_START,
+                 service_end: float = SERVICE_END,
+                 transfer_minutes: float = INTERCHANGE_PENALTY):
+        """
+        Args:
+            patterns: Result of load_station_calls()
+            headway: Minutes between trips on routes not listed in headways
+            headways: Optional route code -> headway overrides
+            service_start: First departure from each origin (minutes after midnight)
+            service_end: No trip leaves its origin at or after this time
+            transfer_minutes: Minimum time to change trains at a station
+        """
+        headways = headways or {}
+        self.transfer_minutes = transfer_minutes
+        self.stops: List[str] = []
+        self.stop_ids: Dict[str, int] = {}
+        self.pattern_keys: List[Tuple[str, str]] = []
+        self.pattern_operators: List[str] = []
+        self.pattern_stops: List[array] = []
+        self.pattern_minutes: List[array] = []
+        self.trip_patterns = array("i")
+        self.trip_starts = array("d")
+
+        connections = []
+        for key, pattern in sorted(patterns.items()):
+            stops = array("i")
+            minutes = array("d")
+            for station, offset in pattern['calls']:
+                if station not in self.stop_ids:
+                    self.stop_ids[station] = len(self.stops)
+                    self.stops.append(station)
+                stops.append(self.stop_ids[station])
+                minutes.append(offset)
+            p = len(self.pattern_keys)
+            self.pattern_keys.append(key)
+            self.pattern_operators.append(pattern['operator'])
+            self.pattern_stops.append(stops)
+            self.pattern_minutes.append(minutes)
+
+            every = headways.get(key[0], headway)
+            if every <= 0:
+                raise ValueError(f"Headway for {key[0]} must be positive, got {every}")
+            start = service_start
+            while start < service_end:
+                trip = len(self.trip_patterns)
+                self.trip_patterns.append(p)
+                self.trip_starts.append(start)
+                for pos in range(len(stops) - 1):
+                    connections.append((start + minutes[pos], start + minutes[pos + 1],
+                                        trip, pos, stops[pos], stops[pos + 1]))
+                start += every
+
+        # Ties on departure: shorter connections first, so a zero-minute hop
+        # is scanned before a train that leaves from where it arrives. (Two
+        # zero-minute hops of different trips at the same instant are taken
+        # in trip order; with a transfer allowance that can't matter.)
+        connections.sort()
+        self.conn_dep_times = array("d", (c[0] for c in connections))
+        self.conn_arr_times = array("d", (c[1] for c in connections))
+        self.conn_trips = array("i", (c[2] for c in connections))
+        self.conn_positions = array("i", (c[3] for c in connections))
+        self.conn_dep_stops = array("i", (c[4] for c in connections))
+        self.conn_arr_stops = array("i", (c[5] for c in connections))
+
+    def _scan(self, source: int, departure: float,
+              target: Optional[int] = None) -> Tuple[List[float], Dict[int, Tuple[int, int]]]:
+        """
+        Connection Scan from source at the departure time.
+
+        Returns:
+            Tuple of (arrival, reached_by): earliest arrival per stop ID (inf
+            if not reached) and stop -> (boarding connection, alighting
+            connection) of the ride that reached it first
+        """
+        inf = float("inf")
+        arrival = [inf] * len(self.stops)
+        ready = [inf] * len(self.stops)  # earliest time a train can be boarded at each stop
+        arrival[source] = ready[source] = departure
+        boarded = array("i", [-1]) * len(self.trip_patterns)  # connection where each trip was boarded
+        reached_by = {}
+
+        dep_times = self.conn_dep_times
+        arr_times = self.conn_arr_times
+        trips = self.conn_trips
+        dep_stops = self.conn_dep_stops
+        arr_stops = self.conn_arr_stops
+        transfer = self.transfer_minutes
+        target_arrival = inf
+
+        for c in range(bisect_left(dep_times, departure), len(dep_times)):
+            dep = dep_times[c]
+            if dep >= target_arrival:
+                break  # Nothing departing now can arrive any earlier
+            trip = trips[c]
+            board = boarded[trip]
+            if board < 0:
+                if ready[dep_stops[c]] > dep:
+                    continue
+                board = boarded[trip] = c
+            stop = arr_stops[c]
+            arr = arr_times[c]
+            if arr < arrival[stop]:
+                arrival[stop] = arr
+                ready[stop] = arr + transfer
+                reached_by[stop] = (board, c)
+                if stop == target:
+                    target_arrival = arr
+
+        return arrival, reached_by
+
+    def earliest_arrival(self, start: str, end: str, departure: float) -> Optional[Dict]:
+        """
+        Earliest arrival at end for a passenger at start from the departure time.
+
+        Args:
+            start: Starting station name
+            end: Destination station name
+            departure: Minutes after midnight (see parse_clock)
+
+        Returns:
+            Dict or None if unknown/unreachable before the timetable ends:
+            {
+                'stations': ['Station A', ...],   # every stop passed through
+                'depart': 492.0,                  # first train leaves start
+                'arrive': 530.0,
+                'total_time': 40.0,               # arrive - requested departure
+                'num_interchanges': 1,
+                'legs': [
+                    {'from': ..., 'to': ..., 'operator': ..., 'line': 'R001',
+                     'direction': 'down', 'depart': 492.0, 'arrive': 510.0,
+                     'stops': ['Station A', ..., 'Station C']},
+                    ...
+                ]
+            }
+        """
+        source = self.stop_ids.get(start)
+        target = self.stop_ids.get(end)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return {'stations': [start], 'depart': departure, 'arrive': departure,
+                    'total_time': 0, 'num_interchanges': 0, 'legs': []}
+
+        arrival, reached_by = self._scan(source, departure, target)
+        if target not in reached_by:
+            return None
+
+        rides = []
+        stop = target
+        while stop != source:
+            board, alight = reached_by[stop]
+            rides.append((board, alight))
+            stop = self.conn_dep_stops[board]
+        rides.reverse()
+
+        legs = []
+        stations = [start]
+        for board, alight in rides:
+            p = self.trip_patterns[self.conn_trips[board]]
+            stops = [self.stops[s] for s in
+                     self.pattern_stops[p][self.conn_positions[board]:self.conn_positions[alight] + 2]]
+            route, direction = self.pattern_keys[p]
+            legs.append({
+                'from': stops[0],
+                'to': stops[-1],
+                'operator': self.pattern_operators[p],
+                'line': route,
+                'direction': direction,
+                'depart': self.conn_dep_times[board],
+                'arrive': self.conn_arr_times[alight],
+                'stops': stops
+            })
+            stations.extend(stops[1:])
+
+        return {
+            'stations': stations,
+            'depart': legs[0]['depart'],
+            'arrive': arrival[target],
+            'total_time': arrival[target] - departure,
+            'num_interchanges': len(legs) - 1,
+            'legs': legs
+        }
+
+    def earliest_arrival_times(self, start: str, departure: float) -> Dict[str, float]:
+        """
+        Earliest arrival at every reachable station, from one scan.
+
+        Returns:
+            Dict mapping station -> minutes after midnight (start maps to departure)
+        """
+        source = self.stop_ids.get(start)
+        if source is None:
+            return {}
+        arrival, _ = self._scan(source, departure)
+        return {self.stops[s]: t for s, t in enumerate(arrival) if t != float("inf")}
+
+
+def compile_timetable(paths: Optional[List[str]] = None,
+                      headway: float = DEFAULT_HEADWAY,
+                      headways: Optional[Dict[str, float]] = None,
+                      service_start: float = SERVICE_START,
+                      service_end: float = SERVICE_END,
+                      transfer_minutes: float = INTERCHANGE_PENALTY) -> Timetable:
+    """
+    Load the station-call exports and expand them into a Timetable.
+
+    Args:
+        paths: Station-call CSVs (default: ee/scr_station_calls_full*.csv)
+        headway: Minutes between trips on routes not listed in headways
+        headways: Optional route code -> headway overrides
+        service_start: First departure from each origin (minutes after midnight)
+        service_end: No trip leaves its origin at or after this time
+        transfer_minutes: Minimum time to change trains at a station
+
+    Returns:
+        Timetable ready for earliest_arrival() queries
+    """
+    return Timetable(load_station_calls(paths), headway, headways, service_start,
+                     service_end, transfer_minutes)
+
+
+def format_timed_journey(journey: Optional[Dict]) -> str:
+    """Format an earliest_arrival() journey as a readable itinerary."""
+    if not journey:
+        return "No timetabled route found."
+    if not journey['legs']:
+        return "You are already at the destination."
+
+    output = [
+        f"Journey: {journey['stations'][0]} → {journey['stations'][-1]}",
+        f"Depart {format_clock(journey['depart'])}, arrive {format_clock(journey['arrive'])} "
+        f"({journey['total_time']:.0f} minutes)",
+        f"Interchanges: {journey['num_interchanges']}",
+        "",
+    ]
+    for leg in journey['legs']:
+        output.append(f"• {format_clock(leg['depart'])} {leg['operator']} {leg['line']} "
+                      f"({leg['direction']}) from {leg['from']}")
+        output.append(f"  {format_clock(leg['arrive'])} arrive {leg['to']}")
+        output.append(f"  Stops: {' → '.join(leg['stops'])}")
+    return "\n".join(output)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 4:
+        print('Usage: python3 timetable.py "From" "To" HH:MM [headway]')
+        sys.exit(1)
+
+    every = float(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_HEADWAY
+    tt = compile_timetable(headway=every)
+    print(f"✅ {len(tt.trip_patterns):,} trips, {len(tt.conn_dep_times):,} connections "
+          f"over {len(tt.stops)} stations")
+    print(format_timed_journey(tt.earliest_arrival(sys.argv[1], sys.argv[2],
+                                                   parse_clock(sys.argv[3]))))